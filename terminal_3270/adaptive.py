@@ -0,0 +1,168 @@
+""" Adaptive Timeouts
+
+Learn the screen wait limits from the latency the host actually shows,
+instead of fixed limits that are too long on a fast host and too short at peak load.
+
+A rolling window of wait latencies is kept per key, i.e. per screen or transition.
+Once a key has `min_samples`, its limit is the `percentile` latency plus `margin` seconds,
+bounded by `min_limit` and `max_limit`; until then the caller's fixed limit applies.
+
+    adaptive = AdaptiveTimeouts(percentile=99.0, margin=0.100)
+
+    with MySignOnSession(..., adaptive=adaptive) as session:
+        results = session.get_results()
+
+    print(adaptive.stats())
+
+A wait that times out records twice its limit, so the limits open up quickly when the host slows down.
+"""
+
+import math
+import threading
+from collections import deque
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MARGIN = 0.050  # seconds
+DEFAULT_WINDOW = 200
+DEFAULT_MIN_SAMPLES = 10
+DEFAULT_MIN_LIMIT = 0.050  # seconds
+DEFAULT_MAX_LIMIT = 10.0  # seconds
+
+
+def percentile(samples, percent):
+    """ Percentile
+
+    The nearest-rank percentile of the samples.
+
+    :param list samples: the latencies, in any order
+    :param float percent: the percentile, 0.0 to 100.0
+    :rtype: float
+    """
+
+    ordered = sorted(samples)
+    rank = int(math.ceil((percent / 100.0) * len(ordered)))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class LatencyWindow(object):
+    """ Latency Window
+
+    The last `size` wait latencies of one key, with its wait and timeout counts.
+    """
+
+    def __init__(self, size=DEFAULT_WINDOW):
+        self.samples = deque(maxlen=size)
+        self.waits = 0
+        self.timeouts = 0
+
+    def record(self, seconds, found=True):
+        self.samples.append(seconds)
+        self.waits += 1
+        if not found:
+            self.timeouts += 1
+
+
+class AdaptiveTimeouts(object):
+    """ Adaptive Timeouts
+
+    Thread-safe wait limits learned per key; one object may be shared by many emulators.
+    """
+
+    def __init__(self, percentile=DEFAULT_PERCENTILE, margin=DEFAULT_MARGIN, min_limit=DEFAULT_MIN_LIMIT,
+                 max_limit=DEFAULT_MAX_LIMIT, window=DEFAULT_WINDOW, min_samples=DEFAULT_MIN_SAMPLES):
+        """ New Adaptive Timeouts
+
+        :param float percentile: the latency percentile to wait for, e.g. 99.0
+        :param float margin: seconds added to the percentile latency
+        :param float min_limit: the shortest learned limit in seconds
+        :param float max_limit: the longest learned limit in seconds
+        :param int window: keep this many recent latencies per key
+        :param int min_samples: use the fixed limit until a key has this many latencies
+        :raises: ValueError for invalid bounds
+        """
+
+        if not 0.0 < percentile <= 100.0:
+            raise ValueError('"percentile" must be more than 0.0, up to 100.0')
+        if not 0.0 < min_limit <= max_limit:
+            raise ValueError('"min_limit" must be a positive number of seconds, up to "max_limit"')
+        if window < 1 or min_samples < 1:
+            raise ValueError('"window" and "min_samples" must be at least 1')
+
+        self.percentile = percentile
+        self.margin = margin
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def _limit(self, latencies):
+        limit = percentile(latencies, self.percentile) + self.margin
+        return min(max(limit, self.min_limit), self.max_limit)
+
+    def time_limit(self, key, default):
+        """ Time Limit
+
+        :param str key: the screen or transition, e.g. 'signon:passed|changed'
+        :param float default: the fixed limit, used until the key has `min_samples`
+        :returns: the wait limit in seconds
+        :rtype: float
+        """
+
+        with self._lock:
+            latencies = self._windows.get(key)
+            if latencies is None or len(latencies.samples) < self.min_samples:
+                return default
+            return self._limit(latencies.samples)
+
+    def record(self, key, seconds, found=True):
+        """ Record a Wait
+
+        :param str key: the screen or transition
+        :param float seconds: the wait latency, or its limit when it timed out
+        :param bool found: False when the wait timed out
+        """
+
+        if not found:
+            seconds = min(seconds * 2, self.max_limit)
+
+        with self._lock:
+            latencies = self._windows.get(key)
+            if latencies is None:
+                latencies = self._windows[key] = LatencyWindow(self.window)
+            latencies.record(seconds, found)
+
+    def reset(self, key=None):
+        """ Forget the latencies of one key, or all keys. """
+
+        with self._lock:
+            if key is None:
+                self._windows.clear()
+            else:
+                self._windows.pop(key, None)
+
+    def stats(self):
+        """ Latency Stats
+
+        :returns: {key: {'waits', 'timeouts', 'samples', 'p50', 'p90', 'p99', 'max', 'time_limit'}};
+            'time_limit' is None until the key has `min_samples`
+        :rtype: dict
+        """
+
+        with self._lock:
+            stats = {}
+            for (key, latencies) in self._windows.items():
+                samples = list(latencies.samples)
+                stats[key] = {
+                    'waits': latencies.waits,
+                    'timeouts': latencies.timeouts,
+                    'samples': len(samples),
+                    'p50': percentile(samples, 50.0),
+                    'p90': percentile(samples, 90.0),
+                    'p99': percentile(samples, 99.0),
+                    'max': max(samples),
+                    'time_limit': self._limit(samples) if len(samples) >= self.min_samples else None,
+                }
+            return stats
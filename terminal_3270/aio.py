@@ -0,0 +1,431 @@
+""" asyncio 3270 Emulator and Sessions
+
+These classes drive s3270 over asyncio subprocess pipes.
+One event loop can run hundreds of terminal sessions without one OS thread each.
+
+    class MyAsyncSession(AsyncSession3270):
+
+        async def login(self):
+            await self.term_emulator.wait_for_field()
+            await self.term_emulator.key_sequence(self.username, TAB, self.password)
+            await self.term_emulator.send_enter()
+            return not await self.term_emulator.string_found(2, 2, 'REJECTED')
+
+    async def main():
+        async with MyAsyncSession(username, password, app_id, HOST_3270) as session:
+            table = AsyncScreenTable(session.term_emulator, 11, 23)
+            async for row in table.fetch_results():
+                print(row)
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+from timeit import default_timer as timer
+
+from py3270 import Command, CommandError, KeyboardStateError, Status, TerminatedError
+from terminal_3270.emulator import (
+    ScreenWaitError,
+    check_status,
+    key_actions,
+    reads_only,
+    sequence_actions
+)
+from terminal_3270.screen import Screen
+from terminal_3270.sessions import LoginError
+from terminal_3270.tables import ScreenTable, ScreenTableNotFoundError
+from terminal_3270.wait_until import WaitUntil
+
+log = logging.getLogger(__name__)
+
+TIMEOUT_WAIT_SCREEN = 10
+
+
+class AsyncWaitUntil(WaitUntil):
+    """ Async Wait Until an Event Occurs or Time Limit.
+
+    This is a WaitUntil whose `found_callable` is a coroutine function.
+    The poller sleeps with `asyncio.sleep()`, so other sessions run while it waits.
+    """
+
+    async def poll(self, interval=None, backoff=None, max_interval=None, jitter=None):
+        """ Poll Until Found.
+
+        See `WaitUntil.poll()`.
+        """
+
+        interval = self.interval if interval is None else interval
+        backoff = self.backoff if backoff is None else backoff
+        max_interval = self.max_interval if max_interval is None else max_interval
+        jitter = self.jitter if jitter is None else jitter
+
+        self.probes = 0
+        self.found = False
+        delay = interval
+
+        self.start_t = timer()
+
+        while True:
+            self.probes += 1
+            if await self.found_callable(*self.call_args, **self.call_kwargs):
+                self.found = True
+                break
+
+            remaining = self.time_limit - (timer() - self.start_t)
+            if remaining <= 0.0:
+                break
+
+            if delay > 0.0:
+                await asyncio.sleep(min(delay * random.uniform(1.0 - jitter, 1.0 + jitter), remaining))
+                delay = min(delay * backoff, max_interval)
+            else:
+                await asyncio.sleep(0)  # let the other sessions run
+
+        self.end_t = timer()
+
+
+class AsyncEmulatorPlus(object):
+    """ asyncio 3270 Emulator Plus
+
+    The asyncio counterpart of `EmulatorPlus`.
+    Commands run one at a time per emulator; many emulators run concurrently on one event loop.
+    """
+
+    executable = 's3270'
+    args = ['-xrm', 's3270.unlockDelay: False']
+
+    def __init__(self, timeout=30, args=None, process=None):
+        """ New AsyncEmulatorPlus
+
+        Call `await start()` before the first command, unless a `process` is given.
+
+        :param int timeout: the timeout to any Wait() command sent to s3270
+        :param list args: extra s3270 command line arguments
+        :param process: an already started asyncio subprocess speaking the s3270 protocol
+        """
+
+        self.timeout = timeout
+        self.extra_args = args or []
+        self.process = process
+        self.is_terminated = False
+        self.status = Status(None)
+        self.last_host = None
+
+        self._lock = asyncio.Lock()
+        self._screen = None
+
+    async def start(self):
+        """ Start the s3270 Subprocess """
+
+        if self.process is None:
+            self.process = await asyncio.create_subprocess_exec(
+                self.executable, *(self.args + self.extra_args),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE)
+        return self
+
+    async def exec_command(self, cmdstr):
+        """ Execute an s3270 Command
+
+        :param bytes cmdstr: the s3270 action line
+        :returns: the py3270 Command result, with `data` and `status_line`
+        :raises: CommandError when s3270 answers "error"
+        """
+
+        if self.is_terminated:
+            raise TerminatedError('this AsyncEmulatorPlus instance has been terminated')
+
+        await self._lock.acquire()
+
+        # A cancelled caller must not leave the reply in the pipe for the next command,
+        # so the round trip always runs to the end; it releases the lock.
+        (cmd, result) = await asyncio.shield(self._round_trip(cmdstr))
+
+        cmd.handle_result(result.decode('ascii'))
+        return cmd
+
+    async def _round_trip(self, cmdstr):
+        """ Write one command and read its whole reply, then release the lock. """
+
+        try:
+            if not reads_only(cmdstr):
+                self._screen = None
+
+            log.debug('sending command: {}'.format(cmdstr))
+            cmd = Command(None, cmdstr)
+
+            self.process.stdin.write(cmdstr + b'\n')
+            await self.process.stdin.drain()
+
+            while True:
+                line = await self.process.stdout.readline()
+                if not line.startswith(b'data:'):
+                    cmd.status_line = line.rstrip()
+                    result = (await self.process.stdout.readline()).rstrip()
+                    break
+                cmd.data.append(line[6:].rstrip(b'\n\r'))
+
+            self.status = Status(cmd.status_line)
+            return (cmd, result)
+        finally:
+            self._lock.release()
+
+    async def exec_actions(self, actions):
+        """ Execute several s3270 actions in one round trip, see `EmulatorPlus.exec_actions()`. """
+
+        if actions:
+            return await self.exec_command(' '.join(actions).encode('ascii'))
+
+    async def terminate(self):
+        """ Quit s3270 and wait for the subprocess to exit. """
+
+        if not self.is_terminated:
+            try:
+                await self.exec_command(b'Quit')
+            except (BrokenPipeError, ConnectionResetError, CommandError):
+                pass
+            self.is_terminated = True
+
+            if self.process.returncode is None:
+                await self.process.wait()
+
+    async def connect(self, host):
+        await self.exec_command('Connect({})'.format(host).encode('ascii'))
+        self.last_host = host
+
+    async def is_connected(self):
+        await self.exec_command(b'Query(ConnectionState)')
+        return self.status.connection_state.startswith(b'C(')
+
+    async def wait_for_field(self):
+        """ Wait until the keyboard is unlocked on an input field, see `py3270.Emulator.wait_for_field()`. """
+
+        await self.exec_command('Wait({}, InputField)'.format(self.timeout).encode('ascii'))
+        if self.status.keyboard != b'U':
+            raise KeyboardStateError(
+                'keyboard not unlocked, state was: {}'.format(self.status.keyboard.decode('ascii')))
+
+    async def move_to(self, ypos, xpos):
+        await self.exec_command('MoveCursor({}, {})'.format(ypos - 1, xpos - 1).encode('ascii'))
+
+    async def send_enter(self):
+        await self.exec_command(b'Enter')
+
+    async def send_clear(self):
+        await self.exec_command('Clear()'.encode('ascii'))
+
+    async def send_pa_key(self, number):
+        await self.exec_command('PA({})'.format(number).encode('ascii'))
+
+    async def send_pf_key(self, number):
+        await self.exec_command('PF({})'.format(number).encode('ascii'))
+
+    async def send_tab(self):
+        await self.exec_command('Tab()'.encode('ascii'))
+
+    async def key_entry(self, text, batch=False):
+        """ Key Entry, see `EmulatorPlus.key_entry()`. """
+
+        if batch:
+            await self.exec_actions(key_actions(text))
+        else:
+            for action in key_actions(text):
+                await self.exec_command(action.encode('ascii'))
+
+    async def key_sequence(self, *entries):
+        """ Key Sequence, see `EmulatorPlus.key_sequence()`. """
+
+        await self.exec_actions(sequence_actions(entries))
+
+    async def snapshot(self, refresh=False):
+        """ Screen Snapshot, see `EmulatorPlus.snapshot()`. """
+
+        screen = self._screen
+        if refresh or screen is None:
+            cmd = await self.exec_command('Ascii()'.encode('ascii'))
+            screen = Screen(cmd.data)
+            self._screen = screen
+        return screen
+
+    async def string_get(self, ypos, xpos, length):
+        return (await self.snapshot()).region(ypos, xpos, length)
+
+    async def string_found(self, ypos, xpos, string):
+        return (await self.snapshot()).found(ypos, xpos, string)
+
+    async def status_bar(self, terminator_strings=[], passing_strings=[], status_row=24):
+        """ Status Bar, see `EmulatorPlus.status_bar()`.
+
+        :returns: success or failure and the status bar
+        :rtype: tuple, (bool, STATUS BAR string)
+        """
+
+        status_text = await self.string_get(status_row, 1, 80)
+        log.debug('STATUS-BAR: [{}]'.format(status_text))
+        return (check_status(status_text, terminator_strings, passing_strings), status_text)
+
+    async def _string_found_fresh(self, ypos, xpos, string):
+        return (await self.snapshot(refresh=True)).found(ypos, xpos, string)
+
+    async def wait_for_screen(self, screen_str, row_loc, col_loc, time_limit=0.750):
+        """ Wait for Screen to Render, see `EmulatorPlus.wait_for_screen()`.
+
+        :raises: ScreenWaitError when the `time_limit` is reached
+        """
+
+        wait_until = AsyncWaitUntil(time_limit, self._string_found_fresh, *(row_loc, col_loc, screen_str))
+        await wait_until.poll()
+
+        if not wait_until.found:
+            raise ScreenWaitError('next screen did not appear in {} seconds'.format(time_limit))
+
+
+class AsyncSession3270(object):
+    """ asyncio User Session to an s3270 Terminal
+
+    The asyncio counterpart of `Session3270`; subclasses declare an async `login()`.
+
+        async with MyAsyncSession(username, password, app_id, HOST_3270) as session:
+            results = await session.get_results()  # declared by your subclass!
+    """
+
+    emulator_class = AsyncEmulatorPlus
+
+    def __init__(self, username, password, app_id, host_3270):
+        """ New AsyncSession3270
+
+        :param str username: login user for terminal
+        :param str password: login password for terminal
+        :param str app_id: login `application ID` sends user to the LOGIN screen
+        :param str host_3270: enter the hostname to the 3270 server
+        """
+
+        self.host_3270 = host_3270
+        self.username = username
+        self.password = password
+        self.app_id = app_id
+
+        self.term_emulator = None
+
+    async def __aenter__(self):
+        """ Enter Async Context Manager """
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        """ Exit Async Context Manager """
+        await self.disconnect()
+
+    async def login(self):
+        """ login routine
+
+        Subclasses will need to override this for their 3270 host.
+
+        :returns: True on success, False otherwise
+        """
+
+        raise NotImplementedError('Create your login procedure here!')
+
+    async def connect(self):
+        """ Connect to host and start session. """
+
+        self.term_emulator = await self.emulator_class(timeout=TIMEOUT_WAIT_SCREEN).start()
+        try:
+            await self.term_emulator.connect(self.host_3270)
+
+            if not await self.login():
+                raise LoginError('User "{}" could not login to "{}"!'.format(self.username, self.host_3270))
+        except Exception:
+            # `__aexit__` does not run when `__aenter__` fails; quit s3270 here.
+            await self.disconnect()
+            raise
+
+    async def disconnect(self):
+        """ Disconnect from host and end session. """
+
+        if self.term_emulator:
+            await self.term_emulator.terminate()
+            self.term_emulator = None
+
+
+class AsyncScreenTable(ScreenTable):
+    """ asyncio Screen Table
+
+    A ScreenTable on an `AsyncEmulatorPlus`; `fetch_results()` is an async generator.
+    The `cache` and `incremental` work as in ScreenTable; the `query` may be a coroutine function.
+    """
+
+    async def next_result_set(self):
+        await self.emulator.send_pf_key(2)
+
+    async def fetch_results(self):
+        """ Fetch Results Async Generator
+
+        See `ScreenTable.fetch_results()`.
+
+        :returns: an async generator to return results as row lists
+        """
+
+        caching = (self.cache is not None and self.cache_key is not None)
+        if caching:
+            pages = self.cache.get(self.cache_key)
+            if pages is not None:
+                for lines in pages:
+                    for row in self.parse_page(lines):
+                        yield row
+                return
+
+        if self.query is not None:
+            result = self.query()
+            if inspect.isawaitable(result):
+                await result
+
+        pages = []
+        while self.has_more_results:
+            if not self._table_data:
+                await self.get_table_page(self.top_row, self.bottom_row)
+                pages.append(self._page_lines)
+
+            if not self._table_data:
+                continue  # an empty last page
+
+            row = self._table_data.pop(0)
+            yield row
+
+        if caching:
+            self.cache.set(self.cache_key, pages)
+
+    async def get_table_page(self, top_row, bottom_row):
+        """ Get Screen Table Page, see `ScreenTable.get_table_page()`. """
+
+        self._table_data = []
+
+        (status_found, status_bar) = await self.emulator.status_bar(
+            passing_strings=[self.status_found], status_row=self.status_row)
+        if not status_found:
+            raise ScreenTableNotFoundError(status_bar)
+
+        lines = []
+        for row in range(top_row, bottom_row + 1):
+            line = await self.emulator.string_get(row, 1, self.width)
+            if line.strip():
+                lines.append(line)
+            else:
+                break  # blank-line ends table data
+
+        self._page_lines = lines
+        if self.incremental:
+            self._table_data = self.parse_changed_rows(lines, top_row)
+        else:
+            self._table_data = self.parse_page(lines)
+
+        (status_bool, status_bar) = await self.emulator.status_bar(
+            terminator_strings=[self.status_end], status_row=self.status_row)
+        self._more_pages = status_bool
+
+        if self._more_pages:
+            await self.next_result_set()
+
+        return self._table_data
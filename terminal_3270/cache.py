@@ -0,0 +1,211 @@
+""" Result Cache
+
+An opt-in TTL/LRU cache for read-only inquiry results, so a repeated inquiry skips the mainframe.
+Entries are keyed by host, region, screen format, command and arguments, see `cache_key()`.
+
+    cache = ResultCache(ttl=60)  # in-process
+    cache = ResultCache(SQLiteBackend('/var/tmp/inquiries.sqlite'), ttl=60)  # shared by processes on one box
+
+    key = cache_key(HOST_3270, app_id, 'OSSCWL', 'FIND', order_id)
+    table = ScreenTable(emulator, 11, 23, cache=cache, cache_key=key,
+                        query=lambda: emulator.screen_command('FIND {}'.format(order_id)))
+
+    rows = list(table.fetch_results())  # a cache hit never touches the emulator
+
+Cached values must be JSON types; ScreenTable caches the raw table lines and parses them again on a hit.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 300.0  # seconds
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def cache_key(host_3270, app_id, screen_name, command, *arguments):
+    """ Cache Key
+
+    :param str host_3270: the 3270 host
+    :param str app_id: the region or application ID
+    :param str screen_name: the screen format, e.g. "OSSCWL"
+    :param str command: the inquiry command, e.g. "FIND"
+    :param arguments: the inquiry arguments, e.g. an order ID
+    :rtype: str
+    """
+
+    return json.dumps([host_3270, app_id, screen_name, command] + list(arguments), separators=(',', ':'))
+
+
+class MemoryBackend(object):
+    """ Memory Cache Backend
+
+    A thread-safe in-process LRU dict.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {key: (expires_t, value)}
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, expires_t):
+        with self._lock:
+            self._entries[key] = (expires_t, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteBackend(object):
+    """ SQLite Cache Backend
+
+    An LRU table in a local SQLite file, shared by the processes on one box.
+    Values are stored as JSON.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, timeout=5.0):
+        """ New SQLite Backend
+
+        :param str path: the SQLite database file
+        :param int max_entries: evict the least recently used entries above this many
+        :param float timeout: seconds to wait for another process's write lock
+        """
+
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+
+        self._local = threading.local()
+        with self._connection() as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS results '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_t REAL NOT NULL, used_t REAL NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS results_used_t ON results (used_t)')
+
+    def _connection(self):
+        """ One connection per thread """
+
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=self.timeout)
+            db.execute('PRAGMA journal_mode=WAL')
+        return db
+
+    def get(self, key, now):
+        with self._connection() as db:
+            found = db.execute('SELECT value, expires_t FROM results WHERE key = ?', (key, )).fetchone()
+            if found is None:
+                return None
+            if found[1] <= now:
+                db.execute('DELETE FROM results WHERE key = ?', (key, ))
+                return None
+            db.execute('UPDATE results SET used_t = ? WHERE key = ?', (time.time(), key))
+        return json.loads(found[0])
+
+    def set(self, key, value, expires_t):
+        now = time.time()
+        with self._connection() as db:
+            db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)', (key, json.dumps(value), expires_t, now))
+            db.execute('DELETE FROM results WHERE expires_t <= ?', (now, ))
+            db.execute(
+                'DELETE FROM results WHERE key IN '
+                '(SELECT key FROM results ORDER BY used_t DESC LIMIT -1 OFFSET ?)', (self.max_entries, ))
+
+    def delete(self, key):
+        with self._connection() as db:
+            db.execute('DELETE FROM results WHERE key = ?', (key, ))
+
+    def clear(self):
+        with self._connection() as db:
+            db.execute('DELETE FROM results')
+
+    def __len__(self):
+        with self._connection() as db:
+            return db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+class ResultCache(object):
+    """ Result Cache
+
+    TTL expiry over a pluggable LRU backend, with hit and miss counts.
+    """
+
+    def __init__(self, backend=None, ttl=DEFAULT_TTL):
+        """ New Result Cache
+
+        :param backend: a MemoryBackend (the default) or SQLiteBackend
+        :param float ttl: seconds an entry stays valid
+        :raises: ValueError for an invalid ttl
+        """
+
+        if ttl <= 0.0:
+            raise ValueError('"ttl" must be a positive number of seconds')
+
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """ Get Entry
+
+        :param str key: the cache key, see `cache_key()`
+        :returns: the cached value, or None on a miss
+        """
+
+        value = self.backend.get(key, time.time())
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        """ Set Entry
+
+        :param str key: the cache key, see `cache_key()`
+        :param value: a JSON value, e.g. a list of table lines
+        :param float ttl: seconds this entry stays valid, default the cache `ttl`
+        """
+
+        self.backend.set(key, value, time.time() + (self.ttl if ttl is None else ttl))
+
+    def invalidate(self, key):
+        self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
+
+    def __len__(self):
+        return len(self.backend)
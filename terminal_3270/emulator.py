@@ -5,8 +5,17 @@ The extra methods provide important features.
 """
 
 import logging
+import re
+import threading
+from contextlib import contextmanager
+from timeit import default_timer as timer
 
 from py3270 import Emulator
+from terminal_3270.fields import NUMERIC_CHARS, FieldMap
+from terminal_3270.metrics import action_type
+from terminal_3270.registry import ScreenRegistry
+from terminal_3270.screen import ENCODING, Screen
+from terminal_3270.transcript import RecordingApp
 from terminal_3270.wait_until import WaitUntil
 
 log = logging.getLogger(__name__)
@@ -20,12 +29,322 @@ class ScreenWaitError(EmulatorError):
     pass
 
 
+class Action(str):
+    """ s3270 Action
+
+    Mark a string as a raw s3270 action, e.g. "Tab()", rather than text to type.
+    Use these in `EmulatorPlus.key_sequence()` between the text entries.
+    """
+    pass
+
+
+TAB = Action('Tab()')
+BACK_TAB = Action('BackTab()')
+NEWLINE = Action('Newline()')
+ENTER = Action('Enter')
+
+
+# These s3270 actions never change the screen buffer, so a cached snapshot stays valid.
+SCREEN_READ_ACTIONS = (b'Ascii', b'Query', b'ReadBuffer', b'MoveCursor', b'PrintText')
+
+# An action name and its arguments; a quoted argument, e.g. String("a)b"), may hold any character.
+_ACTION = re.compile(br'([A-Za-z]+)\s*(?:\(((?:"(?:[^"\\]|\\.)*"|[^")])*)\))?')
+
+
+# These s3270 actions send an AID to the host, i.e. start a host transaction.
+AID_ACTIONS = (b'Enter', b'PF', b'PA', b'Clear', b'SysReq', b'Attn')
+
+# These Key() arguments press an AID key, e.g. Key(Enter) or Key(PF3).
+_AID_KEY = re.compile(br'^(?:Enter|Clear|SysReq|Attn|P[FA]\d+)$')
+
+
+def _action_names(cmdstr):
+    return [name for (name, arguments) in _ACTION.findall(cmdstr)]
+
+
+def aid_count(cmdstr):
+    """ AID Count
+
+    :param bytes cmdstr: an s3270 command line, with one or more actions
+    :returns: the number of AID actions on the line, including AID keys pressed with Key()
+    :rtype: int
+    """
+
+    count = 0
+    for (name, arguments) in _ACTION.findall(cmdstr):
+        if name in AID_ACTIONS or (name == b'Key' and _AID_KEY.match(arguments.strip())):
+            count += 1
+    return count
+
+
+def reads_only(cmdstr):
+    """ Reads Only
+
+    :param bytes cmdstr: an s3270 command line, with one or more actions
+    :returns: True when every action on the line leaves the screen buffer as it is
+    :rtype: bool
+    """
+
+    return all(name in SCREEN_READ_ACTIONS for name in _action_names(cmdstr))
+
+
+def key_actions(text):
+    """ Key Actions
+
+    Convert text into the s3270 Key() actions that type it one character at a time.
+
+    :param str text: this is the text to type into the local screen
+    :returns: a list of s3270 action strings
+    :rtype: list
+    """
+
+    return ['Key(U+{:04X})'.format(ord(ch)) for ch in text]
+
+
+def sequence_actions(entries):
+    """ Sequence Actions
+
+    Convert text entries and `Action` values into one list of s3270 actions.
+
+    :param list entries: text strings or `Action` values, in the order to type them
+    :returns: a list of s3270 action strings
+    :rtype: list
+    """
+
+    actions = []
+    for entry in entries:
+        if isinstance(entry, Action):
+            actions.append(str(entry))
+        else:
+            actions.extend(key_actions(entry))
+    return actions
+
+
+def check_status(status_text, terminator_strings=[], passing_strings=[]):
+    """ Check Status
+
+    Test a status bar string, see `EmulatorPlus.status_bar()`.
+
+    :param str status_text: the status bar
+    :param list terminator_strings: when non-empty, status is False when any of these match
+    :param list passing_strings: when non-empty, status is True when any of these match
+    :returns: the status
+    :rtype: bool
+    """
+
+    if terminator_strings:
+        return not any([(v.upper() in status_text) for v in terminator_strings])
+    elif passing_strings:
+        return any([(v.upper() in status_text) for v in passing_strings])
+    else:
+        return True
+
+
 class EmulatorPlus(Emulator):
     """ 3270 Emulator Plus
 
     This class extends the standard py3270.Emulator to add common 3270 commands.
+
+    The screen is read once into a `Screen` snapshot, see `snapshot()`.
+    It is cached until the next command that may change the screen,
+    so `string_get()`, `string_found()` and `status_bar()` read from memory.
+
+    Each command holds the emulator `lock`, a re-entrant lock.
+    Hold it around a multi-step job to keep other threads, e.g. a heartbeat, out until it ends.
+
+    A `wait_listener`, when set, is called as `wait_listener(seconds, found)` after each screen wait,
+    e.g. to report the host latency to a `terminal_3270.routing.HostRouter`.
     """
 
+    _screen = None
+    _field_map = None
+
+    def __init__(self, visible=False, timeout=30, app=None, args=None, app_class=None, metrics=None,
+                 record_to=None, adaptive=None, aid_limiter=None):
+        """ New EmulatorPlus
+
+        :param bool visible: when True, run x3270 instead of s3270
+        :param int timeout: the timeout to any Wait() command sent to s3270
+        :param app: an already started py3270 app to use instead of a new one
+        :param list args: extra emulator command line arguments
+        :param class app_class: a py3270 ExecutableApp class to start instead of s3270,
+            e.g. `terminal_3270.fakehost.FakeHostApp`
+        :param CommandMetrics metrics: when given, record every round trip, see `phase()`
+        :param record_to: a transcript file path (or open file) to record every command and response,
+            see `terminal_3270.transcript`
+        :param AdaptiveTimeouts adaptive: when given, learn the wait limits from the screen latency,
+            see `terminal_3270.adaptive`
+        :param TokenBucket aid_limiter: when given, take a token for every AID key (Enter, PF, PA, Clear),
+            see `terminal_3270.ratelimit`
+        """
+
+        self.app_class = app_class
+        self.metrics = metrics
+        self.adaptive = adaptive
+        self.aid_limiter = aid_limiter
+        self.wait_listener = None
+        self.current_phase = None
+        self.lock = threading.RLock()
+        self.last_activity_t = timer()
+        super(EmulatorPlus, self).__init__(visible=visible, timeout=timeout, app=app, args=args)
+
+        if record_to is not None:
+            self.app = RecordingApp(self.app, record_to)
+
+    def create_app(self, visible, args):
+        if self.app_class is not None:
+            return self.app_class(args)
+        return super(EmulatorPlus, self).create_app(visible, args)
+
+    def exec_command(self, cmdstr):
+        """ Execute an s3270 Command
+
+        Any command that may change the screen drops the cached snapshot first.
+        With an `aid_limiter`, an AID key waits for its token before it holds the `lock`.
+        """
+
+        if self.aid_limiter is not None:
+            for n in range(aid_count(cmdstr)):
+                self.aid_limiter.acquire()
+
+        with self.lock:
+            if not reads_only(cmdstr):
+                self._screen = None
+                self._field_map = None
+
+            start_t = timer()
+            try:
+                return super(EmulatorPlus, self).exec_command(cmdstr)
+            finally:
+                self.last_activity_t = timer()
+                if self.metrics is not None:
+                    self.metrics.record(action_type(cmdstr), self.last_activity_t - start_t, self.current_phase)
+
+    def idle_time(self):
+        """ Seconds since the last command ended """
+        return (timer() - self.last_activity_t)
+
+    @contextmanager
+    def phase(self, name):
+        """ Session Phase
+
+        Tag the commands in this with-block with a phase name for the `metrics`.
+
+            with emulator.phase('login'):
+                ...
+
+        :param str name: the phase, e.g. 'connect', 'login', 'signon', 'page_fetch' or 'signoff'
+        """
+
+        previous = self.current_phase
+        self.current_phase = name
+        try:
+            yield
+        finally:
+            self.current_phase = previous
+
+    def snapshot(self, refresh=False):
+        """ Screen Snapshot
+
+        Read the full screen buffer in a single Ascii() call.
+        The Screen is cached until the next AID key, keystroke or other screen-changing command.
+
+        :param bool refresh: when True, always read the screen again
+        :returns: the current screen
+        :rtype: Screen
+        """
+
+        if refresh or self._screen is None:
+            cmd = self.exec_command('Ascii()'.encode('ascii'))
+            self._screen = Screen(cmd.data)
+        return self._screen
+
+    def read_fields(self, refresh=False):
+        """ Read Fields
+
+        Read the screen's field attributes and values in a single ReadBuffer(Ascii) call.
+        The FieldMap is cached just like the `snapshot()`.
+
+        :param bool refresh: when True, always read the screen again
+        :returns: the screen fields
+        :rtype: FieldMap
+        """
+
+        if refresh or self._field_map is None:
+            cmd = self.exec_command('ReadBuffer(Ascii)'.encode('ascii'))
+            self._field_map = FieldMap.parse([line.decode('ascii') for line in cmd.data], encoding=ENCODING)
+        return self._field_map
+
+    def fill_fields(self, values, field_map=None):
+        """ Fill Fields
+
+        Type into several input fields in one round trip: each field is erased, then typed.
+
+            emulator.fill_fields({'USER ID': username, (11, 16): password})
+
+        :param dict values: {field: text}; a field is a label, a (row, col) tuple (1-based) or a Field
+        :param FieldMap field_map: the screen fields, default `read_fields()`
+        :raises: EmulatorError for an unknown or protected field, text longer than its field,
+            or text that a numeric field does not take
+        """
+
+        if field_map is None:
+            field_map = self.read_fields()
+
+        actions = []
+        for (key, text) in values.items():
+            try:
+                field = field_map.find(key)
+            except LookupError as e:
+                raise EmulatorError(str(e))
+
+            if field.protected:
+                raise EmulatorError('field {!r} is protected'.format(key))
+            if len(text) > field.length:
+                raise EmulatorError('"{}" does not fit field {!r} of length {}'.format(text, key, field.length))
+            if field.numeric and not NUMERIC_CHARS.issuperset(text):
+                raise EmulatorError('"{}" is not numeric for field {!r}'.format(text, key))
+
+            actions.append('MoveCursor({}, {})'.format(field.row - 1, field.col - 1))
+            actions.append('EraseEOF()')
+            actions.extend(key_actions(text))
+
+        self.exec_actions(actions)
+
+    def string_get(self, ypos, xpos, length):
+        """ Get String
+
+        Get a string of `length` at screen co-ordinates `ypos`/`xpos` from the screen snapshot.
+
+        :param int ypos: row where string starts (1-based)
+        :param int xpos: col where string starts (1-based)
+        :param int length: length of string
+        :rtype: str
+        """
+
+        return self.snapshot().region(ypos, xpos, length)
+
+    def string_found(self, ypos, xpos, string):
+        """ String Found
+
+        Compare `string` at screen co-ordinates `ypos`/`xpos` on the screen snapshot, without decoding it.
+
+        :param int ypos: row where string starts (1-based)
+        :param int xpos: col where string starts (1-based)
+        :param str string: the text that should be there
+        :rtype: bool
+        """
+
+        return self.snapshot().found(ypos, xpos, string)
+
+    def _string_found_fresh(self, ypos, xpos, string):
+        """ String Found on a Fresh Screen Read
+
+        Polling loops must see the host's new output, so never use the cached snapshot.
+        """
+
+        return self.snapshot(refresh=True).found(ypos, xpos, string)
+
     def send_clear(self):
         self.exec_command('Clear()'.encode('ascii'))
 
@@ -38,17 +357,50 @@ class EmulatorPlus(Emulator):
     def send_tab(self):
         self.exec_command('Tab()'.encode('ascii'))
 
-    def key_entry(self, text):
+    def exec_actions(self, actions):
+        """ Execute Actions
+
+        Send several s3270 actions on one command line.
+        s3270 runs them in order, so this costs one round trip instead of one per action.
+
+        :param list actions: s3270 action strings, e.g. ['Key(U+0041)', 'Tab()']
+        :returns: the py3270 Command result
+        """
+
+        if actions:
+            return self.exec_command(' '.join(actions).encode('ascii'))
+
+    def key_entry(self, text, batch=False):
         """ Key Entry
 
         Type the key entry into a local field without sending it to the server.
         This must be done to enter text into a `protected field` such as a username or password.
 
         :param str text: this is the text to type into the local screen
+        :param bool batch: when True, send every Key() action in one s3270 round trip
+        """
+
+        if batch:
+            self.exec_actions(key_actions(text))
+        else:
+            for action in key_actions(text):
+                self.exec_command(action.encode('ascii'))
+
+    def key_sequence(self, *entries):
+        """ Key Sequence
+
+        Type a sequence of text entries and s3270 actions in one round trip.
+        Text is typed with Key() actions, just like `key_entry()`, so protected fields still work.
+
+            emulator.key_sequence(username, TAB, password, ENTER)
+
+        An AID action, such as ENTER, locks the keyboard until the host answers.
+        Put it last in the sequence.
+
+        :param entries: text strings or `Action` values, in the order to type them
         """
 
-        for ch in text:
-            self.exec_command('Key(U+{:04X})'.format(ord(ch)).encode('ascii'))
+        self.exec_actions(sequence_actions(entries))
 
     def format_screen(self, screen_name):
         """ Format Screen
@@ -60,7 +412,7 @@ class EmulatorPlus(Emulator):
 
         self.send_clear()
         self.move_to(1, 1)
-        self.key_entry("/FOR {}".format(screen_name))
+        self.key_entry("/FOR {}".format(screen_name), batch=True)
         self.send_enter()
 
     def screen_command(self, command_name, cmd_row=1, cmd_column=10):
@@ -74,9 +426,22 @@ class EmulatorPlus(Emulator):
         """
 
         self.move_to(cmd_row, cmd_column)
-        self.key_entry(command_name)
+        self.key_entry(command_name, batch=True)
         self.send_enter()
 
+    def classify(self, registry, refresh=False):
+        """ Classify Screen
+
+        Identify the current screen with a `ScreenRegistry`, from one screen read.
+
+        :param ScreenRegistry registry: the named screen definitions
+        :param bool refresh: when True, always read the screen again
+        :returns: the matched screen name and its fields, or None when no screen matches
+        :rtype: ScreenMatch
+        """
+
+        return registry.classify(self.snapshot(refresh=refresh))
+
     def status_bar(self, terminator_strings=[], passing_strings=[], status_row=24):
         """ Status Bar
 
@@ -103,15 +468,29 @@ class EmulatorPlus(Emulator):
         status_text = self.string_get(status_row, 1, 80)
         log.debug('STATUS-BAR: [{}]'.format(status_text))
 
-        if terminator_strings:
-            status_ok = not any([(v.upper() in status_text) for v in terminator_strings])
-        elif passing_strings:
-            status_ok = any([(v.upper() in status_text) for v in passing_strings])
-        else:
-            status_ok = True
-        return (status_ok, status_text)
+        return (check_status(status_text, terminator_strings, passing_strings), status_text)
+
+    def _wait_limit(self, key, time_limit):
+        """ Adaptive Wait Limit
+
+        :returns: the adaptive key, tagged with the session phase, and the wait limit;
+            the key is None without `adaptive` timeouts
+        :rtype: tuple, (str, float)
+        """
 
-    def wait_for_screen(self, screen_str, row_loc, col_loc, time_limit=0.750):
+        if self.adaptive is None:
+            return (None, time_limit)
+        if self.current_phase is not None:
+            key = '{}:{}'.format(self.current_phase, key)
+        return (key, self.adaptive.time_limit(key, time_limit))
+
+    def _record_wait(self, key, wait_until, found):
+        if key is not None:
+            self.adaptive.record(key, wait_until.elapsed, found)
+        if self.wait_listener is not None:
+            self.wait_listener(wait_until.elapsed, found)
+
+    def wait_for_screen(self, screen_str, row_loc, col_loc, time_limit=0.750, key=None):
         """ Wait for Screen to Render.
 
         Wait until the new screen renders the `screen_str` at location (row_loc, col_loc).
@@ -121,16 +500,163 @@ class EmulatorPlus(Emulator):
         :param str screen_str: a string on the screen that should be ready
         :param int row_loc: row where string starts (1-based)
         :param int col_loc: col where string starts (1-based)
-        :param float time_limit: a time limit in seconds to wait
+        :param float time_limit: a time limit in seconds to wait; the default limit with `adaptive` timeouts
+        :param str key: the `adaptive` timeouts key, default the `screen_str`
         :raises: ScreenWaitError when the `time_limit` is reached
         """
 
-        wait_until = WaitUntil(time_limit, self.string_found, *(row_loc, col_loc, screen_str))
+        (key, time_limit) = self._wait_limit(key or screen_str, time_limit)
+        wait_until = WaitUntil(time_limit, self._string_found_fresh, *(row_loc, col_loc, screen_str))
         wait_until.poll()
+        log.debug('wait_for_screen({!r}) probes={} elapsed={}'.format(screen_str, wait_until.probes, wait_until.elapsed))
+        self._record_wait(key, wait_until, wait_until.found)
 
-        if wait_until.expired:
+        if not wait_until.found:
             raise ScreenWaitError('next screen did not appear in {} seconds'.format(time_limit))
 
+    def _any_found_fresh(self, conditions, matched):
+        """ Any Condition Found on One Fresh Screen Read """
+
+        screen = self.snapshot(refresh=True)
+        for (name, condition) in conditions:
+            if isinstance(condition, ScreenRegistry):
+                match = condition.classify(screen)
+                if match is not None:
+                    matched.append(match.name)
+                    return True
+                continue
+
+            if callable(condition):
+                found = condition(screen)
+            else:
+                (screen_str, row_loc, col_loc) = condition
+                found = screen.found(row_loc, col_loc, screen_str)
+
+            if found:
+                matched.append(name)
+                return True
+        return False
+
+    def wait_for_any(self, conditions, time_limit=0.750, key=None):
+        """ Wait for Any Screen.
+
+        Wait until one of several screens renders, e.g. to branch on success vs failure.
+        Every poll reads the screen once and checks all the conditions against it, in order.
+
+            (name, elapsed) = emulator.wait_for_any([
+                ('rejected', ('REJECTED', 2, 2)),
+                ('changed', lambda screen: screen != before),
+            ], time_limit=0.300)
+
+        :param list conditions: (name, condition) pairs; a condition is a (screen_str, row, col) tuple,
+            a callable(screen) that returns True when it matches, or a ScreenRegistry,
+            which classifies the screen in one pass; its matched screen name is the outcome
+        :param float time_limit: a time limit in seconds to wait; the default limit with `adaptive` timeouts
+        :param str key: the `adaptive` timeouts key, default the condition names, e.g. 'rejected|changed'
+        :returns: the first matched condition name and the seconds elapsed
+        :rtype: tuple, (str, float)
+        :raises: ScreenWaitError when the `time_limit` is reached
+        """
+
+        names = [name for (name, condition) in conditions]
+        (key, time_limit) = self._wait_limit(key or '|'.join(names), time_limit)
+
+        matched = []
+        wait_until = WaitUntil(time_limit, self._any_found_fresh, conditions, matched)
+        wait_until.poll()
+        log.debug('wait_for_any({!r}) probes={} elapsed={}'.format(names, wait_until.probes, wait_until.elapsed))
+        self._record_wait(key, wait_until, bool(matched))
+
+        if not matched:
+            raise ScreenWaitError('no expected screen appeared in {} seconds'.format(time_limit))
+        return (matched[0], wait_until.elapsed)
+
+    def _screen_changed(self, screen, row=None):
+        """ Screen Changed on a Fresh Screen Read """
+
+        current = self.snapshot(refresh=True)
+        if row is None:
+            return current != screen
+        return current.row(row) != screen.row(row)
+
+    def wait_for_change(self, screen, time_limit=0.750, row=None, key=None):
+        """ Wait for Screen to Change.
+
+        Wait until the host draws over the `screen` snapshot, taken before an AID key.
+        This ends as soon as the host answers; the `time_limit` is only an upper bound.
+
+            before = emulator.snapshot()
+            emulator.send_enter()
+            emulator.wait_for_change(before, time_limit=0.300)
+
+        :param Screen screen: the screen snapshot before the AID key
+        :param float time_limit: a time limit in seconds to wait; the default limit with `adaptive` timeouts
+        :param int row: when given, only watch this row (1-based), e.g. the status bar
+        :param str key: the `adaptive` timeouts key, default 'change'
+        :returns: True when the screen changed, False when the `time_limit` is reached
+        :rtype: bool
+        """
+
+        (key, time_limit) = self._wait_limit(key or 'change', time_limit)
+        wait_until = WaitUntil(time_limit, self._screen_changed, screen, row=row)
+        wait_until.poll()
+        log.debug('wait_for_change() probes={} elapsed={}'.format(wait_until.probes, wait_until.elapsed))
+        self._record_wait(key, wait_until, wait_until.found)
+
+        return wait_until.found
+
+    def wait_until_stable(self, before=None, stable_reads=2, quiet_time=None, time_limit=0.750, key=None):
+        """ Wait until the Screen is Stable.
+
+        Wait for a screen with no reliable anchor text to finish rendering.
+        The screen is settled after `stable_reads` fresh reads in a row show no change,
+        or, with a `quiet_time`, after that many seconds without a change.
+        With the `before` screen, the host must first change the screen from it,
+        so the screen before the AID key is never taken as settled.
+
+            before = emulator.snapshot()
+            emulator.send_enter()
+            screen = emulator.wait_until_stable(before, stable_reads=3, time_limit=0.500)
+
+        :param Screen before: the screen snapshot before the AID key, or None to take any screen
+        :param int stable_reads: unchanged reads in a row that settle the screen
+        :param float quiet_time: seconds without a change that settle the screen
+        :param float time_limit: a time limit in seconds to wait; the default limit with `adaptive` timeouts
+        :param str key: the `adaptive` timeouts key, default 'stable'
+        :returns: the settled screen
+        :rtype: Screen
+        :raises: ScreenWaitError when the screen keeps changing, or never changes from `before`, until the `time_limit`
+        """
+
+        state = {'screen': None, 'unchanged': 0, 'changed_t': timer()}
+
+        def settled():
+            screen = self.snapshot(refresh=True)
+            now = timer()
+
+            if state['screen'] is None and before is not None and screen == before:
+                return False  # the host has not answered yet
+
+            if screen == state['screen']:
+                state['unchanged'] += 1
+            else:
+                state['screen'] = screen
+                state['unchanged'] = 0
+                state['changed_t'] = now
+
+            return (state['unchanged'] >= stable_reads or
+                    (quiet_time is not None and (now - state['changed_t']) >= quiet_time))
+
+        (key, time_limit) = self._wait_limit(key or 'stable', time_limit)
+        wait_until = WaitUntil(time_limit, settled)
+        wait_until.poll()
+        log.debug('wait_until_stable() probes={} elapsed={}'.format(wait_until.probes, wait_until.elapsed))
+        self._record_wait(key, wait_until, wait_until.found)
+
+        if not wait_until.found:
+            raise ScreenWaitError('screen did not settle in {} seconds'.format(time_limit))
+        return state['screen']
+
     def get_special_char_str(self, ypos, xpos, length):
         """
             Get a string of `length` at screen co-ordinates `ypos`/`xpos`
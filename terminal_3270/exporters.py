@@ -0,0 +1,197 @@
+""" Streaming Result Exporters
+
+Write ScreenTable results to NDJSON or CSV as they are fetched, in constant memory.
+Rows are buffered up to `buffer_rows`, and the file is flushed at least every `flush_interval` seconds,
+so a long extraction can be tailed while it runs. A ".gz" path is gzip-compressed.
+
+    with NDJSONExporter('orders.ndjson.gz') as exporter:
+        exporter.write_all(screen_table.fetch_results())
+
+    with CSVExporter('orders.csv', columns=schema.names) as exporter:
+        exporter.write_all(screen_table.fetch_results())
+"""
+
+import csv
+import gzip
+import io
+import json
+from timeit import default_timer as timer
+
+DEFAULT_BUFFER_ROWS = 500
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+
+
+def _row_fields(row):
+    """ A row's (names, values); names are None for a plain tuple or list """
+
+    if isinstance(row, dict):
+        return (list(row.keys()), list(row.values()))
+    elif hasattr(row, '_fields'):
+        return (list(row._fields), list(row))
+    return (None, list(row))
+
+
+class RowExporter(object):
+    """ Row Exporter
+
+    Buffered, periodically flushed text output for rows. Subclasses format the rows.
+    """
+
+    def __init__(self, output, compress=None, buffer_rows=DEFAULT_BUFFER_ROWS,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """ New Row Exporter
+
+        :param output: a file path, or an open text file
+        :param bool compress: gzip the file; default True for a path ending in ".gz"
+        :param int buffer_rows: write the buffered rows when this many are waiting
+        :param float flush_interval: flush the file when this many seconds passed since the last flush
+        :raises: ValueError for an invalid buffer_rows
+        """
+
+        if buffer_rows < 1:
+            raise ValueError('"buffer_rows" must be at least 1')
+
+        if hasattr(output, 'write'):
+            self.file = output
+            self._owns_file = False
+        else:
+            if compress is None:
+                compress = output.endswith('.gz')
+            if compress:
+                self.file = gzip.open(output, 'wt', encoding='utf-8', newline='')
+            else:
+                self.file = io.open(output, 'w', encoding='utf-8', newline='')
+            self._owns_file = True
+
+        self.buffer_rows = buffer_rows
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+
+        self._buffer = []
+        self._flush_t = timer()
+        self._closed = False
+
+    def __enter__(self):
+        """ Enter Context Manager """
+        return self
+
+    def __exit__(self, *args):
+        """ Exit Context Manager """
+        self.close()
+
+    def format_row(self, row):
+        """ Format one row as output text, with its line end """
+        raise NotImplementedError('Format the row here!')
+
+    def write(self, row):
+        """ Write Row
+
+        :param row: a dict, namedtuple, tuple or list
+        """
+
+        self._buffer.append(self.format_row(row))
+        self.rows_written += 1
+
+        if len(self._buffer) >= self.buffer_rows:
+            self._write_buffer()
+        if (timer() - self._flush_t) >= self.flush_interval:
+            self.flush()
+
+    def write_all(self, rows):
+        """ Write All Rows
+
+        Consume a row iterable, e.g. `ScreenTable.fetch_results()`, then flush.
+
+        :param iterable rows: the rows to write
+        :returns: the number of rows written
+        :rtype: int
+        """
+
+        count = 0
+        for row in rows:
+            self.write(row)
+            count += 1
+        self.flush()
+        return count
+
+    def _write_buffer(self):
+        if self._buffer:
+            self.file.write(''.join(self._buffer))
+            self._buffer = []
+
+    def flush(self):
+        """ Write the buffered rows and flush the file, so it can be read while the export runs. """
+
+        self._write_buffer()
+        self.file.flush()
+        self._flush_t = timer()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        self.flush()
+        if self._owns_file:
+            self.file.close()
+
+
+class NDJSONExporter(RowExporter):
+    """ NDJSON Exporter
+
+    One JSON value per line: dict and namedtuple rows are objects, other rows are arrays.
+    """
+
+    def format_row(self, row):
+        (names, values) = _row_fields(row)
+        value = values if names is None else dict(zip(names, values))
+        return json.dumps(value, separators=(',', ':'), default=str) + '\n'
+
+
+class CSVExporter(RowExporter):
+    """ CSV Exporter
+
+    The header row is `columns`, or the names of the first dict or namedtuple row.
+    Dict rows are written in `columns` order.
+    """
+
+    def __init__(self, output, columns=None, header=True, dialect='excel', **options):
+        """ New CSV Exporter
+
+        :param output: a file path, or an open text file
+        :param list columns: the column names, default from the first row
+        :param bool header: when True, write the header row first
+        :param str dialect: the csv module dialect
+        :param dict options: RowExporter options, e.g. `buffer_rows`
+        """
+
+        super(CSVExporter, self).__init__(output, **options)
+
+        self.columns = list(columns) if columns is not None else None
+        self.header = header
+        self.dialect = dialect
+
+        self._line = io.StringIO()
+        self._writer = csv.writer(self._line, dialect=dialect)
+        self._header_written = False
+
+    def _format_values(self, values):
+        self._line.seek(0)
+        self._line.truncate()
+        self._writer.writerow(values)
+        return self._line.getvalue()
+
+    def format_row(self, row):
+        if isinstance(row, dict) and self.columns is not None:
+            values = [row.get(name) for name in self.columns]
+        else:
+            (names, values) = _row_fields(row)
+            if self.columns is None:
+                self.columns = names
+
+        text = self._format_values(values)
+        if self.header and not self._header_written:
+            self._header_written = True
+            if self.columns is not None:
+                text = self._format_values(self.columns) + text
+        return text
@@ -0,0 +1,768 @@
+""" Fake 3270 Host
+
+A local stand-in for s3270 and a mainframe, for offline tests and benchmarks.
+It speaks the s3270 scripting protocol on stdin/stdout and serves scripted screens:
+
+    * ACF2 (REGION) or RACF (APPLICATION) login, then USERID and PASSWORD
+    * queued screens, removed by CLEAR and PA2
+    * the "/FOR VOS1SIGN" WFAC SECURITY SIGNON screen, for SIGNON and SIGNOFF
+    * paged "FIND SUCCESSFUL" / "LAST PAGE" result tables, on any other "/FOR <screen>"
+
+Run it in place of /usr/bin/s3270:
+
+    session = RACFSignOnSession(
+        'USER0001', 'PASSWORD', 'TST01', 'SIGNUSER', 'SIGNPASS', 'fake.host.org',
+        app_class=FakeHostApp, args=['--mode', 'racf', '--latency', 'enter=0.030'])
+
+OR run it in-process, without a subprocess:
+
+    emulator = EmulatorPlus(app=InProcessApp(FakeHost(FakeHostConfig(mode='racf'))))
+
+The command line is `python -m terminal_3270.fakehost --help`.
+"""
+
+import argparse
+import re
+import sys
+import time
+
+from py3270 import ExecutableApp
+
+ROWS = 24
+COLS = 80
+
+DEFAULT_ROWS_PER_PAGE = 13  # table rows 11..23
+
+
+class FakeHostError(Exception):
+    pass
+
+
+class FakeHostConfig(object):
+    """ Fake Host Configuration
+
+    Credentials, screen flow options and per-AID response latency.
+    """
+
+    AID_KEYS = ('enter', 'pf', 'pa', 'clear')
+
+    def __init__(self, mode='acf2', username='USER0001', password='PASSWORD', app_id='TST01',
+                 signon_username='SIGNUSER', signon_password='SIGNPASS', signon_screen='VOS1SIGN',
+                 queued_screens=0, results=30, require_signon=False, latency=None):
+        """ New Fake Host Configuration
+
+        :param str mode: the login flow, 'acf2' or 'racf'
+        :param str username: login user
+        :param str password: login password
+        :param str app_id: the ACF2 REGION or RACF APPLICATION
+        :param str signon_username: signon user; the USER ID field is exactly this long
+        :param str signon_password: signon password
+        :param str signon_screen: the "/FOR <signon_screen>" name
+        :param int queued_screens: queued screens waiting after login
+        :param int results: rows in each result table
+        :param bool require_signon: when True, inquiries before SIGNON show "SIGNON REQUIRED"
+        :param dict latency: seconds of delay per AID key: 'enter', 'pf', 'pa' and 'clear'
+        """
+
+        if mode not in ('acf2', 'racf'):
+            raise ValueError('"mode" must be "acf2" or "racf"')
+
+        self.mode = mode
+        self.username = username
+        self.password = password
+        self.app_id = app_id
+        self.signon_username = signon_username
+        self.signon_password = signon_password
+        self.signon_screen = signon_screen
+        self.queued_screens = queued_screens
+        self.results = results
+        self.require_signon = require_signon
+        self.latency = dict.fromkeys(self.AID_KEYS, 0.0)
+        self.latency.update(latency or {})
+
+    @classmethod
+    def from_args(cls, argv):
+        """ Fake Host Configuration from command line arguments
+
+        s3270 options such as "-xrm <resource>" are accepted and ignored.
+
+        :param list argv: command line arguments
+        :rtype: FakeHostConfig
+        """
+
+        parser = argparse.ArgumentParser(prog='python -m terminal_3270.fakehost', description='Fake s3270 host')
+        parser.add_argument('--mode', choices=['acf2', 'racf'], default='acf2')
+        parser.add_argument('--username', default='USER0001')
+        parser.add_argument('--password', default='PASSWORD')
+        parser.add_argument('--app-id', default='TST01')
+        parser.add_argument('--signon-username', default='SIGNUSER')
+        parser.add_argument('--signon-password', default='SIGNPASS')
+        parser.add_argument('--signon-screen', default='VOS1SIGN')
+        parser.add_argument('--queued-screens', type=int, default=0)
+        parser.add_argument('--results', type=int, default=30)
+        parser.add_argument('--require-signon', action='store_true')
+        parser.add_argument('--latency', default='',
+                            help='seconds per AID key, e.g. "0.030" or "enter=0.030,pf=0.050,pa=0.010,clear=0.010"')
+        parser.add_argument('-xrm', action='append', default=[], help=argparse.SUPPRESS)
+
+        options = parser.parse_args(argv)
+
+        return cls(mode=options.mode, username=options.username, password=options.password,
+                   app_id=options.app_id, signon_username=options.signon_username,
+                   signon_password=options.signon_password, signon_screen=options.signon_screen,
+                   queued_screens=options.queued_screens, results=options.results,
+                   require_signon=options.require_signon, latency=parse_latency(options.latency))
+
+
+def parse_latency(spec):
+    """ Parse Latency
+
+    :param str spec: "0.030" for every AID key, or "enter=0.030,pf=0.050"
+    :returns: seconds by AID key
+    :rtype: dict
+    """
+
+    latency = {}
+    for item in filter(None, spec.split(',')):
+        if '=' in item:
+            (key, seconds) = item.split('=', 1)
+            key = key.strip().lower()
+            if key not in FakeHostConfig.AID_KEYS:
+                raise ValueError('unknown AID key "{}" in latency'.format(key))
+            latency[key] = float(seconds)
+        else:
+            latency.update(dict.fromkeys(FakeHostConfig.AID_KEYS, float(item)))
+    return latency
+
+
+_ACTION_NAME = re.compile(r'\s*([A-Za-z][A-Za-z0-9]*)')
+
+
+def parse_actions(line):
+    """ Parse Actions
+
+    Split an s3270 command line into actions, e.g. 'Key(U+0041) String("a, b") Enter'.
+
+    :param str line: the command line
+    :returns: a list of (name, [arguments]) tuples
+    :rtype: list
+    :raises: FakeHostError on a syntax error
+    """
+
+    actions = []
+    pos = 0
+    while pos < len(line):
+        if line[pos].isspace():
+            pos += 1
+            continue
+
+        match = _ACTION_NAME.match(line, pos)
+        if not match:
+            raise FakeHostError('Syntax error at "{}"'.format(line[pos:]))
+        name = match.group(1)
+        pos = match.end()
+
+        arguments = []
+        if pos < len(line) and line[pos] == '(':
+            pos += 1
+            current = ''
+            quoted = was_quoted = False
+            while True:
+                if pos >= len(line):
+                    raise FakeHostError('Missing ")"')
+                ch = line[pos]
+                pos += 1
+                if quoted:
+                    if ch == '\\' and pos < len(line):
+                        current += line[pos]
+                        pos += 1
+                    elif ch == '"':
+                        quoted = False
+                    else:
+                        current += ch
+                elif ch == '"':
+                    quoted = was_quoted = True
+                elif ch in ',)':
+                    if ch == ',' or was_quoted or current.strip() or arguments:
+                        arguments.append(current if was_quoted else current.strip())
+                    current = ''
+                    was_quoted = False
+                    if ch == ')':
+                        break
+                else:
+                    current += ch
+
+        actions.append((name, arguments))
+    return actions
+
+
+class FakeField(object):
+    """ Fake Screen Field
+
+    An input field; `offset` is the buffer offset of its first character.
+    When an `autoskip` field is full, the cursor moves on to the next field.
+    """
+
+    def __init__(self, name, offset, length, hidden=False, numeric=False, autoskip=False):
+        self.name = name
+        self.offset = offset
+        self.length = length
+        self.hidden = hidden
+        self.numeric = numeric
+        self.autoskip = autoskip
+
+    @property
+    def end(self):
+        return self.offset + self.length
+
+    def __contains__(self, offset):
+        return self.offset <= offset < self.end
+
+
+class FakeScreen(object):
+    """ Fake Screen
+
+    A screen buffer with protected text and unprotected input fields.
+    A screen with no fields is unformatted, so any position takes input.
+    """
+
+    def __init__(self, name, rows=ROWS, cols=COLS):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.buffer = [' '] * (rows * cols)
+        self.fields = []
+        self.cursor = 0
+
+    def offset(self, row, col):
+        return (row - 1) * self.cols + (col - 1)
+
+    def text(self, row, col, text):
+        """ Write protected text at (row, col), 1-based. """
+
+        start = self.offset(row, col)
+        self.buffer[start:(start + len(text))] = list(text)
+        return self
+
+    def field(self, name, row, col, length, hidden=False, numeric=False, autoskip=False):
+        """ Add an input field at (row, col), 1-based. The first field gets the cursor. """
+
+        field = FakeField(name, self.offset(row, col), length, hidden=hidden, numeric=numeric, autoskip=autoskip)
+        if not self.fields:
+            self.cursor = field.offset
+        self.fields.append(field)
+        return self
+
+    @property
+    def formatted(self):
+        return bool(self.fields)
+
+    def field_at(self, offset):
+        for field in self.fields:
+            if offset in field:
+                return field
+        return None
+
+    def field_named(self, name):
+        for field in self.fields:
+            if field.name == name:
+                return field
+        return None
+
+    def value(self, name):
+        field = self.field_named(name)
+        return ''.join(self.buffer[field.offset:field.end]).strip()
+
+    def clear_field(self, name):
+        field = self.field_named(name)
+        self.buffer[field.offset:field.end] = [' '] * field.length
+
+    def row_text(self, row):
+        start = self.offset(row, 1)
+        return ''.join(self.buffer[start:(start + self.cols)])
+
+    def display(self):
+        """ The screen as s3270 shows it: hidden fields are blank. """
+
+        shown = list(self.buffer)
+        for field in self.fields:
+            if field.hidden:
+                shown[field.offset:field.end] = [' '] * field.length
+        return ''.join(shown)
+
+    def next_field(self, offset):
+        """ The first field after `offset`, wrapping around the screen. """
+
+        if not self.fields:
+            return None
+        for field in sorted(self.fields, key=lambda f: f.offset):
+            if field.offset > offset:
+                return field
+        return min(self.fields, key=lambda f: f.offset)
+
+    def previous_field(self, offset):
+        if not self.fields:
+            return None
+        for field in sorted(self.fields, key=lambda f: f.offset, reverse=True):
+            if field.offset < offset:
+                return field
+        return max(self.fields, key=lambda f: f.offset)
+
+
+class FakeHost(object):
+    """ Fake Host
+
+    The s3270 scripting protocol and the screen flows of a fake mainframe.
+    `execute()` runs one command line and returns the s3270 response lines.
+    """
+
+    def __init__(self, config=None, sleep=time.sleep):
+        """ New Fake Host
+
+        :param FakeHostConfig config: the fake host configuration
+        :param callable sleep: sleep(seconds) for the AID latency
+        """
+
+        self.config = config or FakeHostConfig()
+        self.sleep = sleep
+
+        self.connected_host = None
+        self.screen = FakeScreen('disconnected')
+        self.keyboard = 'U'
+        self.quit = False
+
+        self.signed_on = False
+        self.queued = 0
+        self.results_page = 0
+        self.results_query = None
+
+    # =========================================================================
+    # s3270 Protocol
+    # =========================================================================
+
+    def status_line(self):
+        """ The s3270 status line after each command. """
+
+        screen = self.screen
+        connection = 'C({})'.format(self.connected_host) if self.connected_host else 'N'
+        return '{} {} {} {} I 2 {} {} {} {} 0x0 -'.format(
+            self.keyboard,
+            'F' if screen.formatted else 'U',
+            'U' if (not screen.formatted or screen.field_at(screen.cursor)) else 'P',
+            connection,
+            screen.rows, screen.cols,
+            screen.cursor // screen.cols, screen.cursor % screen.cols)
+
+    def execute(self, line):
+        """ Execute Command Line
+
+        :param str line: one s3270 command line, with one or more actions
+        :returns: the response lines: "data: " lines, the status line, then "ok" or "error"
+        :rtype: list
+        """
+
+        data = []
+        try:
+            for (name, arguments) in parse_actions(line):
+                action = getattr(self, 'action_' + name.lower(), None)
+                if action is None:
+                    raise FakeHostError('Unknown action: {}'.format(name))
+                data.extend(action(*arguments) or [])
+        except (FakeHostError, TypeError, ValueError) as e:
+            return ['data: {}'.format(e), self.status_line(), 'error']
+
+        return ['data: {}'.format(d) for d in data] + [self.status_line(), 'ok']
+
+    def action_quit(self):
+        self.quit = True
+
+    def action_connect(self, host):
+        self.connected_host = host
+        self.signed_on = False
+        self.queued = self.config.queued_screens
+        self.show(self.login_screen())
+
+    def action_disconnect(self):
+        self.connected_host = None
+        self.show(FakeScreen('disconnected'))
+
+    def action_query(self, *arguments):
+        if arguments and arguments[0].lower() == 'connectionstate':
+            return ['C({})'.format(self.connected_host) if self.connected_host else 'N']
+
+    def action_wait(self, *arguments):
+        pass  # the fake host answers every AID before the command returns
+
+    def action_printtext(self, *arguments):
+        pass
+
+    def action_ascii(self, *arguments):
+        screen = self.screen
+        text = screen.display()
+        numbers = [int(a) for a in arguments]
+
+        if not numbers:
+            return [text[(r * screen.cols):((r + 1) * screen.cols)] for r in range(screen.rows)]
+        elif len(numbers) == 1:
+            return [text[screen.cursor:(screen.cursor + numbers[0])]]
+        elif len(numbers) == 3:
+            start = numbers[0] * screen.cols + numbers[1]
+            return [text[start:(start + numbers[2])]]
+        elif len(numbers) == 4:
+            (row, col, rows, cols) = numbers
+            return [text[((row + r) * screen.cols + col):((row + r) * screen.cols + col + cols)] for r in range(rows)]
+        raise FakeHostError('Ascii: wrong number of arguments')
+
+    def action_readbuffer(self, mode='Ascii'):
+        """ ReadBuffer(Ascii): each position as hex ASCII, or SF(c0=xx) for a field attribute """
+
+        if mode.lower() != 'ascii':
+            raise FakeHostError('ReadBuffer: only Ascii mode')
+
+        screen = self.screen
+        size = screen.rows * screen.cols
+        attributes = {}
+        for field in screen.fields:
+            # Protected text resumes after each input field, unless another field starts there.
+            attributes.setdefault(field.end % size, 0x60)
+
+        for field in screen.fields:
+            attribute = 0x40
+            if field.numeric:
+                attribute |= 0x10
+            if field.hidden:
+                attribute |= 0x0C
+            attributes[(field.offset - 1) % size] = attribute
+
+        tokens = []
+        for (offset, ch) in enumerate(screen.buffer):
+            if offset in attributes:
+                tokens.append('SF(c0={:02x})'.format(attributes[offset]))
+            else:
+                tokens.append('{:02x}'.format(ord(ch)))
+
+        return [' '.join(tokens[(r * screen.cols):((r + 1) * screen.cols)]) for r in range(screen.rows)]
+
+    def action_movecursor(self, row, col):
+        self.screen.cursor = int(row) * self.screen.cols + int(col)
+
+    def action_home(self):
+        field = self.screen.next_field(-1)
+        self.screen.cursor = field.offset if field else 0
+
+    def action_tab(self):
+        field = self.screen.next_field(self.screen.cursor)
+        if field:
+            self.screen.cursor = field.offset
+
+    def action_backtab(self):
+        field = self.screen.field_at(self.screen.cursor)
+        if field and self.screen.cursor > field.offset:
+            self.screen.cursor = field.offset
+            return
+        field = self.screen.previous_field(self.screen.cursor)
+        if field:
+            self.screen.cursor = field.offset
+
+    def action_newline(self):
+        screen = self.screen
+        next_row = (screen.cursor // screen.cols + 1) % screen.rows
+        field = screen.next_field(next_row * screen.cols - 1)
+        screen.cursor = field.offset if field else next_row * screen.cols
+
+    def action_key(self, key):
+        if key.upper().startswith('U+'):
+            self.type_char(chr(int(key[2:], 16)))
+        elif len(key) == 1:
+            self.type_char(key)
+        else:
+            raise FakeHostError('Key: unknown key "{}"'.format(key))
+
+    def action_string(self, text):
+        for ch in text:
+            self.type_char(ch)
+
+    def action_deletefield(self):
+        field = self.screen.field_at(self.screen.cursor)
+        if field is None:
+            raise FakeHostError('Keyboard locked')
+        self.screen.clear_field(field.name)
+        self.screen.cursor = field.offset
+
+    def action_eraseeof(self):
+        screen = self.screen
+        field = screen.field_at(screen.cursor)
+        if field is None:
+            raise FakeHostError('Keyboard locked')
+        screen.buffer[screen.cursor:field.end] = [' '] * (field.end - screen.cursor)
+
+    def action_enter(self):
+        self.aid('enter', self.on_enter)
+
+    def action_clear(self):
+        self.aid('clear', self.on_clear)
+
+    def action_pf(self, number):
+        self.aid('pf', self.on_pf, int(number))
+
+    def action_pa(self, number):
+        self.aid('pa', self.on_pa, int(number))
+
+    def type_char(self, ch):
+        """ Type one character at the cursor, with autoskip to the next field. """
+
+        screen = self.screen
+        if screen.formatted:
+            field = screen.field_at(screen.cursor)
+            if field is None:
+                raise FakeHostError('Keyboard locked')
+            if field.numeric and not ch.isdigit():
+                raise FakeHostError('Keyboard locked')
+            screen.buffer[screen.cursor] = ch
+            screen.cursor = (screen.cursor + 1) % len(screen.buffer)
+            if screen.cursor == field.end and field.autoskip:
+                screen.cursor = screen.next_field(field.offset).offset
+        else:
+            screen.buffer[screen.cursor] = ch
+            screen.cursor = (screen.cursor + 1) % len(screen.buffer)
+
+    def aid(self, key, handler, *arguments):
+        if not self.connected_host:
+            raise FakeHostError('Not connected')
+        delay = self.config.latency.get(key, 0.0)
+        if delay > 0.0:
+            self.sleep(delay)
+        handler(*arguments)
+
+    def show(self, screen):
+        self.screen = screen
+        self.keyboard = 'U'
+
+    # =========================================================================
+    # Screen Flows
+    # =========================================================================
+
+    def login_screen(self):
+        if self.config.mode == 'acf2':
+            return (FakeScreen('acf2_region')
+                    .field('region', 1, 3, 8)
+                    .text(3, 2, 'ACF2 - ENTER REGION'))
+        else:
+            return (FakeScreen('racf_application')
+                    .text(1, 2, 'RACF - SELECT APPLICATION')
+                    .text(3, 2, 'APPLICATION:')
+                    .field('application', 3, 15, 8))
+
+    def userid_screen(self):
+        return (FakeScreen('userid')
+                .text(1, 2, 'ENTER USERID AND PASSWORD')
+                .text(5, 2, 'USERID   ===>')
+                .field('userid', 5, 20, 8)
+                .text(6, 2, 'PASSWORD ===>')
+                .field('password', 6, 20, 8, hidden=True))
+
+    def ready_screen(self):
+        return FakeScreen('ready').text(1, 2, 'FAKEHOST {} READY'.format(self.config.app_id))
+
+    def signon_screen(self):
+        return (FakeScreen('signon')
+                .text(2, 23, 'WFAC SECURITY SIGNON')
+                .text(10, 2, 'USER ID:')
+                .field('user', 10, 16, len(self.config.signon_username), autoskip=True)
+                .text(11, 2, 'PASSWORD:')
+                .field('password', 11, 16, 8, hidden=True, autoskip=True)
+                .text(12, 2, 'SIGNOFF (Y):')
+                .field('signoff', 12, 16, 1))
+
+    def inquiry_screen(self, name):
+        return (FakeScreen('inquiry:' + name)
+                .text(1, 2, 'COMMAND')
+                .field('command', 1, 10, 14)
+                .text(1, 27, 'WFAC: FAKE INQUIRY ({})'.format(name))
+                .text(10, 2, 'C  WK     LOC     CWL  END I CTYPE'))
+
+    def on_enter(self):
+        screen = self.screen
+        handler = getattr(self, 'enter_' + screen.name.split(':')[0], None)
+        if handler:
+            handler()
+        elif not screen.formatted:
+            self.enter_command(screen.row_text(1).strip())
+
+    def enter_acf2_region(self):
+        if self.screen.value('region') == self.config.app_id:
+            self.show(self.userid_screen())
+        else:
+            self.screen.text(24, 2, 'INVALID REGION')
+
+    def enter_racf_application(self):
+        if self.screen.value('application') == self.config.app_id:
+            self.show(self.userid_screen())
+        else:
+            self.screen.text(24, 2, 'INVALID APPLICATION')
+
+    def enter_userid(self):
+        screen = self.screen
+        if screen.value('userid') == self.config.username and screen.value('password') == self.config.password:
+            self.show(self.queued_screen() if self.queued else self.ready_screen())
+        else:
+            rejected_row = 2 if self.config.mode == 'acf2' else 17
+            screen.clear_field('password')
+            screen.text(rejected_row, 2, 'REJECTED')
+
+    def enter_signon(self):
+        screen = self.screen
+        if screen.value('signoff') == 'Y':
+            message = 'SIGNOFF SUCCESSFUL' if self.signed_on else 'NOT SIGNED ON'
+            self.signed_on = False
+        elif (screen.value('user') == self.config.signon_username and
+                screen.value('password') == self.config.signon_password):
+            message = 'ALREADY SIGNED ON' if self.signed_on else 'SIGNON SUCCESSFUL'
+            self.signed_on = True
+        else:
+            message = 'INVALID SIGNON'
+
+        for name in ('user', 'password', 'signoff'):
+            screen.clear_field(name)
+        screen.cursor = screen.field_named('user').offset
+        self.status(' DFS3650I  {}'.format(message))
+
+    def enter_inquiry(self):
+        command = self.screen.value('command')
+        self.screen.clear_field('command')
+
+        if self.config.require_signon and not self.signed_on:
+            self.status(' DFS3649I  SIGNON REQUIRED')
+        elif not command:
+            self.status(' SSC700I  ENTER A COMMAND')
+        else:
+            self.results_query = command
+            self.results_page = 0
+            self.show_results()
+
+    def enter_command(self, command):
+        words = command.split()
+        if len(words) == 2 and words[0].upper() == '/FOR':
+            if words[1] == self.config.signon_screen:
+                self.show(self.signon_screen())
+            else:
+                self.show(self.inquiry_screen(words[1]))
+        else:
+            self.status(' DFS064   DESTINATION CAN NOT BE FOUND')
+
+    def on_clear(self):
+        self.show(FakeScreen('clear'))
+
+    def on_pa(self, number):
+        if number == 2:
+            if self.queued:
+                self.show(self.queued_screen())
+            else:
+                self.show(FakeScreen('clear'))
+
+    def on_pf(self, number):
+        if number == 2 and self.screen.name.startswith('inquiry:') and self.results_query:
+            if (self.results_page + 1) * DEFAULT_ROWS_PER_PAGE < self.config.results:
+                self.results_page += 1
+                self.show_results()
+            else:
+                self.status(' SSC726I  NO MORE DATA TO DISPLAY')
+
+    def queued_screen(self):
+        """ Show the next queued screen, and remove it from the queue. """
+
+        total = self.config.queued_screens
+        screen = FakeScreen('queued').text(1, 2, 'QUEUED MESSAGE {} OF {}'.format(total - self.queued + 1, total))
+        self.queued -= 1
+        return screen
+
+    def show_results(self):
+        screen = self.screen
+        first = self.results_page * DEFAULT_ROWS_PER_PAGE
+        last = min(first + DEFAULT_ROWS_PER_PAGE, self.config.results)
+
+        for row in range(11, 11 + DEFAULT_ROWS_PER_PAGE):
+            screen.text(row, 1, ' ' * screen.cols)
+        for (row, number) in zip(range(11, 24), range(first + 1, last + 1)):
+            screen.text(row, 1, result_row(self.results_query, number))
+
+        if last >= self.config.results:
+            self.status(' SSC725I  FIND SUCCESSFUL - LAST PAGE OF OUTPUT DISPLAYED')
+        else:
+            self.status(' SSC725I  FIND SUCCESSFUL - PRESS PF2 FOR MORE')
+
+    def status(self, message):
+        self.screen.text(24, 1, message.ljust(self.screen.cols)[:self.screen.cols])
+
+
+def result_row(query, number):
+    """ Result Row
+
+    A generated fixed-width table row: LOC at column 8, CWL at column 20, END at column 26.
+    """
+
+    loc = 'LOC{:08d}'.format(number)
+    return '{:7}{:<12}{:<6}{:<4}{}'.format('', loc, number, 'A', query[:20]).ljust(77) + 'F N'
+
+
+class InProcessApp(object):
+    """ In-Process py3270 App
+
+    Serve a FakeHost to py3270 without a subprocess, e.g. `EmulatorPlus(app=InProcessApp())`.
+    """
+
+    def __init__(self, host=None):
+        self.host = host or FakeHost()
+        self.pending = []
+
+    def connect(self, host):
+        return False
+
+    def write(self, data):
+        self.pending.extend(line.encode('latin-1') + b'\n' for line in self.host.execute(data.decode('ascii').rstrip('\n')))
+
+    def readline(self):
+        if not self.pending:
+            return b''
+        return self.pending.pop(0)
+
+    def close(self):
+        return 0
+
+
+class FakeHostApp(ExecutableApp):
+    """ Fake Host py3270 App
+
+    Start `python -m terminal_3270.fakehost` in place of s3270.
+    Use it as `EmulatorPlus(app_class=FakeHostApp, args=[...fake host options...])`.
+    """
+
+    executable = sys.executable
+
+    def __init__(self, args=None):
+        self.args = ['-m', 'terminal_3270.fakehost'] + list(args or [])
+        self.sp = None
+        self.spawn_app()
+
+
+def main(argv=None, stdin=None, stdout=None):
+    """ Fake Host Main
+
+    Read s3270 command lines from stdin until Quit or end-of-file.
+    """
+
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+
+    host = FakeHost(FakeHostConfig.from_args(sys.argv[1:] if argv is None else argv))
+
+    for line in stdin:
+        for response in host.execute(line.rstrip('\r\n')):
+            stdout.write(response + '\n')
+        stdout.flush()
+        if host.quit:
+            break
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,170 @@
+""" Session Worker Farm
+
+Spread session jobs across worker processes, to use every core for the Python side of many sessions.
+Each worker process keeps its own `SessionPool` of warm sessions; results stream back as jobs finish.
+
+    def new_session():
+        return MySignOnSession(username, password, app_id, signon_username, signon_password, HOST_3270)
+
+    def find_order(session, order_id):
+        session.term_emulator.screen_command('FIND {}'.format(order_id))
+        return list(ScreenTable(session.term_emulator, 11, 23).fetch_results())
+
+    with WorkerFarm(new_session, processes=8) as farm:
+        for result in farm.imap(functools.partial(find_order, order_id=o) for o in order_ids):
+            print(result.index, result.value, result.error)
+
+The session factory and the jobs are sent to the workers, so they must be picklable,
+e.g. module-level functions or `functools.partial` objects of them.
+"""
+
+import logging
+import multiprocessing
+import traceback
+from collections import namedtuple
+from multiprocessing.util import Finalize
+
+from terminal_3270.pool import SessionPool
+
+log = logging.getLogger(__name__)
+
+# A job outcome: its position in the job queue, and its value or the formatted exception.
+JobResult = namedtuple('JobResult', ['index', 'value', 'error'])
+
+# The SessionPool of this worker process.
+_worker_pool = None
+
+# The formatted exception when this worker process could not make its SessionPool.
+_worker_error = None
+
+
+def _init_worker(session_factory, pool_options):
+    """ Start a worker process with its own session pool.
+
+    An exception here kills the worker, and the Pool starts another one forever,
+    so any error is left for the jobs to report instead.
+    """
+
+    global _worker_pool, _worker_error
+    try:
+        _worker_pool = SessionPool(session_factory, **pool_options)
+    except Exception:
+        _worker_error = traceback.format_exc()
+        return
+
+    # Pool workers leave by os._exit(), so atexit handlers never run.
+    Finalize(_worker_pool, _worker_pool.close, exitpriority=10)
+
+    try:
+        _worker_pool.fill()
+    except Exception as e:
+        # e.g. the host is down; each job connects a session on demand, and reports its error.
+        log.warning('farm worker could not fill its session pool: {}'.format(e))
+
+
+def _run_job(indexed_job):
+    """ Run one job on a pooled session of this worker process. """
+
+    (index, job) = indexed_job
+    if _worker_pool is None:
+        return JobResult(index, None, _worker_error)
+
+    try:
+        with _worker_pool.session() as session:
+            return JobResult(index, job(session), None)
+    except Exception:
+        # Exceptions may not pickle; send back the traceback text.
+        return JobResult(index, None, traceback.format_exc())
+
+
+class WorkerFarm(object):
+    """ Worker Farm
+
+    A multiprocessing pool of workers, each with a pool of connected sessions.
+    """
+
+    def __init__(self, session_factory, processes=None, sessions_per_worker=1, pool_options=None,
+                 mp_context=None):
+        """ New WorkerFarm
+
+        :param callable session_factory: returns a new, unconnected Session3270 (subclass) object
+        :param int processes: the number of worker processes, default the number of CPUs
+        :param int sessions_per_worker: connect this many sessions in each worker at start
+        :param dict pool_options: extra SessionPool keyword arguments for each worker, e.g. `max_lifetime`
+        :param mp_context: a multiprocessing context, e.g. multiprocessing.get_context('spawn')
+        :raises: TypeError or ValueError for invalid session_factory or sizes, respectively
+        """
+
+        if not callable(session_factory):
+            raise TypeError('"session_factory" must be a callable that returns a new session')
+
+        if sessions_per_worker < 1:
+            raise ValueError('"sessions_per_worker" must be at least 1')
+
+        options = dict(pool_options or {})
+        options.setdefault('min_size', sessions_per_worker)
+        options.setdefault('max_size', max(sessions_per_worker, options['min_size']))
+
+        self.session_factory = session_factory
+        self.processes = processes or multiprocessing.cpu_count()
+
+        context = mp_context or multiprocessing.get_context()
+        self._pool = context.Pool(
+            self.processes, initializer=_init_worker, initargs=(session_factory, options))
+        self._closed = False
+
+    def __enter__(self):
+        """ Enter Context Manager """
+        return self
+
+    def __exit__(self, *args):
+        """ Exit Context Manager """
+        self.close()
+
+    def imap(self, jobs, ordered=False, chunksize=1):
+        """ Run Jobs
+
+        Each job is a callable(session) that runs on a connected session in a worker process.
+        A job that raises an exception gets a JobResult with the `error` text;
+        its session is discarded and replaced.
+
+        :param iterable jobs: the job queue; it is consumed as the workers take jobs
+        :param bool ordered: when True, yield the results in job order, else as they finish
+        :param int chunksize: jobs sent to a worker at a time
+        :returns: a JobResult for each job
+        :rtype: generator
+        """
+
+        imap = self._pool.imap if ordered else self._pool.imap_unordered
+        for result in imap(_run_job, enumerate(jobs), chunksize):
+            if result.error is not None:
+                log.warning('farm job {} failed:\n{}'.format(result.index, result.error))
+            yield result
+
+    def map(self, jobs, chunksize=1):
+        """ Run Jobs and Wait
+
+        :param iterable jobs: the job queue, see `imap()`
+        :returns: a JobResult for each job, in job order
+        :rtype: list
+        """
+
+        return list(self.imap(jobs, ordered=True, chunksize=chunksize))
+
+    def close(self):
+        """ Close Farm
+
+        Finish the queued jobs, then disconnect the sessions in each worker.
+        """
+
+        if not self._closed:
+            self._closed = True
+            self._pool.close()
+            self._pool.join()
+
+    def terminate(self):
+        """ Stop the workers now; their sessions are not signed off. """
+
+        self._closed = True
+        self._pool.terminate()
+        self._pool.join()
@@ -0,0 +1,239 @@
+""" 3270 Field Map
+
+Parse the s3270 `ReadBuffer(Ascii)` output into the screen's fields:
+position, length, protected/numeric/hidden flags and current value.
+An unprotected field is labelled by the protected text just before it, e.g. "USER ID:" labels "USER ID".
+
+    field_map = emulator.read_fields()
+
+    for field in field_map.unprotected():
+        print(field.label, field.row, field.col, field.length, field.value)
+
+    emulator.fill_fields({'USER ID': 'SIGNUSER', (11, 16): 'SIGNPASS'})
+"""
+
+import re
+
+from terminal_3270.screen import ENCODING
+
+# 3270 field attribute bits
+FA_PROTECTED = 0x20
+FA_NUMERIC = 0x10
+FA_DISPLAY = 0x0C
+FA_HIDDEN = 0x0C  # both display bits: non-display
+FA_INTENSIFIED = 0x08
+FA_MODIFIED = 0x01
+
+LABEL_PUNCTUATION = ' :.=>-_'
+
+# The characters a numeric field takes with the keyboard's numeric lock.
+NUMERIC_CHARS = frozenset('0123456789.-')
+
+_START_FIELD = re.compile(r'^SF\(([^)]*)\)$')
+_ATTRIBUTES = re.compile(r'^(?:S[AF]\([^)]*\))+')
+_GAP = re.compile(r'\s{2,}')
+
+
+class FieldMapError(LookupError):
+    pass
+
+
+class Field(object):
+    """ Screen Field
+
+    One 3270 field: the attribute byte, then `length` characters from (row, col).
+    Rows and columns are 1-based; a field may wrap onto the next row.
+    """
+
+    __slots__ = ('row', 'col', 'length', 'attribute', 'value', 'label')
+
+    def __init__(self, row, col, length, attribute, value='', label=''):
+        self.row = row
+        self.col = col
+        self.length = length
+        self.attribute = attribute
+        self.value = value
+        self.label = label
+
+    @property
+    def protected(self):
+        return bool(self.attribute & FA_PROTECTED)
+
+    @property
+    def numeric(self):
+        return bool(self.attribute & FA_NUMERIC)
+
+    @property
+    def hidden(self):
+        return (self.attribute & FA_DISPLAY) == FA_HIDDEN
+
+    @property
+    def intensified(self):
+        return (self.attribute & FA_DISPLAY) == FA_INTENSIFIED
+
+    @property
+    def modified(self):
+        return bool(self.attribute & FA_MODIFIED)
+
+    @property
+    def position(self):
+        return (self.row, self.col)
+
+    def __repr__(self):
+        return '<Field ({}, {}) length={} {}{}{} label={!r} value={!r}>'.format(
+            self.row, self.col, self.length,
+            'protected' if self.protected else 'unprotected',
+            ' numeric' if self.numeric else '',
+            ' hidden' if self.hidden else '',
+            self.label, self.value)
+
+
+def _parse_start_field(token):
+    """ The field attribute byte of an SF(c0=xx,...) token """
+
+    match = _START_FIELD.match(token)
+    for pair in match.group(1).split(','):
+        (kind, _, value) = pair.partition('=')
+        if kind.lower() == 'c0':
+            return int(value, 16)
+    return 0
+
+
+def _parse_char(token, encoding=ENCODING):
+    """ The character of a ReadBuffer(Ascii) position token, e.g. "41" or "SA(41=f2)41" """
+
+    token = _ATTRIBUTES.sub('', token)
+    if not token or token.startswith('GE('):
+        return ' '
+
+    try:
+        ch = bytes.fromhex(token).decode(encoding)
+    except ValueError:
+        raise FieldMapError('unknown ReadBuffer position "{}"'.format(token))
+    if len(ch) != 1:
+        raise FieldMapError('ReadBuffer position "{}" is not one {} character'.format(token, encoding))
+    return ' ' if (ch < ' ') else ch
+
+
+def _label(text):
+    """ A field label from the protected text before it: its last run of words """
+
+    text = _GAP.split(text.strip())[-1]
+    return text.rstrip(LABEL_PUNCTUATION).strip()
+
+
+class FieldMap(object):
+    """ Field Map
+
+    The fields of one screen, in buffer order.
+    """
+
+    def __init__(self, fields, rows, cols, text):
+        self.fields = list(fields)
+        self.rows = rows
+        self.cols = cols
+        self.text = text
+
+    @classmethod
+    def parse(cls, lines, encoding=ENCODING):
+        """ Parse ReadBuffer(Ascii)
+
+        :param list lines: the ReadBuffer(Ascii) data lines, one per screen row, as strings
+        :param str encoding: the emulator's code page, which the hex positions are in; the Screen's by default
+        :returns: the fields; an unformatted screen has none
+        :rtype: FieldMap
+        :raises: FieldMapError for unknown ReadBuffer output
+        """
+
+        rows = [line.split() for line in lines]
+        cols = len(rows[0]) if rows else 0
+        size = len(rows) * cols
+
+        chars = []
+        starts = []  # [(offset, attribute)]
+        for tokens in rows:
+            if len(tokens) != cols:
+                raise FieldMapError('ReadBuffer rows are not all {} positions wide'.format(cols))
+
+            for token in tokens:
+                if token.startswith('SF('):
+                    starts.append((len(chars), _parse_start_field(token)))
+                    chars.append(' ')
+                else:
+                    chars.append(_parse_char(token, encoding))
+
+        text = ''.join(chars)
+        fields = []
+        for (index, (offset, attribute)) in enumerate(starts):
+            # A field runs to the next attribute, wrapping around the screen.
+            next_offset = starts[(index + 1) % len(starts)][0]
+            start = (offset + 1) % size
+            length = (next_offset - start) % size
+
+            value = ''.join(text[(start + i) % size] for i in range(length))
+            fields.append(Field(start // cols + 1, start % cols + 1, length, attribute, value))
+
+        for (index, field) in enumerate(fields):
+            # The protected text before the first field wraps around from the last one.
+            previous = fields[index - 1]
+            if not field.protected and previous.protected:
+                field.label = _label(previous.value)
+
+        return cls(fields, len(rows), cols, text)
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def unprotected(self):
+        """ The input fields """
+        return [field for field in self.fields if not field.protected]
+
+    def at(self, row, col):
+        """ Field at Position
+
+        :param int row: row (1-based)
+        :param int col: col (1-based)
+        :returns: the field whose data includes (row, col), or None
+        :rtype: Field
+        """
+
+        size = self.rows * self.cols
+        offset = (row - 1) * self.cols + (col - 1)
+        for field in self.fields:
+            start = (field.row - 1) * self.cols + (field.col - 1)
+            if (offset - start) % size < field.length:
+                return field
+        return None
+
+    def labelled(self, label):
+        """ Input Field by Label
+
+        :param str label: the label text, e.g. "USER ID" for a field after "USER ID:"
+        :returns: the first unprotected field with this label, or None
+        :rtype: Field
+        """
+
+        wanted = _label(label)
+        for field in self.fields:
+            if not field.protected and field.label == wanted:
+                return field
+        return None
+
+    def find(self, key):
+        """ Find Field
+
+        :param key: a label string, a (row, col) tuple, or a Field
+        :rtype: Field
+        :raises: FieldMapError when no field matches
+        """
+
+        if isinstance(key, Field):
+            return key
+
+        field = self.at(*key) if isinstance(key, tuple) else self.labelled(key)
+        if field is None:
+            raise FieldMapError('no field {!r} on this screen'.format(key))
+        return field
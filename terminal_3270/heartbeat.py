@@ -0,0 +1,166 @@
+""" Session Heartbeat
+
+Mainframe regions time out idle terminals.
+A heartbeat sends a cheap command to an idle session at a set interval, and checks its connection.
+A dead session is marked `stale`, so a pool evicts it before a caller checks it out.
+
+    session.connect()
+    session.start_heartbeat(interval=60, action=b'PA(1)')  # an AID the host ignores on this screen
+    ...
+    session.disconnect()  # stops the heartbeat
+
+    pool = SessionPool(new_session, max_size=8, heartbeat_interval=60)
+
+The heartbeat takes the emulator `lock`, so it never interleaves with a command of real work.
+Hold `session.term_emulator.lock` around a multi-step job to keep the heartbeat out until it ends.
+
+The default heartbeat is `Query(ConnectionState)`: it finds dead connections, but never reaches the host.
+Pass an AID `action` that is harmless on the idle screen to reset the host idle timer as well.
+"""
+
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 60.0  # seconds
+
+
+def beat(session, action=None):
+    """ Heartbeat Beat
+
+    Send the heartbeat `action` to a session, then check its connection.
+    A busy emulator is skipped and counts as alive; its real work is the heartbeat.
+
+    :param Session3270 session: a connected session
+    :param action: an s3270 command (bytes), a callable(session), or None to only check the connection
+    :returns: True when the session is alive; otherwise the session is marked `stale`
+    :rtype: bool
+    """
+
+    emulator = session.term_emulator
+    if emulator is None or session.stale:
+        return False
+
+    if not emulator.lock.acquire(False):
+        return True
+
+    try:
+        if callable(action):
+            action(session)
+        elif action is not None:
+            emulator.exec_command(action)
+        alive = session.is_alive()
+    except Exception as e:
+        log.warning('heartbeat failed for "{}": {}'.format(session.host_3270, e))
+        alive = False
+    finally:
+        emulator.lock.release()
+
+    if not alive:
+        log.info('heartbeat marked session to "{}" stale'.format(session.host_3270))
+        session.stale = True
+    return alive
+
+
+def wake_interval(interval):
+    """ Wake Interval
+
+    The Heartbeat period to beat sessions idle for `interval` seconds.
+    It wakes twice per interval, so an idle session waits at most 1.5 intervals for a beat.
+    """
+
+    return interval / 2.0
+
+
+class Heartbeat(object):
+    """ Heartbeat Thread
+
+    Call `callback()` every `interval` seconds on a daemon thread, until `stop()`.
+    """
+
+    def __init__(self, callback, interval=HEARTBEAT_INTERVAL, name='terminal-3270-heartbeat'):
+        """ New Heartbeat
+
+        :param callable callback: the work for each beat; its exceptions are logged
+        :param float interval: seconds between beats
+        :param str name: the thread name
+        :raises: ValueError for an invalid interval
+        """
+
+        if interval <= 0.0:
+            raise ValueError('"interval" must be a positive number of seconds')
+
+        self.callback = callback
+        self.interval = interval
+        self.name = name
+        self.beats = 0
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return self
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """ Stop Heartbeat
+
+        :param float timeout: seconds to wait for a beat in progress to end
+        """
+
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.beats += 1
+            try:
+                self.callback()
+            except Exception:
+                log.exception('heartbeat "{}" failed'.format(self.name))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def session_heartbeat(session, interval=HEARTBEAT_INTERVAL, action=None):
+    """ Session Heartbeat
+
+    A heartbeat that beats a session once it has been idle for `interval` seconds.
+    The heartbeat ends itself when the session disconnects or goes stale.
+
+    :param Session3270 session: a connected session
+    :param float interval: beat after this many idle seconds
+    :param action: the heartbeat action, see `beat()`
+    :rtype: Heartbeat
+    """
+
+    heartbeat = None
+
+    def beat_if_idle():
+        emulator = session.term_emulator
+        if emulator is None or session.stale:
+            heartbeat.stop()
+        elif emulator.idle_time() >= interval:
+            beat(session, action)
+
+    heartbeat = Heartbeat(beat_if_idle, wake_interval(interval),
+                          name='terminal-3270-heartbeat-{}'.format(session.host_3270))
+    return heartbeat
@@ -14,9 +14,68 @@ Use these mixins to provide common login procedures.
         racf_app_column = 15
 """
 
-from time import sleep
+from terminal_3270.emulator import TAB, ScreenWaitError
+from terminal_3270.registry import ScreenRegistry
 
-TIMEOUT_LOGIN_SCREEN = 0.3  # 300 ms
+TIMEOUT_LOGIN_SCREEN = 0.3  # 300 ms, upper bound to wait for the USERID screen
+TIMEOUT_LOGIN_STATUS = 0.3  # 300 ms, upper bound to wait for the login outcome
+
+
+def login_screens(row, col, next_screen=None):
+    """ Login Screens
+
+    The login outcomes as a ScreenRegistry: 'rejected' with REJECTED at (row, col),
+    and 'accepted' on the `next_screen` anchor when it is given.
+
+    :param tuple next_screen: the (screen_str, row, col) anchor of the screen after a good login, or None
+    :rtype: ScreenRegistry
+    """
+
+    screens = ScreenRegistry().register('rejected', [(row, col, 'REJECTED')])
+    if next_screen is not None:
+        (screen_str, next_row, next_col) = next_screen
+        screens.register('accepted', [(next_row, next_col, screen_str)])
+    return screens
+
+
+def login_rejected(term_emulator, before, row, col, next_screen=None):
+    """ Login Rejected
+
+    Wait for the host to answer the USERID and PASSWORD, then check for REJECTED at (row, col).
+    Each screen read is classified once against the `login_screens()`.
+
+    A repaint of the USERID screen, e.g. a clear before REJECTED is drawn, is not an answer.
+    With a `next_screen` anchor, only that screen accepts the login;
+    without one, the changed screen is classified again once it settles.
+
+    :param EmulatorPlus term_emulator: the emulator, just after the Enter key
+    :param Screen before: the USERID screen snapshot before the Enter key
+    :param tuple next_screen: the (screen_str, row, col) anchor of the screen after a good login, or None
+    :returns: True when the login was rejected
+    :rtype: bool
+    """
+
+    screens = login_screens(row, col, next_screen)
+    conditions = [('login', screens)]
+    if next_screen is None:
+        conditions.append(('changed', lambda screen: screen != before))
+
+    try:
+        (outcome, elapsed) = term_emulator.wait_for_any(conditions, time_limit=TIMEOUT_LOGIN_STATUS)
+    except ScreenWaitError:
+        # The host did not answer; classify the screen as it is.
+        match = term_emulator.classify(screens)
+        return (match is not None and match.name == 'rejected')
+
+    if outcome == 'changed':
+        try:
+            screen = term_emulator.wait_until_stable(time_limit=TIMEOUT_LOGIN_STATUS)
+        except ScreenWaitError:
+            screen = term_emulator.snapshot()
+        match = screens.classify(screen)
+        return (match is not None and match.name == 'rejected')
+
+    return (outcome == 'rejected')
 
 
 class ACF2LoginMixin:
@@ -25,6 +84,9 @@ class ACF2LoginMixin:
     This mixin adds the ACF2 login process to a Session3270 class.
     """
 
+    # The (screen_str, row, col) anchor of the screen after a good login, when it is known.
+    login_next_screen = None
+
     @property
     def region(self):
         return self.app_id
@@ -43,23 +105,21 @@ class ACF2LoginMixin:
         # 1) Enter REGION
         self.term_emulator.wait_for_field()
         self.term_emulator.fill_field(1, 3, self.region, len(self.region))
+        region_screen = self.term_emulator.snapshot()
         self.term_emulator.send_enter()
 
-        sleep(TIMEOUT_LOGIN_SCREEN)
+        self.term_emulator.wait_for_change(region_screen, time_limit=TIMEOUT_LOGIN_SCREEN)
 
         # 2) Type in the USERID and PASSWORD fields.
 
-        # USERID @(*, *)
+        # USERID @(*, *), then PASSWORD @(*, *) in one round trip.
         self.term_emulator.wait_for_field()
-        self.term_emulator.key_entry(self.username)
-        self.term_emulator.send_tab()
-
-        # PASSWORD @(*, *)
-        self.term_emulator.key_entry(self.password)
+        self.term_emulator.key_sequence(self.username, TAB, self.password)
+        userid_screen = self.term_emulator.snapshot()
         self.term_emulator.send_enter()
 
         # Login Status: Look for a status message
-        if self.term_emulator.string_found(2, 2, 'REJECTED'):
+        if login_rejected(self.term_emulator, userid_screen, 2, 2, self.login_next_screen):
             return False
         else:
             return True
@@ -74,6 +134,9 @@ class RACFLoginMixin:
     racf_app_row = 3
     racf_app_column = 15
 
+    # The (screen_str, row, col) anchor of the screen after a good login, when it is known.
+    login_next_screen = None
+
     def login(self):
         """ login routine
 
@@ -90,24 +153,22 @@ class RACFLoginMixin:
         # self.term_emulator.fill_field(3, 15, self.app_id, len(self.app_id))
         if self.racf_app_row is not None:
             self.term_emulator.move_to(self.racf_app_row, self.racf_app_column)
-        self.term_emulator.key_entry(self.app_id)
+        self.term_emulator.key_entry(self.app_id, batch=True)
+        application_screen = self.term_emulator.snapshot()
         self.term_emulator.send_enter()
 
-        sleep(TIMEOUT_LOGIN_SCREEN)
+        self.term_emulator.wait_for_change(application_screen, time_limit=TIMEOUT_LOGIN_SCREEN)
 
         # 2) Type in the USERID and PASSWORD fields.
 
-        # USERID @(*, *)
+        # USERID @(*, *), then PASSWORD @(*, *) in one round trip.
         self.term_emulator.wait_for_field()
-        self.term_emulator.key_entry(self.username)
-        self.term_emulator.send_tab()
-
-        # PASSWORD @(*, *)
-        self.term_emulator.key_entry(self.password)
+        self.term_emulator.key_sequence(self.username, TAB, self.password)
+        userid_screen = self.term_emulator.snapshot()
         self.term_emulator.send_enter()
 
         # Login Status: Look for a status message
-        if self.term_emulator.string_found(17, 2, 'REJECTED'):
+        if login_rejected(self.term_emulator, userid_screen, 17, 2, self.login_next_screen):
             return False
         else:
             return True
@@ -0,0 +1,169 @@
+""" s3270 Command Metrics
+
+Opt-in instrumentation for EmulatorPlus round trips.
+Each s3270 command is counted, and its latency kept in a histogram, by action type and session phase.
+
+    metrics = CommandMetrics(exporter=print)
+
+    with MySignOnSession(..., metrics=metrics) as session:
+        results = session.get_results()
+
+    metrics.export()  # or metrics.snapshot()
+"""
+
+import threading
+from contextlib import contextmanager
+
+# Latency histogram bucket upper bounds, in seconds. The last bucket counts everything slower.
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.010, 0.020, 0.050, 0.100, 0.200, 0.500, 1.0, 2.0, 5.0)
+
+DEFAULT_PHASE = 'other'
+
+
+def action_type(cmdstr):
+    """ Action Type
+
+    The name of the first s3270 action on a command line, e.g. b'Key(U+0041) Key(U+0042)' is 'Key'.
+
+    :param bytes cmdstr: the s3270 command line
+    :rtype: str
+    """
+
+    name = cmdstr.split(b'(', 1)[0].split(b' ', 1)[0].strip()
+    return name.decode('ascii', 'replace') or 'Empty'
+
+
+class LatencyHistogram(object):
+    """ Latency Histogram
+
+    Count, total, min, max and bucket counts of latencies in seconds.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = buckets
+        self.buckets = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+        for (index, bound) in enumerate(self.bounds):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': (self.total / self.count) if self.count else 0.0,
+            'min': self.min,
+            'max': self.max,
+            'buckets': dict(zip([str(b) for b in self.bounds] + ['inf'], self.buckets)),
+        }
+
+
+class CommandMetrics(object):
+    """ Command Metrics
+
+    Thread-safe s3270 round-trip metrics; one object may be shared by many emulators.
+    """
+
+    def __init__(self, exporter=None, buckets=LATENCY_BUCKETS):
+        """ New Command Metrics
+
+        :param callable exporter: exporter(snapshot) is called by `export()`
+        :param tuple buckets: latency histogram bucket upper bounds, in seconds
+        """
+
+        self.exporter = exporter
+        self.buckets = buckets
+
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def record(self, action, seconds, phase=None):
+        """ Record one s3270 round trip.
+
+        :param str action: the action type, see `action_type()`
+        :param float seconds: the round trip latency
+        :param str phase: the session phase, e.g. 'login'
+        """
+
+        phase = phase or DEFAULT_PHASE
+        with self._lock:
+            histogram = self._histograms.get((phase, action))
+            if histogram is None:
+                histogram = self._histograms[(phase, action)] = LatencyHistogram(self.buckets)
+            histogram.record(seconds)
+
+    @property
+    def round_trips(self):
+        with self._lock:
+            return sum(h.count for h in self._histograms.values())
+
+    def snapshot(self):
+        """ Metrics Snapshot
+
+        :returns: {'round_trips': N, 'actions': {action: stats}, 'phases': {phase: {action: stats}}}
+        :rtype: dict
+        """
+
+        with self._lock:
+            phases = {}
+            actions = {}
+            for ((phase, action), histogram) in self._histograms.items():
+                phases.setdefault(phase, {})[action] = histogram.as_dict()
+
+                merged = actions.get(action)
+                if merged is None:
+                    merged = actions[action] = LatencyHistogram(self.buckets)
+                merged.count += histogram.count
+                merged.total += histogram.total
+                merged.min = histogram.min if merged.min is None else min(merged.min, histogram.min)
+                merged.max = histogram.max if merged.max is None else max(merged.max, histogram.max)
+                merged.buckets = [a + b for (a, b) in zip(merged.buckets, histogram.buckets)]
+
+            return {
+                'round_trips': sum(h.count for h in self._histograms.values()),
+                'actions': dict((action, h.as_dict()) for (action, h) in actions.items()),
+                'phases': phases,
+            }
+
+    def export(self):
+        """ Export the metrics snapshot to the `exporter` callback. """
+
+        snapshot = self.snapshot()
+        if self.exporter is not None:
+            self.exporter(snapshot)
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+
+@contextmanager
+def _no_phase():
+    yield
+
+
+def emulator_phase(emulator, name):
+    """ Emulator Phase
+
+    Tag an emulator's commands with a phase, when it supports `EmulatorPlus.phase()`.
+
+        with emulator_phase(self.emulator, 'page_fetch'):
+            ...
+    """
+
+    phase = getattr(emulator, 'phase', None)
+    return phase(name) if callable(phase) else _no_phase()
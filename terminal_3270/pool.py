@@ -0,0 +1,404 @@
+""" Session Pool
+
+Keep Session3270 objects connected, logged in and signed on between uses.
+Each checkout validates the session with a cheap probe, so a dead session is replaced before a caller sees it.
+
+    def new_session():
+        return MySignOnSession(username, password, app_id, signon_username, signon_password, HOST_3270)
+
+    pool = SessionPool(new_session, min_size=2, max_size=8, max_idle=300, max_lifetime=3600)
+
+    with pool.session() as session:
+        results = session.get_results()  # declared by your subclass!
+
+    pool.close()
+
+With `heartbeat_interval`, a heartbeat thread beats idle sessions to keep them from the host timeout,
+and evicts the dead ones, see `terminal_3270.heartbeat`.
+"""
+
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from timeit import default_timer as timer
+
+from terminal_3270.heartbeat import Heartbeat, beat, wake_interval
+from terminal_3270.sessions import SessionError
+
+log = logging.getLogger(__name__)
+
+
+class PoolError(SessionError):
+    pass
+
+
+class PoolTimeoutError(PoolError):
+    pass
+
+
+class PoolClosedError(PoolError):
+    pass
+
+
+class PoolEntry(object):
+    """ Pool Entry
+
+    Track when a pooled session was connected and last used.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.created_t = timer()
+        self.last_used_t = self.created_t
+        self.last_beat_t = self.created_t
+
+    def age(self, now):
+        return (now - self.created_t)
+
+    def idle_time(self, now):
+        return (now - self.last_used_t)
+
+    def quiet_time(self, now):
+        """ Seconds since the last use or heartbeat """
+        return (now - max(self.last_used_t, self.last_beat_t))
+
+
+def validate_session(session):
+    """ Validate Session
+
+    The default checkout probe, see `Session3270.is_alive()`.
+    """
+
+    return session.is_alive()
+
+
+class SessionPool(object):
+    """ Session Pool
+
+    A thread-safe pool of connected sessions.
+    Sessions are created with `session_factory()` and connected by the pool.
+    """
+
+    def __init__(self, session_factory, min_size=0, max_size=4,
+                 max_idle=None, max_lifetime=None, validate=validate_session, checkout_timeout=None,
+                 heartbeat_interval=None, heartbeat=beat):
+        """ New Session Pool
+
+        :param callable session_factory: returns a new, unconnected Session3270 (subclass) object
+        :param int min_size: keep at least this many sessions connected, see `fill()`
+        :param int max_size: never open more than this many sessions
+        :param float max_idle: disconnect idle sessions after this many seconds, above `min_size`
+        :param float max_lifetime: disconnect any session after this many seconds
+        :param callable validate: validate(session) returns True when a session is usable, or None to skip
+        :param float checkout_timeout: default seconds to wait for a free session, None waits forever
+        :param float heartbeat_interval: beat sessions idle this many seconds, None for no heartbeat
+        :param callable heartbeat: heartbeat(session) returns True when a session is alive,
+            see `terminal_3270.heartbeat.beat()`
+        :raises: TypeError or ValueError for invalid session_factory or sizes, respectively
+        """
+
+        if not callable(session_factory):
+            raise TypeError('"session_factory" must be a callable that returns a new session')
+
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError('"min_size" and "max_size" must be 0 <= min_size <= max_size, max_size >= 1')
+
+        self.session_factory = session_factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.validate = validate
+        self.checkout_timeout = checkout_timeout
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._closed = False
+
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat = heartbeat
+        self._heartbeat_thread = None
+        if heartbeat_interval is not None:
+            self._heartbeat_thread = Heartbeat(
+                self.beat_idle, wake_interval(heartbeat_interval), name='terminal-3270-pool-heartbeat').start()
+
+    def __enter__(self):
+        """ Enter Context Manager """
+        self.fill()
+        return self
+
+    def __exit__(self, *args):
+        """ Exit Context Manager """
+        self.close()
+
+    @property
+    def size(self):
+        """ All sessions, idle or in use """
+        with self._cond:
+            return self._size
+
+    @property
+    def idle_count(self):
+        with self._cond:
+            return len(self._idle)
+
+    def _connect_new(self):
+        """ Connect a new session for a reserved pool slot. """
+
+        try:
+            session = self.session_factory()
+            session.connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        log.debug('pool connected new session, size={}'.format(self._size))
+        return PoolEntry(session)
+
+    def _disconnect(self, entry):
+        """ Disconnect a session that left the pool; its slot is already released. """
+
+        try:
+            entry.session.disconnect()
+        except Exception as e:
+            log.warning('pool could not disconnect session: {}'.format(e))
+
+    def _expired_entries(self, now):
+        """ Remove expired idle entries. The caller holds the lock. """
+
+        expired = []
+        for entry in list(self._idle):
+            too_old = self.max_lifetime is not None and entry.age(now) >= self.max_lifetime
+            too_idle = (self.max_idle is not None and entry.idle_time(now) >= self.max_idle and
+                        (self._size - len(expired)) > self.min_size)
+            if too_old or too_idle:
+                self._idle.remove(entry)
+                expired.append(entry)
+
+        self._size -= len(expired)
+        if expired:
+            self._cond.notify(len(expired))
+        return expired
+
+    def fill(self):
+        """ Fill Pool
+
+        Connect new idle sessions until the pool has `min_size` sessions.
+        """
+
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+
+            entry = self._connect_new()
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def _refill(self):
+        """ Connect sessions back up to `min_size` after an eviction; a connect error is only logged. """
+
+        try:
+            self.fill()
+        except Exception as e:
+            log.warning('pool could not refill to min_size={}: {}'.format(self.min_size, e))
+
+    def evict_expired(self):
+        """ Evict Expired Sessions
+
+        Disconnect idle sessions past `max_idle` or `max_lifetime`, then connect new ones up to `min_size`.
+        Checkout does this too, so call it only to release idle sessions sooner.
+
+        :returns: the number of sessions evicted
+        :rtype: int
+        """
+
+        with self._cond:
+            expired = self._expired_entries(timer())
+
+        for entry in expired:
+            self._disconnect(entry)
+        if expired:
+            self._refill()
+        return len(expired)
+
+    def beat_idle(self):
+        """ Beat Idle Sessions
+
+        Beat each idle session quiet for `heartbeat_interval` seconds, and evict the dead ones;
+        new sessions replace them up to `min_size`.
+        A session is out of the idle queue while it beats, so no caller can check it out.
+        The heartbeat thread calls this; call it directly to beat sooner.
+
+        :returns: the number of sessions evicted
+        :rtype: int
+        """
+
+        interval = self.heartbeat_interval or 0.0
+        with self._cond:
+            now = timer()
+            beating = [entry for entry in self._idle if entry.quiet_time(now) >= interval]
+            for entry in beating:
+                self._idle.remove(entry)
+
+        dead = []
+        alive = []
+        for entry in beating:
+            try:
+                is_alive = self.heartbeat(entry.session)
+            except Exception as e:
+                log.warning('pool heartbeat failed: {}'.format(e))
+                is_alive = False
+
+            entry.last_beat_t = timer()
+            (alive if is_alive else dead).append(entry)
+
+        with self._cond:
+            if self._closed:
+                dead.extend(alive)
+                alive = []
+
+            # Beaten sessions are the least recently used; keep them at the cold end.
+            self._idle.extendleft(reversed(alive))
+            self._size -= len(dead)
+            if beating:
+                self._cond.notify(len(beating))
+
+        for entry in dead:
+            log.info('pool evicted a session that failed its heartbeat')
+            self._disconnect(entry)
+        if dead:
+            self._refill()
+        return len(dead)
+
+    def checkout(self, timeout=None):
+        """ Checkout Session
+
+        Take an idle session, or connect a new one when the pool has room.
+        Each idle session is validated first; an invalid session is replaced.
+        Evicted sessions are replaced up to `min_size`.
+
+        :param float timeout: seconds to wait for a free session, default `checkout_timeout`
+        :returns: a connected session
+        :raises: PoolTimeoutError when no session is free in time, PoolClosedError after close()
+        """
+
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = None if timeout is None else (timer() + timeout)
+
+        while True:
+            expired = []
+            try:
+                with self._cond:
+                    while True:
+                        if self._closed:
+                            raise PoolClosedError('session pool is closed')
+
+                        expired.extend(self._expired_entries(timer()))
+                        if self._idle or self._size < self.max_size:
+                            break
+
+                        remaining = None if deadline is None else (deadline - timer())
+                        if remaining is not None and remaining <= 0.0:
+                            raise PoolTimeoutError('no free session in {} seconds'.format(timeout))
+                        self._cond.wait(remaining)
+
+                    if self._idle:
+                        entry = self._idle.pop()  # most recently used is the warmest
+                    else:
+                        entry = None
+                        self._size += 1
+            finally:
+                for expired_entry in expired:
+                    self._disconnect(expired_entry)
+            if expired:
+                self._refill()
+
+            if entry is None:
+                entry = self._connect_new()
+            elif self.validate is not None and not self.validate(entry.session):
+                log.info('pool discarded a session that failed validation')
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                self._disconnect(entry)
+                self._refill()
+                continue
+
+            with self._cond:
+                self._in_use[id(entry.session)] = entry
+            return entry.session
+
+    def checkin(self, session, discard=False):
+        """ Checkin Session
+
+        Return a session to the pool. A discarded or expired session is replaced up to `min_size`.
+
+        :param session: a session from `checkout()`
+        :param bool discard: when True, disconnect the session instead of keeping it
+        :raises: PoolError for a session that is not checked out from this pool
+        """
+
+        now = timer()
+        with self._cond:
+            entry = self._in_use.pop(id(session), None)
+            if entry is None:
+                raise PoolError('session is not checked out from this pool')
+
+            expired = (self.max_lifetime is not None and entry.age(now) >= self.max_lifetime)
+            if discard or expired or self._closed:
+                self._size -= 1
+            else:
+                entry.last_used_t = now
+                self._idle.append(entry)
+                entry = None
+            self._cond.notify()
+
+        if entry is not None:
+            self._disconnect(entry)
+            self._refill()
+
+    @contextmanager
+    def session(self, timeout=None):
+        """ Session Context Manager
+
+        Checkout a session for a with-block, and check it back in afterwards.
+        A session that raised an exception is discarded.
+
+        :param float timeout: seconds to wait for a free session, default `checkout_timeout`
+        """
+
+        session = self.checkout(timeout=timeout)
+        try:
+            yield session
+        except Exception:
+            self.checkin(session, discard=True)
+            raise
+        else:
+            self.checkin(session)
+
+    def close(self):
+        """ Close Pool
+
+        Disconnect the idle sessions. Sessions still in use are disconnected at checkin.
+        """
+
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.stop()
+
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for entry in idle:
+            self._disconnect(entry)
@@ -0,0 +1,180 @@
+""" AID Rate Limiter
+
+Every AID key (Enter, PF, PA, Clear) is one host transaction.
+When many sessions drive one region faster than it can answer, the host queues screens
+and the response times collapse, see `SignOnSession.remove_queued_screens()`.
+A token bucket keyed by host and region holds the whole fleet to the host's sustainable rate.
+
+    limiter = aid_limiter(HOST_3270, 'TST01', rate=20.0, burst=5)  # shared by the threads of this process
+    limiter = aid_limiter(HOST_3270, 'TST01', rate=20.0, burst=5, directory='/var/tmp')  # ... and processes
+
+    with MySignOnSession(..., aid_limiter=limiter) as session:
+        results = session.get_results()
+
+A FileTokenBucket keeps its state in a small file, locked with `fcntl.flock()`,
+so every process on the box shares one bucket. It is not available on Windows.
+"""
+
+import os
+import re
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class TokenBucket(object):
+    """ Token Bucket
+
+    A thread-safe limiter: `rate` tokens a second, up to `burst` saved up.
+    """
+
+    def __init__(self, rate, burst=1):
+        """ New Token Bucket
+
+        :param float rate: tokens added per second, i.e. the sustained AID keys per second
+        :param int burst: the most tokens saved up, i.e. the AID keys allowed at once after a quiet spell
+        :raises: ValueError for an invalid rate or burst
+        """
+
+        if rate <= 0.0:
+            raise ValueError('"rate" must be a positive number of tokens per second')
+        if burst < 1:
+            raise ValueError('"burst" must be at least 1')
+
+        self.rate = float(rate)
+        self.burst = burst
+        self.waited = 0.0
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated_t = time.time()
+
+    def _take(self, tokens, now, state):
+        """ Take Tokens
+
+        :param tuple state: the (tokens, updated_t) before `now`
+        :returns: the new state, and the seconds to wait before `tokens` are there (0.0 when taken)
+        :rtype: tuple, ((float, float), float)
+        """
+
+        (available, updated_t) = state
+        available = min(self.burst, available + max(0.0, now - updated_t) * self.rate)
+        if available >= tokens:
+            return ((available - tokens, now), 0.0)
+        return ((available, now), (tokens - available) / self.rate)
+
+    def _try_acquire(self, tokens):
+        with self._lock:
+            ((self._tokens, self._updated_t), wait) = self._take(tokens, time.time(), (self._tokens, self._updated_t))
+        return wait
+
+    def acquire(self, tokens=1, timeout=None):
+        """ Acquire Tokens
+
+        Block until `tokens` are available, and take them.
+
+        :param int tokens: the tokens to take, e.g. 1 per AID key
+        :param float timeout: the most seconds to wait, or None to wait as long as it takes
+        :returns: the seconds spent waiting
+        :rtype: float
+        :raises: RateLimitError when the tokens are not available within the `timeout`
+        """
+
+        if tokens > self.burst:
+            raise ValueError('cannot take {} tokens from a bucket of {}'.format(tokens, self.burst))
+
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0.0:
+                self.waited += waited
+                return waited
+
+            if timeout is not None and (waited + wait) > timeout:
+                self.waited += waited
+                raise RateLimitError('no AID token within {} seconds'.format(timeout))
+
+            start_t = time.time()
+            time.sleep(wait)
+            waited += time.time() - start_t
+
+
+class FileTokenBucket(TokenBucket):
+    """ File Token Bucket
+
+    A token bucket shared by the processes on one box, through a state file under `fcntl.flock()`.
+    """
+
+    _STATE = struct.Struct('=dd')  # (tokens, updated_t)
+
+    def __init__(self, path, rate, burst=1):
+        """ New File Token Bucket
+
+        :param str path: the bucket state file; it is created when missing
+        :param float rate: tokens added per second
+        :param int burst: the most tokens saved up
+        :raises: RateLimitError without `fcntl`, e.g. on Windows
+        """
+
+        if fcntl is None:  # pragma: no cover
+            raise RateLimitError('a FileTokenBucket needs fcntl file locks')
+
+        super(FileTokenBucket, self).__init__(rate, burst)
+        self.path = path
+
+    def _try_acquire(self, tokens):
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                data = os.pread(fd, self._STATE.size, 0)
+                now = time.time()
+                state = self._STATE.unpack(data) if len(data) == self._STATE.size else (float(self.burst), now)
+
+                (state, wait) = self._take(tokens, now, state)
+                os.pwrite(fd, self._STATE.pack(*state), 0)
+            finally:
+                os.close(fd)  # also releases the lock
+        return wait
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+def aid_limiter(host_3270, region, rate, burst=1, directory=None):
+    """ AID Limiter
+
+    The one shared token bucket of a host and region in this process.
+    The first call for a (host, region) sets its `rate` and `burst`.
+
+    :param str host_3270: the 3270 host
+    :param str region: the region or application ID
+    :param float rate: AID keys per second
+    :param int burst: the AID keys allowed at once
+    :param str directory: when given, share the bucket with the other processes through a file here
+    :rtype: TokenBucket
+    """
+
+    key = (host_3270, region, directory)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            if directory is None:
+                limiter = TokenBucket(rate, burst)
+            else:
+                name = _UNSAFE_CHARS.sub('_', '{}-{}'.format(host_3270, region))
+                limiter = FileTokenBucket(os.path.join(directory, '{}.aid-bucket'.format(name)), rate, burst)
+            _limiters[key] = limiter
+        return limiter
@@ -0,0 +1,139 @@
+""" Screen Registry
+
+Identify "which screen am I on" from one screen read.
+Each named screen is declared by anchor texts at fixed positions, plus the fields to extract.
+
+    registry = ScreenRegistry()
+    registry.register('signon', [(2, 23, 'WFAC SECURITY SIGNON')], fields={'status': (24, 1, 80)})
+    registry.register('rejected', [(17, 2, 'REJECTED')])
+
+    match = emulator.classify(registry)
+    if match and match.name == 'signon':
+        print(match.fields['status'])
+
+The registry compiles an index of anchor slices, so all screens are checked in one pass.
+A registry is also a `wait_for_any()` condition: each screen read is classified once,
+and the matched screen name is the outcome.
+
+    (outcome, elapsed) = emulator.wait_for_any([('login', registry)], time_limit=0.300)
+"""
+
+from collections import namedtuple
+
+Anchor = namedtuple('Anchor', ['row', 'col', 'text'])
+FieldSpec = namedtuple('FieldSpec', ['row', 'col', 'length'])
+ScreenMatch = namedtuple('ScreenMatch', ['name', 'fields'])
+
+
+class ScreenDefinition(object):
+    """ Screen Definition
+
+    A named screen: its anchors must all match, and its fields are extracted on a match.
+    """
+
+    def __init__(self, name, anchors, fields=None):
+        if not anchors:
+            raise ValueError('screen "{}" needs at least one anchor'.format(name))
+
+        self.name = name
+        self.anchors = tuple(Anchor(*a) for a in anchors)
+        self.fields = dict((field_name, FieldSpec(*spec)) for (field_name, spec) in (fields or {}).items())
+
+
+class CompiledIndex(object):
+    """ Compiled Screen Index
+
+    The registry's anchors as precomputed buffer slices for one screen size.
+    Screens are grouped by their first anchor's slice, so each distinct slice is read once
+    and looked up in a dict of anchor texts.
+    """
+
+    def __init__(self, definitions, cols):
+        self.cols = cols
+        self.slots = []  # [(slice, {text: [(priority, definition, other anchor slices)]})]
+
+        slots = {}
+        for (priority, definition) in enumerate(definitions):
+            anchor_slices = [(self._slice(a.row, a.col, len(a.text)), a.text) for a in definition.anchors]
+            (key_slice, key_text) = anchor_slices[0]
+            field_slices = dict(
+                (field_name, self._slice(f.row, f.col, f.length)) for (field_name, f) in definition.fields.items())
+
+            key = (key_slice.start, key_slice.stop)
+            if key not in slots:
+                slots[key] = {}
+                self.slots.append((key_slice, slots[key]))
+            slots[key].setdefault(key_text, []).append((priority, definition, anchor_slices[1:], field_slices))
+
+    def _slice(self, row, col, length):
+        offset = (row - 1) * self.cols + (col - 1)
+        return slice(offset, offset + length)
+
+    def classify(self, text):
+        best = None
+        for (key_slice, candidates_by_text) in self.slots:
+            for candidate in candidates_by_text.get(text[key_slice], ()):
+                (priority, definition, anchor_slices, field_slices) = candidate
+                if best is not None and best[0] < priority:
+                    continue
+                if all(text[anchor_slice] == anchor_text for (anchor_slice, anchor_text) in anchor_slices):
+                    best = candidate
+
+        if best is None:
+            return None
+
+        (priority, definition, anchor_slices, field_slices) = best
+        fields = dict((field_name, text[field_slice].strip()) for (field_name, field_slice) in field_slices.items())
+        return ScreenMatch(definition.name, fields)
+
+
+class ScreenRegistry(object):
+    """ Screen Registry
+
+    Named screen definitions, checked in registration order: the first registered match wins.
+    """
+
+    def __init__(self):
+        self._definitions = []
+        self._indexes = {}
+
+    def register(self, name, anchors, fields=None):
+        """ Register Screen
+
+        :param str name: the screen name
+        :param list anchors: (row, col, text) tuples that must all be on the screen (1-based)
+        :param dict fields: {field name: (row, col, length)} to extract from a matched screen
+        :returns: self, to chain calls
+        """
+
+        self._definitions.append(ScreenDefinition(name, anchors, fields))
+        self._indexes = {}
+        return self
+
+    @property
+    def names(self):
+        return [d.name for d in self._definitions]
+
+    def compile(self, cols=80):
+        """ Compile Index
+
+        The index is compiled once per screen width, and again after `register()`.
+
+        :param int cols: the screen width
+        :rtype: CompiledIndex
+        """
+
+        index = self._indexes.get(cols)
+        if index is None:
+            index = self._indexes[cols] = CompiledIndex(self._definitions, cols)
+        return index
+
+    def classify(self, screen):
+        """ Classify Screen
+
+        :param Screen screen: a screen snapshot
+        :returns: the matched screen name and its fields, or None when no screen matches
+        :rtype: ScreenMatch
+        """
+
+        return self.compile(screen.cols).classify(screen.text)
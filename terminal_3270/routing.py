@@ -0,0 +1,229 @@
+""" Host Routing
+
+Route new sessions over several hosts or LPARs that run the same application.
+Each new session goes to the least-loaded host, by live session count over its weight,
+or with `strategy='latency'`, to the host with the lowest recent screen-wait time.
+A routed session reports the wait time of each screen it finds to `record_latency()`.
+A host that fails to connect is ejected for `eject_time` seconds.
+
+With an `aid_rate`, each host has its own AID limiter, see `terminal_3270.ratelimit`;
+it replaces any `aid_limiter` in the session's emulator options.
+
+    router = HostRouter([('mvs1.example.com', 2.0), 'mvs2.example.com'], strategy='latency', aid_rate=5.0)
+
+    with MySignOnSession(username, password, app_id, signon_username, signon_password, None,
+                         router=router) as session:
+        results = session.get_results()
+
+    print(router.stats())
+"""
+
+import logging
+import threading
+from timeit import default_timer as timer
+
+from terminal_3270.ratelimit import aid_limiter
+
+log = logging.getLogger(__name__)
+
+DEFAULT_EJECT_TIME = 30.0  # seconds
+DEFAULT_LATENCY_DECAY = 0.3  # the weight of the newest latency in its moving average
+
+
+class RoutingError(Exception):
+    pass
+
+
+class HostEndpoint(object):
+    """ Host Endpoint
+
+    One 3270 host, its weight and live routing state.
+    """
+
+    def __init__(self, host_3270, weight=1.0):
+        """ New Host Endpoint
+
+        :param str host_3270: the 3270 host
+        :param float weight: the host's share of the sessions, relative to the other hosts
+        :raises: ValueError for an invalid weight
+        """
+
+        if weight <= 0.0:
+            raise ValueError('"weight" must be a positive number')
+
+        self.host_3270 = host_3270
+        self.weight = float(weight)
+
+        self.sessions = 0
+        self.latency = None
+        self.failures = 0
+        self.ejected_until = None
+
+    def load(self):
+        """ The session count with one more session, over the weight """
+        return (self.sessions + 1) / self.weight
+
+    def ejected(self, now):
+        return (self.ejected_until is not None and now < self.ejected_until)
+
+    def __repr__(self):
+        return '<HostEndpoint {} weight={} sessions={}>'.format(self.host_3270, self.weight, self.sessions)
+
+
+class HostRouter(object):
+    """ Host Router
+
+    A thread-safe choice of host for each new session; one router may be shared by many sessions.
+    """
+
+    STRATEGIES = ('least_loaded', 'latency')
+
+    def __init__(self, endpoints, strategy='least_loaded', eject_after=1, eject_time=DEFAULT_EJECT_TIME,
+                 latency_decay=DEFAULT_LATENCY_DECAY, aid_rate=None, aid_burst=1, aid_directory=None):
+        """ New Host Router
+
+        :param list endpoints: hosts as strings, (host_3270, weight) tuples or HostEndpoint objects
+        :param str strategy: 'least_loaded' or 'latency'; a host without a latency yet is tried first
+        :param int eject_after: eject a host after this many failed connects in a row
+        :param float eject_time: seconds an ejected host gets no new sessions
+        :param float latency_decay: the weight of the newest latency in the moving average, 0.0 to 1.0
+        :param float aid_rate: when given, AID keys per second to each host, see `aid_limiter()`
+        :param int aid_burst: the AID keys allowed at once to each host
+        :param str aid_directory: when given, share each host's AID limiter with the other processes
+        :raises: ValueError for no endpoints or an unknown strategy
+        """
+
+        if strategy not in self.STRATEGIES:
+            raise ValueError('"strategy" must be one of {}'.format(', '.join(self.STRATEGIES)))
+
+        self.endpoints = []
+        for endpoint in endpoints:
+            if isinstance(endpoint, str):
+                endpoint = HostEndpoint(endpoint)
+            elif not isinstance(endpoint, HostEndpoint):
+                endpoint = HostEndpoint(*endpoint)
+            self.endpoints.append(endpoint)
+
+        if not self.endpoints:
+            raise ValueError('a HostRouter needs at least one endpoint')
+
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_time = eject_time
+        self.latency_decay = latency_decay
+        self.aid_rate = aid_rate
+        self.aid_burst = aid_burst
+        self.aid_directory = aid_directory
+
+        self._lock = threading.Lock()
+        self._by_host = dict((e.host_3270, e) for e in self.endpoints)
+
+    @property
+    def hosts(self):
+        return [e.host_3270 for e in self.endpoints]
+
+    def _score(self, endpoint):
+        if self.strategy == 'latency':
+            return ((endpoint.latency or 0.0) * endpoint.load(), endpoint.load())
+        return (endpoint.load(), endpoint.latency or 0.0)
+
+    def acquire(self, exclude=()):
+        """ Acquire Host
+
+        Choose the host for a new session, and count the session on it until `release()`.
+        The first of equally good hosts, in `endpoints` order, wins.
+
+        :param exclude: hosts not to choose, e.g. the ones that just failed
+        :returns: the chosen host
+        :rtype: str
+        :raises: RoutingError when every host is ejected or excluded
+        """
+
+        now = timer()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.host_3270 not in exclude and not e.ejected(now)]
+            if not candidates:
+                raise RoutingError('no 3270 host available of {}'.format(', '.join(self.hosts)))
+
+            endpoint = min(candidates, key=self._score)
+            endpoint.sessions += 1
+            return endpoint.host_3270
+
+    def release(self, host_3270, failed=False):
+        """ Release Host
+
+        End a session's count on its host.
+
+        :param str host_3270: the host from `acquire()`
+        :param bool failed: True when the session could not connect; this may eject the host
+        """
+
+        with self._lock:
+            endpoint = self._by_host[host_3270]
+            endpoint.sessions = max(0, endpoint.sessions - 1)
+
+            if failed:
+                endpoint.failures += 1
+                if endpoint.failures >= self.eject_after:
+                    endpoint.ejected_until = timer() + self.eject_time
+                    log.warning('router ejected "{}" for {} seconds after {} failures'.format(
+                        host_3270, self.eject_time, endpoint.failures))
+
+    def record_connect(self, host_3270):
+        """ Record Connect
+
+        Record a successful connect and login; this resets the host's failures.
+
+        :param str host_3270: the host
+        """
+
+        with self._lock:
+            endpoint = self._by_host[host_3270]
+            endpoint.failures = 0
+            endpoint.ejected_until = None
+
+    def record_latency(self, host_3270, seconds):
+        """ Record Latency
+
+        Add a screen-wait time on the host to its moving average.
+
+        :param str host_3270: the host
+        :param float seconds: the time a screen took to render
+        """
+
+        with self._lock:
+            endpoint = self._by_host[host_3270]
+            if endpoint.latency is None:
+                endpoint.latency = seconds
+            else:
+                endpoint.latency += self.latency_decay * (seconds - endpoint.latency)
+
+    def aid_limiter(self, host_3270, region):
+        """ AID Limiter
+
+        :param str host_3270: the host
+        :param str region: the region or application ID
+        :returns: the host's own AID limiter, shared by its sessions, or None without an `aid_rate`
+        :rtype: TokenBucket
+        """
+
+        if self.aid_rate is None:
+            return None
+        return aid_limiter(host_3270, region, self.aid_rate, self.aid_burst, self.aid_directory)
+
+    def stats(self):
+        """ Routing Stats
+
+        :returns: {host_3270: {'weight', 'sessions', 'latency', 'failures', 'ejected'}}
+        :rtype: dict
+        """
+
+        now = timer()
+        with self._lock:
+            return dict((e.host_3270, {
+                'weight': e.weight,
+                'sessions': e.sessions,
+                'latency': e.latency,
+                'failures': e.failures,
+                'ejected': e.ejected(now),
+            }) for e in self.endpoints)
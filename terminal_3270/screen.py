@@ -0,0 +1,282 @@
+""" 3270 Screen Snapshot
+
+A Screen holds one full read of the terminal buffer, e.g. 24x80, 43x80 or 27x132.
+Every screen query answers from memory instead of another s3270 round trip.
+
+    screen = emulator.snapshot()
+
+    if screen.found(2, 23, 'WFAC SECURITY SIGNON'):
+        status_text = screen.row(24)
+
+The buffer is one contiguous latin-1 `bytes` object, with an optional parallel attribute byte array.
+`row_view()` and `region_view()` give zero-copy memoryview slices; text is decoded only when asked for.
+"""
+
+from collections import namedtuple
+
+ENCODING = 'latin-1'
+
+# A changed run of characters on one row: 1-based `row` and `col`, and its `length`.
+ScreenChange = namedtuple('ScreenChange', ['row', 'col', 'length'])
+
+
+class Screen(object):
+    """ Screen Snapshot
+
+    An immutable copy of the terminal screen.
+    Rows and columns are 1-based, as listed in the status area of the terminal.
+    A row or column off the screen raises IndexError.
+    """
+
+    __slots__ = ('_buffer', '_attributes', '_rows', '_cols', '_text', '_lines')
+
+    def __init__(self, lines):
+        """ New Screen
+
+        :param list lines: the screen rows as strings (or latin-1 bytes), all the same width
+        """
+
+        rows = [(line if isinstance(line, bytes) else line.encode(ENCODING)) for line in lines]
+        self._init(b''.join(rows), len(rows[0]) if rows else 0, None)
+
+    def _init(self, buffer, cols, attributes):
+        self._buffer = buffer
+        self._cols = cols
+        self._rows = (len(buffer) // cols) if cols else 0
+        self._attributes = attributes
+        self._text = None
+        self._lines = None
+
+    @classmethod
+    def from_buffer(cls, buffer, cols, attributes=None):
+        """ Screen from a Buffer
+
+        :param bytes buffer: the whole screen, row after row, in latin-1
+        :param int cols: the screen width
+        :param bytes attributes: optional attribute byte per screen position, parallel to `buffer`
+        :rtype: Screen
+        :raises: ValueError when the sizes do not match
+        """
+
+        if cols <= 0 or len(buffer) % cols:
+            raise ValueError('a {} byte buffer is not whole rows of {} columns'.format(len(buffer), cols))
+        if attributes is not None and len(attributes) != len(buffer):
+            raise ValueError('"attributes" must be the same size as "buffer"')
+
+        screen = cls.__new__(cls)
+        screen._init(bytes(buffer), cols, None if attributes is None else bytes(attributes))
+        return screen
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def cols(self):
+        return self._cols
+
+    @property
+    def buffer(self):
+        """ The whole screen as latin-1 bytes, row after row. """
+        return self._buffer
+
+    @property
+    def attributes(self):
+        """ The attribute byte per screen position, or None. """
+        return self._attributes
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._lines = tuple(self.row(r) for r in range(1, self._rows + 1))
+        return self._lines
+
+    @property
+    def text(self):
+        """ The whole screen as one string, row after row. """
+        if self._text is None:
+            self._text = self._buffer.decode(ENCODING)
+        return self._text
+
+    def _offset(self, row, col):
+        if not (1 <= row <= self._rows and 1 <= col <= self._cols):
+            raise IndexError('({}, {}) is not on a {}x{} screen'.format(row, col, self._rows, self._cols))
+        return (row - 1) * self._cols + (col - 1)
+
+    def row_view(self, row):
+        """ Row View
+
+        :param int row: the row number (1-based)
+        :returns: a zero-copy view of the row bytes
+        :rtype: memoryview
+        """
+
+        start = self._offset(row, 1)
+        return memoryview(self._buffer)[start:(start + self._cols)]
+
+    def region_view(self, row, col, length):
+        """ Region View
+
+        :param int row: row where the region starts (1-based)
+        :param int col: col where the region starts (1-based)
+        :param int length: length of the region; it wraps onto the next row, and stops at the end of the screen
+        :returns: a zero-copy view of the region bytes
+        :rtype: memoryview
+        """
+
+        offset = self._offset(row, col)
+        return memoryview(self._buffer)[offset:(offset + length)]
+
+    def attribute(self, row, col):
+        """ Attribute Byte
+
+        :param int row: row (1-based)
+        :param int col: col (1-based)
+        :returns: the attribute byte at (row, col), or None without attributes
+        :rtype: int
+        """
+
+        if self._attributes is None:
+            return None
+        return self._attributes[self._offset(row, col)]
+
+    def row(self, row):
+        """ Screen Row
+
+        :param int row: the row number (1-based)
+        :returns: the whole row as a string
+        :rtype: str
+        """
+
+        if self._lines is not None and 1 <= row <= self._rows:
+            return self._lines[row - 1]
+        return str(self.row_view(row), ENCODING)
+
+    def region(self, row, col, length):
+        """ Screen Region
+
+        Get a string of `length` at screen co-ordinates `row`/`col`.
+        This wraps onto the next row, just like the s3270 Ascii(row,col,length) action.
+
+        :param int row: row where string starts (1-based)
+        :param int col: col where string starts (1-based)
+        :param int length: length of string
+        :rtype: str
+        """
+
+        return str(self.region_view(row, col, length), ENCODING)
+
+    def found(self, row, col, text):
+        """ Found Text
+
+        :param int row: row where string starts (1-based)
+        :param int col: col where string starts (1-based)
+        :param str text: the text that should be there
+        :returns: True when `text` is at `row`/`col`
+        :rtype: bool
+        """
+
+        try:
+            wanted = text.encode(ENCODING)
+        except UnicodeEncodeError:
+            return False
+        return self.region_view(row, col, len(wanted)) == wanted
+
+    def find(self, text):
+        """ Find Text
+
+        Search the whole screen for `text`.
+
+        :param str text: the text to find
+        :returns: the first (row, col) location (1-based), or None when not found
+        :rtype: tuple
+        """
+
+        try:
+            offset = self._buffer.find(text.encode(ENCODING))
+        except UnicodeEncodeError:
+            return None
+        if offset < 0:
+            return None
+        return (offset // self._cols + 1, offset % self._cols + 1)
+
+    def changed_rows(self, other):
+        """ Changed Rows
+
+        :param Screen other: an earlier screen of the same size
+        :returns: the row numbers (1-based) that differ
+        :rtype: list
+        :raises: ValueError for screens of different sizes
+        """
+
+        if (self._rows, self._cols) != (other._rows, other._cols):
+            raise ValueError('cannot compare a {!r} to a {!r}'.format(self, other))
+
+        if self._buffer == other._buffer:
+            return []
+
+        view = memoryview(self._buffer)
+        other_view = memoryview(other._buffer)
+        changed = []
+        for start in range(0, len(self._buffer), self._cols):
+            end = start + self._cols
+            if view[start:end] != other_view[start:end]:
+                changed.append(start // self._cols + 1)
+        return changed
+
+    def diff(self, other):
+        """ Screen Diff
+
+        Compare this screen with an earlier read, e.g. to see what the host redrew.
+
+        :param Screen other: an earlier screen of the same size
+        :returns: the changed runs of characters, in screen order; empty when the screens are equal
+        :rtype: list of ScreenChange
+        :raises: ValueError for screens of different sizes
+        """
+
+        changes = []
+        for row in self.changed_rows(other):
+            start = self._offset(row, 1)
+            pairs = zip(self._buffer[start:(start + self._cols)], other._buffer[start:(start + self._cols)])
+
+            run_col = None
+            for (index, (ch, other_ch)) in enumerate(pairs):
+                if ch != other_ch:
+                    if run_col is None:
+                        run_col = index
+                elif run_col is not None:
+                    changes.append(ScreenChange(row, run_col + 1, index - run_col))
+                    run_col = None
+            if run_col is not None:
+                changes.append(ScreenChange(row, run_col + 1, self._cols - run_col))
+        return changes
+
+    def __contains__(self, text):
+        return self.find(text) is not None
+
+    def __eq__(self, other):
+        if not isinstance(other, Screen):
+            return NotImplemented
+        return (self._cols == other._cols and self._buffer == other._buffer)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash((self._cols, self._buffer))
+
+    def __getstate__(self):
+        return (self._buffer, self._cols, self._attributes)
+
+    def __setstate__(self, state):
+        self._init(*state)
+
+    def __str__(self):
+        return '\n'.join(self.lines)
+
+    def __repr__(self):
+        return '<Screen {}x{}>'.format(self._rows, self._cols)
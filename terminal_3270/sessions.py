@@ -12,16 +12,21 @@ OR
 RHEL/YUM has RPM package(s) for x3270 -> "yum install x3270-x11"
 """
 
-from time import sleep
-from .emulator import EmulatorPlus as Emulator
+from .emulator import EmulatorPlus as Emulator, ScreenWaitError, check_status
+from terminal_3270.heartbeat import HEARTBEAT_INTERVAL, session_heartbeat
 from terminal_3270.login_mixins import ACF2LoginMixin, RACFLoginMixin
-from terminal_3270.wait_until import WaitUntil
+from terminal_3270.registry import ScreenRegistry
+from terminal_3270.routing import RoutingError
 
 import logging
+import re
+from functools import lru_cache
+from timeit import default_timer as timer
+
 log = logging.getLogger(__name__)
 
 TIMEOUT_WAIT_SCREEN = 10
-TIMEOUT_SIGNON_SCREEN = 0.350  # ms
+TIMEOUT_SIGNON_SCREEN = 0.350  # 350 ms, upper bound to wait for the SIGNON screens
 
 
 class SessionError(Exception):
@@ -67,7 +72,11 @@ class Session3270(object):
 
     """
 
-    def __init__(self, username, password, app_id, host_3270, visible=False):
+    # True when a heartbeat found the connection dead; see `terminal_3270.heartbeat`.
+    stale = False
+
+    def __init__(self, username, password, app_id, host_3270, visible=False, standby=None, router=None,
+                 **emulator_options):
         """ New Session3270
 
         Start the terminal session and login.
@@ -77,6 +86,11 @@ class Session3270(object):
         :param str app_id: login `application ID` sends user to the LOGIN screen
         :param str host_3270: enter the hostname to the 3270 server
         :param bool visible: default False, when True means open a visible X-Windows terminal
+        :param EmulatorStandby standby: take a warm emulator from this standby when one is ready
+            with the same `emulator_options`, see `terminal_3270.standby`
+        :param HostRouter router: choose the `host_3270` from this router on each connect,
+            see `terminal_3270.routing`
+        :param dict emulator_options: extra EmulatorPlus keyword arguments, e.g. `app_class`
         """
 
         self.host_3270 = host_3270
@@ -84,8 +98,13 @@ class Session3270(object):
         self.password = password
         self.app_id = app_id
         self.visible = visible
+        self.standby = standby
+        self.router = router
+        self.emulator_options = emulator_options
 
         self.term_emulator = None
+        self.heartbeat = None
+        self.routed_host = None
 
     def __enter__(self):
         """ Enter Context Manager """
@@ -113,21 +132,173 @@ class Session3270(object):
         Connect to host and start session.
         """
 
-        self.term_emulator = Emulator(visible=self.visible, timeout=TIMEOUT_WAIT_SCREEN)
-        self.term_emulator.connect(self.host_3270)
+        self.stale = False
+
+        try:
+            if self.router is not None:
+                self._connect_routed()
+                return
+
+            self._connect_emulator()
+
+            with self.term_emulator.phase('login'):
+                logged_in = self.login()
+
+            if not logged_in:
+                raise LoginError('User "{}" could not login to "{}"!'.format(self.username, self.host_3270))
+        except Exception:
+            self._abort_connect()
+            raise
+
+    def _connect_emulator(self, emulator_options=None):
+        """ Connect an emulator to the `host_3270`, without login
+
+        :param dict emulator_options: the EmulatorPlus options, instead of the `emulator_options`
+        """
+
+        if emulator_options is None:
+            emulator_options = self.emulator_options
+
+        self.term_emulator = None
+        if self.standby is not None:
+            self.term_emulator = self.standby.take(self.host_3270, emulator_options)
+        if self.term_emulator is None:
+            self.term_emulator = Emulator(visible=self.visible, timeout=TIMEOUT_WAIT_SCREEN, **emulator_options)
+
+        # A standby emulator may already be connected, at the login screen.
+        if getattr(self.term_emulator, 'last_host', None) != self.host_3270:
+            with self.term_emulator.phase('connect'):
+                self.term_emulator.connect(self.host_3270)
+
+    def _connect_routed(self):
+        """ Connect to a Routed Host
+
+        Connect to the `router` host for a new session, and login.
+        A host that fails to connect is released as failed, and the next host is tried.
+        The emulator takes the host's own AID limiter, when the router has one,
+        and reports every screen it finds to the router's latency of the host.
 
-        if not self.login():
+        :raises: RoutingError from the last connect error when no host is left to try
+        """
+
+        failed_hosts = set()
+        last_error = None
+        while True:
+            try:
+                self.host_3270 = self.router.acquire(exclude=failed_hosts)
+            except RoutingError as e:
+                if last_error is None:
+                    raise
+                raise RoutingError('{}; last connect error: {}'.format(e, last_error)) from last_error
+
+            emulator_options = self.emulator_options
+            limiter = self.router.aid_limiter(self.host_3270, self.app_id)
+            if limiter is not None:
+                emulator_options = dict(emulator_options, aid_limiter=limiter)
+
+            try:
+                self._connect_emulator(emulator_options)
+            except Exception as e:
+                log.warning('session could not connect to "{}": {}'.format(self.host_3270, e))
+                self.router.release(self.host_3270, failed=True)
+                failed_hosts.add(self.host_3270)
+                last_error = e
+                if self.term_emulator is not None:
+                    self.term_emulator.terminate()
+                    self.term_emulator = None
+                continue
+
+            self.routed_host = self.host_3270
+            break
+
+        self.term_emulator.wait_listener = self._routed_wait_listener(self.host_3270)
+
+        with self.term_emulator.phase('login'):
+            logged_in = self.login()
+
+        if not logged_in:
             raise LoginError('User "{}" could not login to "{}"!'.format(self.username, self.host_3270))
 
+        self.router.record_connect(self.host_3270)
+
+    def _routed_wait_listener(self, host_3270):
+        """ A wait listener that records each found screen's wait time on the routed host """
+
+        router = self.router
+
+        def record_wait(seconds, found):
+            if found:
+                router.record_latency(host_3270, seconds)
+        return record_wait
+
+    def _release_routed_host(self):
+        if self.routed_host is not None:
+            self.router.release(self.routed_host)
+            self.routed_host = None
+
+    def _abort_connect(self):
+        """ Abort Connect
+
+        Terminate the emulator of a failed connect, and release its routed host.
+        A cleanup error is logged, so the connect error is the one raised.
+        """
+
+        try:
+            Session3270.disconnect(self)
+        except Exception as e:
+            log.warning('session cleanup failed for "{}": {}'.format(self.host_3270, e))
+
+    def is_alive(self):
+        """ Is Session Alive
+
+        Probe the s3270 connection state; this costs one round trip.
+
+        :returns: True when the terminal is still connected to the host
+        :rtype: bool
+        """
+
+        if not self.term_emulator or self.stale:
+            return False
+
+        try:
+            return self.term_emulator.is_connected()
+        except Exception as e:
+            log.warning('session probe failed for "{}": {}'.format(self.host_3270, e))
+            return False
+
+    def start_heartbeat(self, interval=HEARTBEAT_INTERVAL, action=None):
+        """ Start Heartbeat
+
+        Keep an idle session from the host timeout, and mark a dead session `stale`.
+        `disconnect()` stops the heartbeat.
+
+        :param float interval: beat after this many idle seconds
+        :param action: an s3270 command (bytes), a callable(session), or None to only check the connection
+        :rtype: terminal_3270.heartbeat.Heartbeat
+        """
+
+        self.stop_heartbeat()
+        self.heartbeat = session_heartbeat(self, interval=interval, action=action).start()
+        return self.heartbeat
+
+    def stop_heartbeat(self):
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+            self.heartbeat = None
+
     def disconnect(self):
         """ Disconnect Terminal
 
         Disconnect from host and end session.
         """
 
-        if self.term_emulator:
-            self.term_emulator.terminate()
+        self.stop_heartbeat()
+        try:
+            if self.term_emulator:
+                self.term_emulator.terminate()
+        finally:
             self.term_emulator = None
+            self._release_routed_host()
 
 # =============================================================================
 
@@ -164,6 +335,18 @@ class SignOnSession(Session3270):
 
         session.disconnect()
 
+    With `persistent_signon=True`, the session stays connected and signed on between `with` blocks.
+    Back-to-back jobs by the same SIGNON user skip the SIGNOFF/SIGNON cycle;
+    call `disconnect()` for the real teardown.
+
+        session = MySignOnSession(..., persistent_signon=True)
+
+        for job in jobs:
+            with session:
+                results = session.get_results(job)
+
+        session.disconnect()
+
     """
 
     # Set the signon name to match the "/FOR <signon_screen_name>" on the real server.
@@ -174,10 +357,18 @@ class SignOnSession(Session3270):
     signon_screen_str_row = 2
     signon_screen_str_col = 23
 
+    signon_status_row = 24
     signon_passing_strings = ['SIGNON SUCCESSFUL', 'ALREADY SIGNED ON']
     signoff_passing_strings = ['SIGNOFF SUCCESSFUL']
 
-    def __init__(self, username, password, app_id, signon_username, signon_password, host_3270, visible=False):
+    # Status strings that show the SIGNON has lapsed, e.g. after a host timeout.
+    signon_lapsed_strings = ['SIGNON REQUIRED', 'NOT SIGNED ON']
+
+    # The host's queue indicator on a queued screen: this screen's number, then the queued total.
+    queued_screen_pattern = re.compile(r'QUEUED MESSAGE\s+(\d+)\s+OF\s+(\d+)')
+
+    def __init__(self, username, password, app_id, signon_username, signon_password, host_3270, visible=False,
+                 persistent_signon=False, **emulator_options):
         """ New SignOnSession
 
         Some 3270 servers require a two-step authentication: LOGIN and SIGNON, in that order.
@@ -192,12 +383,62 @@ class SignOnSession(Session3270):
         :param str signon_password: signon password
         :param str host_3270: enter the hostname to the 3270 server
         :param bool visible: default False, when True means open a visible X-Windows terminal
+        :param bool persistent_signon: when True, stay connected and signed on after each `with` block
+        :param dict emulator_options: extra EmulatorPlus keyword arguments, e.g. `app_class`
         """
 
-        super(SignOnSession, self).__init__(username, password, app_id, host_3270, visible=visible)
+        super(SignOnSession, self).__init__(username, password, app_id, host_3270, visible=visible, **emulator_options)
 
         self.signon_username = signon_username
         self.signon_password = signon_password
+        self.persistent_signon = persistent_signon
+
+        # The SIGNON user in effect on the host, or None when not signed on.
+        self.signed_on_user = None
+        self._signon_screens = None
+
+    def __enter__(self):
+        """ Enter Context Manager
+
+        A persistent session connects once; later blocks only check the SIGNON.
+        A persistent session that went `stale` or lost its connection is disconnected and connects again.
+        """
+
+        if self.persistent_signon and self.term_emulator:
+            if not self.stale and self.is_alive():
+                self.ensure_signed_on()
+                return self
+
+            log.info('persistent session to "{}" is not connected; connecting again'.format(self.host_3270))
+            self.disconnect()
+
+        self.connect()
+        return self
+
+    def __exit__(self, *args):
+        """ Exit Context Manager
+
+        A persistent session stays signed on for the next block.
+        """
+
+        if not self.persistent_signon:
+            self.disconnect()
+
+    @property
+    def signon_screens(self):
+        """ SIGNON Screens
+
+        The SIGNON screen as a ScreenRegistry: 'signon' by its header, with its status bar as the 'status' field.
+        A screen read is classified against it in one pass.
+
+        :rtype: ScreenRegistry
+        """
+
+        if self._signon_screens is None:
+            self._signon_screens = ScreenRegistry().register(
+                'signon', [(self.signon_screen_str_row, self.signon_screen_str_col, self.signon_screen_str)],
+                fields={'status': (self.signon_status_row, 1, 80)})
+        return self._signon_screens
 
     def send_signon_credentials(self):
         """ Send SIGNON Credentials
@@ -208,31 +449,82 @@ class SignOnSession(Session3270):
 
         self.term_emulator.send_enter()
 
-    def _clear_screen_queue(self):
-        """ Clear Screen Queue.
+    def queue_indicator(self, screen):
+        """ Queue Indicator
 
-        Remove one layer of the screen queue.
-        Eventually the SIGNON HEADER should show.
+        :param Screen screen: a screen snapshot
+        :returns: this queued screen's number and the queued total, e.g. (2, 5) for "QUEUED MESSAGE 2 OF 5";
+            None when the screen shows no queue indicator
+        :rtype: tuple
         """
 
-        self.term_emulator.send_clear()
-        self.term_emulator.send_pa_key(2)
-
-        # A BLANK first line means a cleared screen.
-        if self.term_emulator.string_found(1, 1, ' ' * 80):
-            return True
-        else:
-            return False
+        match = self.queued_screen_pattern.search(screen.text)
+        if match is None:
+            return None
+        return (int(match.group(1)), int(match.group(2)))
 
     def remove_queued_screens(self, time_limit=0.750):
         """ Remove Queued Screens.
 
         Prior SIGNON may leave "queued screens" before the expected SIGNON screen.
-        This routine removes the "queued screens".
+        This routine removes the "queued screens" and leaves a blank screen.
+
+        A screen with a queue indicator, see `queued_screen_pattern`, is dequeued with one PA2,
+        and the last one with one CLEAR. Without an indicator, it sends CLEAR once,
+        then PA2 until a blank screen; a screen that a PA2 leaves unchanged, e.g. an application error,
+        is not queued, so it stops there. It stops at once on the SIGNON header.
+        The screen before that CLEAR is not counted, since nothing shows it was queued.
+
+        :param float time_limit: give up after this many seconds
+        :returns: the number of queued screens discarded: the screens with an indicator,
+            and the screens a PA2 removed
+        :rtype: int
         """
 
-        wait_until = WaitUntil(time_limit, self._clear_screen_queue)
-        wait_until.poll()
+        emulator = self.term_emulator
+        start_t = timer()
+        discarded = 0
+        cleared = False
+        pa2_screen = None  # the screen before the last PA2 without an indicator
+
+        while True:
+            screen = emulator.snapshot()
+            if pa2_screen is not None:
+                if screen == pa2_screen:
+                    if pa2_screen.row(1).strip():
+                        log.warning('remove_queued_screens() stopped on a screen that PA2 does not remove')
+                    break
+                if pa2_screen.row(1).strip():
+                    discarded += 1  # a PA2 from a blank screen only shows the next one
+                pa2_screen = None
+
+            if emulator.classify(self.signon_screens) is not None:
+                break  # the same snapshot, classified without another read
+
+            queue = self.queue_indicator(screen)
+            if queue is not None:
+                discarded += 1
+                if queue[0] >= queue[1]:
+                    emulator.send_clear()  # the last queued screen
+                    break
+                emulator.send_pa_key(2)
+            elif not screen.row(1).strip():
+                break  # A BLANK first line means a cleared screen.
+            else:
+                if not cleared:
+                    # The screen before the CLEAR is not known to be queued.
+                    emulator.send_clear()
+                    cleared = True
+                    screen = emulator.snapshot()
+                emulator.send_pa_key(2)
+                pa2_screen = screen
+
+            if (timer() - start_t) >= time_limit:
+                log.warning('remove_queued_screens() gave up after {} seconds'.format(time_limit))
+                break
+
+        log.debug('remove_queued_screens() discarded={} elapsed={}'.format(discarded, timer() - start_t))
+        return discarded
 
     def signon(self):
         """ SIGNON
@@ -252,22 +544,64 @@ class SignOnSession(Session3270):
             self.signon_screen_str_col,
             time_limit=TIMEOUT_SIGNON_SCREEN)
 
-        # SIGNON USER @(*, *)
-        self.term_emulator.wait_for_field()
-        self.term_emulator.key_entry(self.signon_username)
-
-        # SIGNON PASSWORD @(*, *)
+        # SIGNON USER @(*, *), then SIGNON PASSWORD @(*, *) in one round trip.
         # Assume cursor automatically moves to the PASSWORD field.
-        self.term_emulator.key_entry(self.signon_password)
+        self.term_emulator.wait_for_field()
+        self.term_emulator.key_sequence(self.signon_username, self.signon_password)
+        credentials_screen = self.term_emulator.snapshot()
 
         self.send_signon_credentials()
 
-        # delay to wait for the status bar
-        sleep(TIMEOUT_SIGNON_SCREEN)
+        # Wait for the host to write the status bar.
+        self.wait_for_status(credentials_screen, self.signon_passing_strings)
 
-        (status_bool, status_bar) = self.term_emulator.status_bar(passing_strings=self.signon_passing_strings)
+        (status_bool, status_bar) = self.term_emulator.status_bar(
+            passing_strings=self.signon_passing_strings, status_row=self.signon_status_row)
         return (status_bool, status_bar)
 
+    def wait_for_status(self, before, passing_strings):
+        """ Wait for Status Bar
+
+        Wait until the status bar shows a passing string, or any other new status.
+        Each screen read is classified once against the `signon_screens`, and both are checked on its status.
+        A blank status, e.g. a clear before the message is drawn, is not a new status;
+        another new status is only returned once the screen settles.
+
+        :param Screen before: the screen snapshot before the AID key
+        :param list passing_strings: status strings that mean success
+        :returns: 'passed', 'changed', or None when the host did not answer in time
+        :rtype: str
+        """
+
+        screens = self.signon_screens
+
+        @lru_cache(maxsize=2)  # this read and `before`
+        def status(screen):
+            """ The 'status' field of the SIGNON screen, or the status row of another screen """
+            match = screens.classify(screen)
+            return match.fields['status'] if match is not None else screen.row(self.signon_status_row).strip()
+
+        def passed(screen):
+            return check_status(status(screen), passing_strings=passing_strings)
+
+        def changed(screen):
+            status_text = status(screen)
+            return bool(status_text) and status_text != status(before)
+
+        try:
+            (outcome, elapsed) = self.term_emulator.wait_for_any(
+                [('passed', passed), ('changed', changed)], time_limit=TIMEOUT_SIGNON_SCREEN)
+        except ScreenWaitError:
+            # status_bar() reports the unchanged status.
+            return None
+
+        if outcome == 'changed':
+            try:
+                self.term_emulator.wait_until_stable(time_limit=TIMEOUT_SIGNON_SCREEN)
+            except ScreenWaitError:
+                pass  # status_bar() reports the status as it is
+        return outcome
+
     def signoff(self, field_row=12, field_col=16):
         """ SIGNOFF
 
@@ -291,36 +625,110 @@ class SignOnSession(Session3270):
         self.term_emulator.wait_for_field()
         self.term_emulator.move_to(field_row, field_col)
         self.term_emulator.key_entry("Y")
+        signoff_screen = self.term_emulator.snapshot()
         self.term_emulator.send_enter()
 
-        (status_bool, status_bar) = self.term_emulator.status_bar(passing_strings=self.signoff_passing_strings)
+        self.wait_for_status(signoff_screen, self.signoff_passing_strings)
+
+        (status_bool, status_bar) = self.term_emulator.status_bar(
+            passing_strings=self.signoff_passing_strings, status_row=self.signon_status_row)
         return (status_bool, status_bar)
 
-    def connect(self):
-        """ Connect to Terminal
+    def signon_lapsed(self):
+        """ SIGNON Lapsed
 
-        Connect to host and signon; start session.
+        Read the screen again for a status that shows the SIGNON has lapsed.
+        A lapse while the session is idle is not on the cached snapshot, so this costs one round trip.
+
+        :returns: True when the host no longer has this SIGNON in effect
+        :rtype: bool
         """
 
-        super(SignOnSession, self).connect()
+        status_text = self.term_emulator.snapshot(refresh=True).row(self.signon_status_row)
+        return any(lapsed in status_text for lapsed in self.signon_lapsed_strings)
+
+    def ensure_signed_on(self):
+        """ Ensure Signed On
 
-        (signon_flag, status_bar) = self.signon()
+        SIGNON only when needed: the first time, after a lapse, or after a SIGNON user change.
+
+        :returns: True when a SIGNON was entered, False when the current SIGNON was kept
+        :rtype: bool
+        :raises: SignOnError when the SIGNON fails
+        """
+
+        if self.signed_on_user is not None:
+            if self.signed_on_user == self.signon_username and not self.signon_lapsed():
+                return False
+
+            if self.signed_on_user != self.signon_username:
+                self._signoff()
+            else:
+                log.info('SIGNON lapsed for "{}"'.format(self.signed_on_user))
+                self.signed_on_user = None
+
+        with self.term_emulator.phase('signon'):
+            (signon_flag, status_bar) = self.signon()
         log.info('SIGNON={} status=[{}]'.format(signon_flag, status_bar))
         if not signon_flag:
             raise SignOnError(
                 'User "{}" could not complete SIGNON to "{}"! status=[{}]'.format(
                     self.signon_username, self.host_3270, status_bar.strip()))
 
-    def disconnect(self):
-        """ Disconnect Terminal
+        self.signed_on_user = self.signon_username
+        return True
+
+    def switch_signon_user(self, signon_username, signon_password):
+        """ Switch SIGNON User
 
-        Disconnect from host and signon; end session.
+        Change the SIGNON user of a connected session, without a new LOGIN.
+        The old user is signed off first; switching to the same user keeps the SIGNON.
+
+        :param str signon_username: signon user
+        :param str signon_password: signon password
+        :raises: SignOnError when the SIGNON fails
         """
 
-        (signoff_flag, status_bar) = self.signoff()
+        self.signon_username = signon_username
+        self.signon_password = signon_password
+
+        if self.term_emulator:
+            self.ensure_signed_on()
+
+    def _signoff(self):
+        with self.term_emulator.phase('signoff'):
+            (signoff_flag, status_bar) = self.signoff()
         log.info('SIGNOFF={} status=[{}]'.format(signoff_flag, status_bar))
+        self.signed_on_user = None
+
+    def connect(self):
+        """ Connect to Terminal
+
+        Connect to host and signon; start session.
+        """
+
+        super(SignOnSession, self).connect()
+        self.signed_on_user = None
+
+        try:
+            self.ensure_signed_on()
+        except Exception:
+            self._abort_connect()
+            raise
+
+    def disconnect(self):
+        """ Disconnect Terminal
+
+        SIGNOFF when signed on, then disconnect from host; end session.
+        A dead connection skips the SIGNOFF, and the emulator is always terminated.
+        """
 
-        super(SignOnSession, self).disconnect()
+        try:
+            if self.signed_on_user is not None and self.is_alive():
+                self._signoff()
+        finally:
+            self.signed_on_user = None
+            super(SignOnSession, self).disconnect()
 
 # =============================================================================
 
@@ -0,0 +1,241 @@
+""" Warm Standby Emulators
+
+Starting s3270 and the TN3270 negotiation are on the critical path of every new session.
+An EmulatorStandby keeps idle EmulatorPlus processes started ahead of time,
+optionally already connected to the host at its login screen.
+A new session takes one, so its connect costs only the login keystrokes.
+
+    standby = EmulatorStandby(size=4, host_3270=HOST_3270).start()
+
+    with MySignOnSession(username, password, app_id, signon_username, signon_password, HOST_3270,
+                         standby=standby) as session:
+        results = session.get_results()
+
+    standby.close()
+
+The standby emulators are created with the standby's own emulator options.
+A session only takes one when its `emulator_options` are the same, e.g. the same `metrics` and `aid_limiter`;
+otherwise it connects a new emulator of its own.
+
+    standby = EmulatorStandby(size=4, host_3270=HOST_3270, metrics=metrics).start()
+    session = MySession3270(username, password, app_id, HOST_3270, standby=standby, metrics=metrics)
+"""
+
+import logging
+import threading
+from collections import deque
+from timeit import default_timer as timer
+
+from terminal_3270.emulator import EmulatorPlus
+
+log = logging.getLogger(__name__)
+
+TIMEOUT_STANDBY_EMULATOR = 10  # seconds, the s3270 Wait() timeout of standby emulators
+
+
+class EmulatorStandby(object):
+    """ Emulator Standby
+
+    A thread-safe stock of started emulators, refilled in the background after each `take()`.
+    """
+
+    def __init__(self, size=2, host_3270=None, visible=False, timeout=TIMEOUT_STANDBY_EMULATOR,
+                 max_age=None, retry_interval=5.0, emulator_factory=None, **emulator_options):
+        """ New EmulatorStandby
+
+        :param int size: keep this many emulators ready
+        :param str host_3270: when given, connect each emulator to this host ahead of time
+        :param bool visible: when True, run x3270 instead of s3270
+        :param int timeout: the timeout to any Wait() command sent to s3270
+        :param float max_age: discard a ready emulator older than this many seconds, e.g. before the host drops it
+        :param float retry_interval: seconds to wait before refilling again after an error
+        :param callable emulator_factory: returns a new EmulatorPlus, instead of the default
+        :param dict emulator_options: extra EmulatorPlus keyword arguments, e.g. `app_class`
+        :raises: ValueError for an invalid size
+        """
+
+        if size < 1:
+            raise ValueError('"size" must be at least 1')
+
+        self.size = size
+        self.host_3270 = host_3270
+        self.visible = visible
+        self.timeout = timeout
+        self.max_age = max_age
+        self.retry_interval = retry_interval
+        self.emulator_factory = emulator_factory
+        self.emulator_options = emulator_options
+
+        self._cond = threading.Condition(threading.Lock())
+        self._ready = deque()  # [(ready_t, emulator)]
+        self._closed = False
+        self._thread = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        """ Enter Context Manager """
+        return self.start()
+
+    def __exit__(self, *args):
+        """ Exit Context Manager """
+        self.close()
+
+    @property
+    def ready_count(self):
+        with self._cond:
+            return len(self._ready)
+
+    def new_emulator(self):
+        """ New Standby Emulator
+
+        Start an emulator and, with a `host_3270`, connect it and wait for the login screen.
+
+        :rtype: EmulatorPlus
+        """
+
+        if self.emulator_factory is not None:
+            emulator = self.emulator_factory()
+        else:
+            emulator = EmulatorPlus(visible=self.visible, timeout=self.timeout, **self.emulator_options)
+
+        if self.host_3270 is not None:
+            try:
+                emulator.connect(self.host_3270)
+                emulator.wait_for_field()
+            except Exception:
+                self._terminate(emulator)
+                raise
+        return emulator
+
+    def _terminate(self, emulator):
+        try:
+            emulator.terminate()
+        except Exception as e:
+            log.warning('standby could not terminate emulator: {}'.format(e))
+
+    def fill(self):
+        """ Fill Standby
+
+        Start emulators until `size` are ready.
+        """
+
+        while True:
+            with self._cond:
+                if self._closed or len(self._ready) >= self.size:
+                    return
+
+            emulator = self.new_emulator()
+            with self._cond:
+                if self._closed:
+                    break
+                self._ready.append((timer(), emulator))
+                log.debug('standby emulator ready, count={}'.format(len(self._ready)))
+
+        self._terminate(emulator)
+
+    def _expired(self, ready_t):
+        return (self.max_age is not None and (timer() - ready_t) >= self.max_age)
+
+    def take(self, host_3270=None, emulator_options=None):
+        """ Take Emulator
+
+        Take a ready emulator for a new session, and refill the standby in the background.
+        A connected emulator is only handed out for its own `host_3270`,
+        and any emulator only for the standby's own `emulator_options`.
+
+        :param str host_3270: the session host
+        :param dict emulator_options: the session's EmulatorPlus keyword arguments
+        :returns: a started emulator, connected to `host_3270` when this standby connects ahead;
+            None when no emulator is ready, or for other emulator options
+        :rtype: EmulatorPlus
+        """
+
+        if self.host_3270 is not None and host_3270 != self.host_3270:
+            return None
+
+        if (emulator_options or {}) != self.emulator_options:
+            log.warning('standby emulator options differ from the session options {}; not taking one'.format(
+                sorted(emulator_options or {})))
+            self.misses += 1
+            return None
+
+        emulator = None
+        stale = []
+        with self._cond:
+            while self._ready:
+                (ready_t, candidate) = self._ready.popleft()  # oldest first, before it ages out
+                if self._expired(ready_t):
+                    stale.append(candidate)
+                else:
+                    emulator = candidate
+                    break
+            self._cond.notify()
+
+        for candidate in stale:
+            self._terminate(candidate)
+
+        if emulator is not None and self.host_3270 is not None and not self._is_connected(emulator):
+            self._terminate(emulator)
+            emulator = None
+
+        if emulator is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return emulator
+
+    def _is_connected(self, emulator):
+        try:
+            return emulator.is_connected()
+        except Exception as e:
+            log.warning('standby emulator probe failed: {}'.format(e))
+            return False
+
+    def start(self):
+        """ Start Refilling
+
+        Refill the standby on a background thread, as emulators are taken.
+        """
+
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='terminal-3270-standby')
+                self._thread.daemon = True
+                self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and len(self._ready) >= self.size:
+                    self._cond.wait()
+                if self._closed:
+                    return
+
+            try:
+                self.fill()
+            except Exception as e:
+                log.warning('standby could not start an emulator: {}'.format(e))
+                with self._cond:
+                    self._cond.wait(self.retry_interval)
+
+    def close(self):
+        """ Close Standby
+
+        Stop refilling, and terminate the ready emulators.
+        """
+
+        with self._cond:
+            self._closed = True
+            ready = [emulator for (ready_t, emulator) in self._ready]
+            self._ready.clear()
+            self._cond.notify_all()
+            thread = self._thread
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+        for emulator in ready:
+            self._terminate(emulator)
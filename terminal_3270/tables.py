@@ -3,8 +3,114 @@
 This module works out how to screen-scrape a 3270 search results table.
 A search results screen has a table defined by row (top..bottom).
 Multiple screens may be needed to show enough tables for all results.
+
+Fixed-width rows parse with a compiled RowSchema, which is also a `row_processor`.
+
+    schema = RowSchema([
+        Column('loc', 8, 11),
+        Column('cwl', 20, 4, int),
+    ], row_type='dict')
+
+    screen_table = ScreenTable(emulator, 11, 23, row_processor=schema)
+
+A ResultCache serves repeated inquiries without the mainframe, see `terminal_3270.cache`.
+
+With `incremental=True`, a page row is only parsed again when it differs from the same screen row
+of the previous page, e.g. for a table whose pages repeat group or header rows.
 """
 
+from collections import namedtuple
+
+from terminal_3270.metrics import emulator_phase
+
+
+Column = namedtuple('Column', ['name', 'start', 'width', 'type'])
+Column.__new__.__defaults__ = (str,)
+Column.__doc__ = """ Table Column
+
+A fixed-width column: `name`, 1-based `start` column, `width` and value `type`, default str.
+"""
+
+
+def _column_converter(value_type):
+    """ Column Converter
+
+    Strip a column's raw text and convert it. Blank non-str columns are None.
+    """
+
+    if value_type is str:
+        return str.strip
+
+    def convert(raw):
+        value = raw.strip()
+        return value_type(value) if value else None
+    return convert
+
+
+class RowSchema(object):
+    """ Row Schema
+
+    A compiled fixed-width column spec for table rows.
+    The slices and converters are built once, so each row parse is one pass over the columns.
+    A blank column stays in its place, unlike `str.split()`.
+    """
+
+    ROW_TYPES = ('tuple', 'namedtuple', 'dict')
+
+    def __init__(self, columns, row_type='tuple'):
+        """ New Row Schema
+
+        :param list columns: Column values or (name, start, width[, type]) tuples, in row order
+        :param str row_type: make each row a 'tuple', 'namedtuple' or 'dict'
+        :raises: ValueError for an unknown row_type
+        """
+
+        if row_type not in self.ROW_TYPES:
+            raise ValueError('"row_type" must be one of {}'.format(', '.join(self.ROW_TYPES)))
+
+        self.columns = tuple(Column(*c) for c in columns)
+        self.names = tuple(c.name for c in self.columns)
+        self.row_type = row_type
+
+        self._fields = tuple(
+            (slice(c.start - 1, c.start - 1 + c.width), _column_converter(c.type)) for c in self.columns)
+
+        if row_type == 'namedtuple':
+            self.row_class = namedtuple('Row', self.names)
+
+    def __call__(self, line):
+        """ Parse Row
+
+        :param str line: the table row from the screen
+        :returns: the row as a tuple, namedtuple or dict
+        """
+
+        values = tuple([convert(line[columns]) for (columns, convert) in self._fields])
+
+        if self.row_type == 'tuple':
+            return values
+        elif self.row_type == 'namedtuple':
+            return self.row_class._make(values)
+        else:
+            return dict(zip(self.names, values))
+
+    def parse_page(self, lines):
+        """ Parse Page
+
+        Parse a whole page of table rows. A blank line ends the table data.
+
+        :param list lines: the table rows from the screen
+        :returns: a list of parsed rows
+        :rtype: list
+        """
+
+        rows = []
+        for line in lines:
+            if not line.strip():
+                break  # blank-line ends table data
+            rows.append(self(line))
+        return rows
+
 
 class ScreenTableNotFoundError(ValueError):
     """ Screen Table Results Not Found Error.
@@ -24,16 +130,23 @@ class ScreenTable(object):
 
     def __init__(self, emulator, top_row, bottom_row,
                  status_row=24, status_found='FIND SUCCESSFUL', status_end='LAST PAGE',
-                 row_processor=None):
+                 row_processor=None, cache=None, cache_key=None, query=None, incremental=False, width=80):
         """ New Screen Table
 
         :param emulator: a py3270.Emulator instance set to a search results screen.
-        :param int top_row: the top row in the table on this screen, columns 1..80 are assumed
+        :param int top_row: the top row in the table on this screen, columns 1..`width`
         :param int bottom_row: the bottom row in the table on this screen
         :param int status_row: a status bar to show more results or terminate
         :param str status_found: a status bar string to prove next results-set was found
         :param str status_end: a status bar string to terminate the results-set
-        :param callable row_processor: optional function to parse each row into fields
+        :param callable row_processor: optional function, or RowSchema, to parse each row into fields
+        :param ResultCache cache: optional cache of the table lines, see `terminal_3270.cache`
+        :param str cache_key: the cache key of this inquiry, see `terminal_3270.cache.cache_key()`
+        :param callable query: optional query() that puts the results on the screen, e.g. a `screen_command`;
+            it only runs when the results are not cached
+        :param bool incremental: when True, reuse the parsed row of each screen row that did not change
+            since the previous page; the reused rows are the same objects
+        :param int width: the table width in columns from column 1, default 80, e.g. 132 on a 27x132 screen
         """
 
         self.emulator = emulator
@@ -43,8 +156,16 @@ class ScreenTable(object):
         self.status_found = status_found
         self.status_end = status_end
         self.row_processor = row_processor
+        self.cache = cache
+        self.cache_key = cache_key
+        self.query = query
+        self.incremental = incremental
+        self.width = width
+        self.parsed_rows = 0
 
         self._table_data = []
+        self._row_memo = {}  # {screen row: (line, parsed row)}
+        self._page_lines = []
         self._more_pages = True
 
     @property
@@ -54,28 +175,106 @@ class ScreenTable(object):
     def next_result_set(self):
         self.emulator.send_pf_key(2)
 
+    def parse_row(self, line):
+        """ Parse Row
+
+        Parse a table row into fields with the `row_processor`, or split it on whitespace.
+
+        :param str line: the table row from the screen
+        :returns: the parsed row
+        """
+
+        if callable(self.row_processor):
+            return self.row_processor(line)
+        else:
+            return line.strip().split()
+
+    def parse_page(self, lines):
+        """ Parse Page
+
+        Parse the page's table rows; a RowSchema `row_processor` parses the whole page in one pass.
+
+        :param list lines: the non-blank table rows from the screen
+        :returns: a list of parsed rows
+        :rtype: list
+        """
+
+        self.parsed_rows += len(lines)
+        if isinstance(self.row_processor, RowSchema):
+            return self.row_processor.parse_page(lines)
+        return [self.parse_row(line) for line in lines]
+
+    def parse_changed_rows(self, lines, top_row):
+        """ Parse Changed Rows
+
+        Parse only the table rows that changed since the previous page at the same screen row.
+
+        :param list lines: the non-blank table rows from the screen
+        :param int top_row: the screen row of the first line
+        :returns: a list of parsed rows
+        :rtype: list
+        """
+
+        memo = {}
+        rows = []
+        for (index, line) in enumerate(lines):
+            row = top_row + index
+            entry = self._row_memo.get(row)
+            if entry is None or entry[0] != line:
+                entry = (line, self.parse_row(line))
+                self.parsed_rows += 1
+            memo[row] = entry
+            rows.append(entry[1])
+
+        self._row_memo = memo
+        return rows
+
     def fetch_results(self):
         """ Fetch Results Generator
 
         This method returns a python generator on the screen's results-set.
 
+        With a `cache`, cached results never touch the emulator;
+        fetched results are cached once the generator is read to the end.
+
         :returns: a generator to return results as row lists
         :rtype: generator
         """
 
+        caching = (self.cache is not None and self.cache_key is not None)
+        if caching:
+            pages = self.cache.get(self.cache_key)
+            if pages is not None:
+                for lines in pages:
+                    for row in self.parse_page(lines):
+                        yield row
+                return
+
+        if self.query is not None:
+            self.query()
+
+        pages = []
         while self.has_more_results:
             if not self._table_data:
-                self.get_table_page(self.top_row, self.bottom_row)
+                with emulator_phase(self.emulator, 'page_fetch'):
+                    self.get_table_page(self.top_row, self.bottom_row)
+                pages.append(self._page_lines)
+
+            if not self._table_data:
+                continue  # an empty last page
 
             row = self._table_data.pop(0)
             yield row
 
+        if caching:
+            self.cache.set(self.cache_key, pages)
+
     def get_table_page(self, top_row, bottom_row):
         """ Get Screen Table Page
 
         Get the current screen's table as one page in the results-set.
 
-        :param int top_row: the top row in the table on this screen, columns 1..80 are assumed
+        :param int top_row: the top row in the table on this screen, columns 1..`width`
         :param int bottom_row: the bottom row in the table on this screen
         :returns: a nested list of row lists for the whole page
         """
@@ -87,17 +286,31 @@ class ScreenTable(object):
         if not status_found:
             raise ScreenTableNotFoundError(status_bar)
 
+        # An emulator with snapshots, e.g. EmulatorPlus, reads every row from one screen read.
+        if hasattr(self.emulator, 'snapshot'):
+            screen = self.emulator.snapshot()
+
+            def read_row(row):
+                return screen.region(row, 1, self.width)
+        else:
+            def read_row(row):
+                return self.emulator.string_get(row, 1, self.width)
+
+        lines = []
         for row in range(top_row, bottom_row + 1):
-            line = self.emulator.string_get(row, 1, 80)
+            line = read_row(row)
             if line.strip():
-                # parse line into fields.
-                if callable(self.row_processor):
-                    self._table_data.append(self.row_processor(line))
-                else:
-                    self._table_data.append(line.strip().split())
+                lines.append(line)
             else:
                 break  # blank-line ends table data
 
+        # parse lines into fields.
+        self._page_lines = lines
+        if self.incremental:
+            self._table_data = self.parse_changed_rows(lines, top_row)
+        else:
+            self._table_data = self.parse_page(lines)
+
         # STATUS: Is this the end-of-data?
         (status_bool, status_bar) = self.emulator.status_bar(terminator_strings=[self.status_end], status_row=self.status_row)
         self._more_pages = status_bool
@@ -0,0 +1,96 @@
+import time
+from unittest import TestCase, mock
+
+from terminal_3270.adaptive import AdaptiveTimeouts, percentile
+from terminal_3270.emulator import EmulatorPlus
+from terminal_3270.fakehost import FakeHost, FakeHostConfig, InProcessApp
+from terminal_3270.sessions import RACFSignOnSession
+
+
+class TestAdaptiveTimeouts(TestCase):
+
+    def setUp(self):
+        self.adaptive = AdaptiveTimeouts(percentile=90.0, margin=0.010, min_limit=0.020, max_limit=1.0,
+                                         window=10, min_samples=5)
+
+    def tearDown(self):
+        pass
+
+    def test_percentile(self):
+        samples = [0.5, 0.1, 0.4, 0.2, 0.3]
+        self.assertEqual(percentile(samples, 50.0), 0.3)
+        self.assertEqual(percentile(samples, 90.0), 0.5)
+        self.assertEqual(percentile(samples, 1.0), 0.1)
+
+    def test_default_until_min_samples(self):
+        for n in range(4):
+            self.adaptive.record('signon:passed|changed', 0.100)
+        self.assertEqual(self.adaptive.time_limit('signon:passed|changed', 0.350), 0.350)
+
+        self.adaptive.record('signon:passed|changed', 0.100)
+        self.assertAlmostEqual(self.adaptive.time_limit('signon:passed|changed', 0.350), 0.110)
+
+    def test_bounds(self):
+        for n in range(5):
+            self.adaptive.record('fast', 0.001)
+            self.adaptive.record('slow', 5.0)
+
+        self.assertEqual(self.adaptive.time_limit('fast', 0.750), 0.020)
+        self.assertEqual(self.adaptive.time_limit('slow', 0.750), 1.0)
+
+    def test_rolling_window(self):
+        for n in range(10):
+            self.adaptive.record('change', 0.500)
+        for n in range(10):
+            self.adaptive.record('change', 0.050)
+        self.assertAlmostEqual(self.adaptive.time_limit('change', 0.750), 0.060)
+
+    def test_timeout_opens_limit(self):
+        for n in range(5):
+            self.adaptive.record('change', 0.100, found=False)
+
+        stats = self.adaptive.stats()['change']
+        self.assertEqual((stats['waits'], stats['timeouts']), (5, 5))
+        self.assertAlmostEqual(stats['max'], 0.200)
+        self.assertAlmostEqual(stats['time_limit'], 0.210)
+
+    def test_stats_and_reset(self):
+        self.adaptive.record('change', 0.100)
+        self.assertIsNone(self.adaptive.stats()['change']['time_limit'])
+
+        self.adaptive.reset('change')
+        self.assertEqual(self.adaptive.stats(), {})
+
+    def test_bad_bounds(self):
+        with self.assertRaises(ValueError):
+            AdaptiveTimeouts(percentile=0.0)
+        with self.assertRaises(ValueError):
+            AdaptiveTimeouts(min_limit=2.0, max_limit=1.0)
+
+    def test_session_waits(self):
+        app = InProcessApp(FakeHost(FakeHostConfig(mode='racf')))
+        session = RACFSignOnSession('USER0001', 'PASSWORD', 'TST01', 'SIGNUSER', 'SIGNPASS', 'fake.host.org',
+                                    app=app, adaptive=self.adaptive)
+
+        with session:
+            pass
+
+        # The waits are keyed by session phase.
+        stats = self.adaptive.stats()
+        self.assertIn('login:change', stats)
+        self.assertIn('signon:passed|changed', stats)
+        self.assertEqual(stats['signon:passed|changed']['timeouts'], 0)
+
+    def test_wait_for_screen_records_found(self):
+        emulator = EmulatorPlus(app=InProcessApp(FakeHost(FakeHostConfig(mode='racf'))), adaptive=self.adaptive)
+
+        def found_late(*args):
+            time.sleep(0.03)
+            return True
+
+        # The screen was found on the last probe, after the time limit.
+        with mock.patch.object(emulator, '_string_found_fresh', side_effect=found_late):
+            emulator.wait_for_screen('READY', 1, 2, time_limit=0.01, key='ready')
+
+        self.assertEqual(self.adaptive.stats()['ready']['timeouts'], 0)
+        emulator.terminate()
@@ -0,0 +1,333 @@
+import asyncio
+from unittest import TestCase, mock
+
+from py3270 import CommandError
+from terminal_3270.aio import (
+    AsyncEmulatorPlus,
+    AsyncScreenTable,
+    AsyncSession3270,
+    AsyncWaitUntil
+)
+from terminal_3270.cache import ResultCache, cache_key
+from terminal_3270.emulator import TAB, ScreenWaitError
+from terminal_3270.sessions import LoginError
+
+STATUS_LINE = b'U F U C(fake.host.org) I 2 24 80 0 0 0x0 -'
+
+SCREEN_LINES = [' ' * 80] * 10 + [
+    'ROW ONE'.ljust(80),
+    'ROW TWO'.ljust(80),
+] + [' ' * 80] * 11 + [
+    ' FIND SUCCESSFUL - LAST PAGE'.ljust(80),
+]
+
+
+class FakeStdin(object):
+
+    def __init__(self, process):
+        self.process = process
+
+    def write(self, data):
+        self.process.commands.append(data.rstrip(b'\n'))
+        self.process.respond(data.rstrip(b'\n'))
+
+    async def drain(self):
+        pass
+
+
+class FakeStdout(object):
+
+    def __init__(self):
+        self.lines = []
+
+    async def readline(self):
+        return self.lines.pop(0)
+
+
+class FakeProcess(object):
+    """ Fake asyncio s3270 Subprocess
+
+    Answer each command with the screen data (for Ascii) and "ok".
+    """
+
+    def __init__(self, screen_lines=SCREEN_LINES):
+        self.screen_lines = screen_lines
+        self.commands = []
+        self.returncode = None
+        self.stdin = FakeStdin(self)
+        self.stdout = FakeStdout()
+
+    def respond(self, cmdstr):
+        if cmdstr.startswith(b'Ascii'):
+            self.stdout.lines.extend([b'data: ' + line.encode('ascii') + b'\n' for line in self.screen_lines])
+        if cmdstr.startswith(b'Bad'):
+            self.stdout.lines.extend([b'data: bad action\n', STATUS_LINE + b'\n', b'error\n'])
+            return
+        self.stdout.lines.extend([STATUS_LINE + b'\n', b'ok\n'])
+
+    async def wait(self):
+        self.returncode = 0
+        return 0
+
+
+class PagedFakeProcess(FakeProcess):
+    """ Fake asyncio s3270 Subprocess with one screen per page; PF(2) shows the next page. """
+
+    def __init__(self, pages):
+        self.pages = [self.page_lines(rows, last=(n == len(pages) - 1)) for (n, rows) in enumerate(pages)]
+        super(PagedFakeProcess, self).__init__(self.pages[0])
+
+    @staticmethod
+    def page_lines(rows, last):
+        status = ' FIND SUCCESSFUL' + (' - LAST PAGE' if last else '')
+        return [row.ljust(80) for row in rows] + [' ' * 80] * (23 - len(rows)) + [status.ljust(80)]
+
+    def respond(self, cmdstr):
+        if cmdstr.startswith(b'PF(2)'):
+            self.screen_lines = self.pages[self.pages.index(self.screen_lines) + 1]
+        super(PagedFakeProcess, self).respond(cmdstr)
+
+
+class TestAsyncEmulatorPlus(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.process = FakeProcess()
+        self.emulator = AsyncEmulatorPlus(process=self.process)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_key_sequence(self):
+
+        self.run_async(self.emulator.key_sequence('u', TAB, 'p'))
+        self.assertEqual(self.process.commands, [b'Key(U+0075) Tab() Key(U+0070)'])
+
+    def test_key_entry(self):
+
+        self.run_async(self.emulator.key_entry('ab'))
+        self.run_async(self.emulator.key_entry('ab', batch=True))
+        self.assertEqual(self.process.commands, [b'Key(U+0061)', b'Key(U+0062)', b'Key(U+0061) Key(U+0062)'])
+
+    def test_status_bar_from_snapshot(self):
+
+        (status_bool, status_bar) = self.run_async(self.emulator.status_bar(passing_strings=['find successful']))
+        self.assertTrue(status_bool)
+        self.assertEqual(status_bar.strip(), 'FIND SUCCESSFUL - LAST PAGE')
+
+        self.run_async(self.emulator.string_found(11, 1, 'ROW ONE'))
+        self.assertEqual(self.process.commands, [b'Ascii()'])
+
+        self.run_async(self.emulator.send_enter())
+        self.run_async(self.emulator.string_found(11, 1, 'ROW ONE'))
+        self.assertEqual(self.process.commands, [b'Ascii()', b'Enter', b'Ascii()'])
+
+    def test_wait_for_screen(self):
+
+        self.run_async(self.emulator.wait_for_screen('ROW TWO', 12, 1))
+
+        with self.assertRaises(ScreenWaitError):
+            self.run_async(self.emulator.wait_for_screen('MISSING', 12, 1, time_limit=0.02))
+
+    def test_wait_for_screen_found_late(self):
+
+        probes = []
+
+        async def found_late(*args):
+            probes.append(args)
+            if len(probes) == 1:
+                return False
+            await asyncio.sleep(0.03)
+            return True
+
+        # The screen matches only on the final probe, which ends after the time limit.
+        self.emulator._string_found_fresh = found_late
+        self.run_async(self.emulator.wait_for_screen('ROW TWO', 12, 1, time_limit=0.01))
+        self.assertEqual(len(probes), 2)
+
+    def test_command_error(self):
+
+        with self.assertRaisesRegex(CommandError, 'bad action'):
+            self.run_async(self.emulator.exec_command(b'Bad()'))
+
+    def test_is_connected_and_terminate(self):
+
+        self.assertTrue(self.run_async(self.emulator.is_connected()))
+        self.run_async(self.emulator.terminate())
+        self.assertTrue(self.emulator.is_terminated)
+        self.assertEqual(self.process.returncode, 0)
+
+
+    def test_cancelled_command_reads_its_reply(self):
+
+        stdout = self.process.stdout
+        read_line = stdout.readline
+
+        async def slow_readline():
+            await asyncio.sleep(0.01)
+            return await read_line()
+
+        stdout.readline = slow_readline
+
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_async(asyncio.wait_for(self.emulator.exec_command(b'Enter'), 0.001))
+
+        # The next command waits for the cancelled one, then reads its own reply.
+        self.assertTrue(self.run_async(self.emulator.string_found(11, 1, 'ROW ONE')))
+        self.assertEqual(self.process.commands, [b'Enter', b'Ascii()'])
+        self.assertEqual(stdout.lines, [])
+
+
+class TestAsyncWaitUntil(TestCase):
+
+    def test_poll(self):
+
+        results = [False, False, True]
+
+        async def found():
+            return results.pop(0)
+
+        loop = asyncio.new_event_loop()
+        wait_until = AsyncWaitUntil(1.0, found)
+        loop.run_until_complete(wait_until.poll(interval=0.001))
+        loop.close()
+
+        self.assertTrue(wait_until.found)
+        self.assertEqual(wait_until.probes, 3)
+
+
+class StubAsyncSession(AsyncSession3270):
+
+    async def login(self):
+        await self.term_emulator.key_sequence(self.username, TAB, self.password)
+        await self.term_emulator.send_enter()
+        return not await self.term_emulator.string_found(2, 2, 'REJECTED')
+
+
+class TestAsyncSessionAndTable(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.process = FakeProcess()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_session_fetch_results(self):
+
+        process = self.process
+
+        class FakeEmulator(AsyncEmulatorPlus):
+            async def start(self):
+                self.process = process
+                return self
+
+        class Session(StubAsyncSession):
+            emulator_class = FakeEmulator
+
+        async def run_session():
+            rows = []
+            async with Session('user', 'pass', 'TST01', 'fake.host.org') as session:
+                table = AsyncScreenTable(session.term_emulator, 11, 23)
+                async for row in table.fetch_results():
+                    rows.append(row)
+            return rows
+
+        rows = self.loop.run_until_complete(run_session())
+
+        self.assertEqual(rows, [['ROW', 'ONE'], ['ROW', 'TWO']])
+        self.assertEqual(process.commands[0], b'Connect(fake.host.org)')
+        self.assertEqual(process.commands[-1], b'Quit')
+
+    def test_failed_login_terminates_emulator(self):
+
+        process = self.process
+        emulators = []
+
+        class FakeEmulator(AsyncEmulatorPlus):
+            async def start(self):
+                self.process = process
+                emulators.append(self)
+                return self
+
+        class Session(StubAsyncSession):
+            emulator_class = FakeEmulator
+
+            async def login(self):
+                return False
+
+        async def run_session():
+            async with Session('user', 'pass', 'TST01', 'fake.host.org'):
+                pass
+
+        with self.assertRaises(LoginError):
+            self.loop.run_until_complete(run_session())
+
+        self.assertTrue(emulators[0].is_terminated)
+        self.assertEqual(process.commands[-1], b'Quit')
+
+    def test_fetch_results_without_rows(self):
+
+        process = FakeProcess([' ' * 80] * 23 + [' FIND SUCCESSFUL - LAST PAGE'.ljust(80)])
+        emulator = AsyncEmulatorPlus(process=process)
+
+        async def fetch():
+            return [row async for row in AsyncScreenTable(emulator, 11, 23).fetch_results()]
+
+        self.assertEqual(self.loop.run_until_complete(fetch()), [])
+
+    def test_fetch_results_cached(self):
+
+        emulator = AsyncEmulatorPlus(process=self.process)
+        cache = ResultCache(ttl=60)
+        key = cache_key('fake.host.org', 'TST01', 'OSSCWL', 'FIND', 'ORD1')
+        queries = []
+
+        async def query():
+            queries.append(key)
+            await emulator.send_enter()
+
+        async def fetch():
+            table = AsyncScreenTable(emulator, 11, 23, cache=cache, cache_key=key, query=query)
+            return [row async for row in table.fetch_results()]
+
+        rows = self.loop.run_until_complete(fetch())
+        self.assertEqual(rows, [['ROW', 'ONE'], ['ROW', 'TWO']])
+        self.assertEqual(len(cache), 1)
+        commands = list(self.process.commands)
+
+        # The cached rows come back without the query or the emulator.
+        self.assertEqual(self.loop.run_until_complete(fetch()), rows)
+        self.assertEqual(self.process.commands, commands)
+        self.assertEqual(len(queries), 1)
+
+    def test_fetch_results_sync_query(self):
+
+        emulator = AsyncEmulatorPlus(process=self.process)
+        query = mock.MagicMock()
+
+        async def fetch():
+            return [row async for row in AsyncScreenTable(emulator, 11, 23, query=query).fetch_results()]
+
+        self.assertEqual(len(self.loop.run_until_complete(fetch())), 2)
+        query.assert_called_once_with()
+
+    def test_fetch_results_incremental(self):
+
+        process = PagedFakeProcess([
+            ['GROUP A', 'ROW 1', 'ROW 2'],
+            ['GROUP A', 'ROW 3', 'ROW 2'],
+        ])
+        emulator = AsyncEmulatorPlus(process=process)
+        table = AsyncScreenTable(emulator, 1, 3, row_processor=lambda line: line.strip(), incremental=True)
+
+        async def fetch():
+            return [row async for row in table.fetch_results()]
+
+        # Only the changed row of the second page is parsed again.
+        self.assertEqual(self.loop.run_until_complete(fetch()),
+                         ['GROUP A', 'ROW 1', 'ROW 2', 'GROUP A', 'ROW 3', 'ROW 2'])
+        self.assertEqual(table.parsed_rows, 4)
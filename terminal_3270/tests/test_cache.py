@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase, mock
+
+from terminal_3270.cache import MemoryBackend, ResultCache, SQLiteBackend, cache_key
+from terminal_3270.emulator import EmulatorPlus
+from terminal_3270.fakehost import FakeHost, FakeHostConfig, InProcessApp
+from terminal_3270.tables import ScreenTable
+
+KEY = cache_key('fake.host.org', 'TST01', 'OSSCWL', 'FIND', 'ORD1')
+
+
+def cache_time_after(seconds):
+    return time.time() + seconds
+
+
+class TestResultCache(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_cache_key(self):
+        self.assertNotEqual(KEY, cache_key('fake.host.org', 'TST01', 'OSSCWL', 'FIND', 'ORD2'))
+        self.assertEqual(KEY, cache_key('fake.host.org', 'TST01', 'OSSCWL', 'FIND', 'ORD1'))
+
+    def test_memory_ttl(self):
+        cache = ResultCache(ttl=60)
+        self.assertIsNone(cache.get(KEY))
+
+        cache.set(KEY, [['LINE 1']])
+        self.assertEqual(cache.get(KEY), [['LINE 1']])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        with mock.patch('terminal_3270.cache.time.time', return_value=cache_time_after(61)):
+            self.assertIsNone(cache.get(KEY))
+        self.assertEqual(len(cache), 0)
+
+    def test_memory_lru(self):
+        cache = ResultCache(MemoryBackend(max_entries=2))
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_sqlite_shared_file(self):
+        path = os.path.join(self.tmpdir, 'results.sqlite')
+        writer = ResultCache(SQLiteBackend(path, max_entries=2), ttl=60)
+        reader = ResultCache(SQLiteBackend(path, max_entries=2), ttl=60)
+
+        writer.set(KEY, [['LINE 1', 'LINE 2']])
+        self.assertEqual(reader.get(KEY), [['LINE 1', 'LINE 2']])
+
+        # LRU: KEY was just read, so 'b' is evicted first.
+        writer.set('b', 2)
+        reader.get(KEY)
+        writer.set('c', 3)
+        self.assertEqual(len(reader), 2)
+        self.assertIsNone(reader.get('b'))
+
+        reader.invalidate(KEY)
+        self.assertIsNone(writer.get(KEY))
+
+        writer.set('d', 4, ttl=0.0001)
+        with mock.patch('terminal_3270.cache.time.time', return_value=cache_time_after(1)):
+            self.assertIsNone(writer.get('d'))
+
+        writer.clear()
+        self.assertEqual(len(writer), 0)
+        writer.backend.close()
+        reader.backend.close()
+
+    def test_bad_ttl(self):
+        with self.assertRaises(ValueError):
+            ResultCache(ttl=0)
+
+
+class TestScreenTableCache(TestCase):
+
+    def setUp(self):
+        self.host = FakeHost(FakeHostConfig(mode='racf', results=20))
+        self.emulator = EmulatorPlus(app=InProcessApp(self.host))
+        self.emulator.connect('fake.host.org')
+        self.emulator.format_screen('OSSCWL')
+        self.cache = ResultCache(ttl=60)
+
+    def tearDown(self):
+        self.emulator.terminate()
+
+    def new_table(self, query):
+        return ScreenTable(self.emulator, 11, 23, cache=self.cache, cache_key=KEY, query=query)
+
+    def test_cache_hit_skips_emulator(self):
+        query = mock.MagicMock(side_effect=lambda: self.emulator.screen_command('FIND ORD1'))
+
+        rows = list(self.new_table(query).fetch_results())
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(query.call_count, 1)
+
+        with mock.patch.object(self.emulator, 'exec_command') as exec_command:
+            cached_rows = list(self.new_table(query).fetch_results())
+
+        self.assertEqual(cached_rows, rows)
+        self.assertFalse(exec_command.called)
+        self.assertEqual(query.call_count, 1)
+
+    def test_partial_fetch_not_cached(self):
+        results = self.new_table(lambda: self.emulator.screen_command('FIND ORD1')).fetch_results()
+        next(results)
+        results.close()
+
+        self.assertEqual(len(self.cache), 0)
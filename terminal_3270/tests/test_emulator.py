@@ -1,6 +1,7 @@
 from unittest import TestCase, mock
 
-from terminal_3270.emulator import EmulatorPlus, ScreenWaitError
+from terminal_3270.emulator import EmulatorPlus, ScreenWaitError, TAB, ENTER, reads_only
+from terminal_3270.screen import Screen
 
 
 class TestingMock():
@@ -9,6 +10,15 @@ class TestingMock():
         self.data = ['data'.encode('latin-1')]
 
 
+class ScreenMock():
+
+    def __init__(self, lines):
+        self.data = [line.encode('latin-1') for line in lines]
+
+
+SCREEN_LINES = ['HEADER    ', 'BODY      ', 'STATUS OK ']
+
+
 class TestEmulatorPlus(TestCase):
 
     def setUp(self):
@@ -46,6 +56,24 @@ class TestEmulatorPlus(TestCase):
             expected_exec_cmds = [mock.call('Key(U+{:04X})'.format(ord(ch)).encode('ascii')) for ch in text_str]
             self.assertEqual(mock_exec_command.mock_calls, expected_exec_cmds)
 
+    def test_key_entry_batch(self):
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command') as mock_exec_command:
+            self.emulator.key_entry('ab', batch=True)
+            mock_exec_command.assert_called_once_with('Key(U+0061) Key(U+0062)'.encode('ascii'))
+
+    def test_key_entry_batch_empty(self):
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command') as mock_exec_command:
+            self.emulator.key_entry('', batch=True)
+            self.assertFalse(mock_exec_command.called)
+
+    def test_key_sequence(self):
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command') as mock_exec_command:
+            self.emulator.key_sequence('u', TAB, 'p', ENTER)
+            mock_exec_command.assert_called_once_with('Key(U+0075) Tab() Key(U+0070) Enter'.encode('ascii'))
+
     def test_format_screen(self):
 
         with mock.patch('terminal_3270.emulator.Emulator.exec_command') as mock_exec_command:
@@ -55,11 +83,9 @@ class TestEmulatorPlus(TestCase):
             expected_exec_cmds = [
                 mock.call('Clear()'.encode('ascii')),
                 mock.call('MoveCursor(0, 0)'.encode('ascii')),
+                mock.call(' '.join(['Key(U+{:04X})'.format(ord(ch)) for ch in "/FOR {}".format(screen_name)]).encode('ascii')),
+                mock.call('Enter'.encode('ascii')),
             ]
-            expected_exec_cmds.extend([
-                mock.call('Key(U+{:04X})'.format(ord(ch)).encode('ascii')) for ch in "/FOR {}".format(screen_name)
-            ])
-            expected_exec_cmds.append(mock.call('Enter'.encode('ascii')))
             self.assertEqual(mock_exec_command.mock_calls, expected_exec_cmds)
 
     def test_screen_command(self):
@@ -70,11 +96,9 @@ class TestEmulatorPlus(TestCase):
 
             expected_exec_cmds = [
                 mock.call('MoveCursor(0, 9)'.encode('ascii')),
+                mock.call(' '.join(['Key(U+{:04X})'.format(ord(ch)) for ch in command_name]).encode('ascii')),
+                mock.call('Enter'.encode('ascii')),
             ]
-            expected_exec_cmds.extend([
-                mock.call('Key(U+{:04X})'.format(ord(ch)).encode('ascii')) for ch in command_name
-            ])
-            expected_exec_cmds.append(mock.call('Enter'.encode('ascii')))
             self.assertEqual(mock_exec_command.mock_calls, expected_exec_cmds)
 
     def test_status_bar_read_only(self):
@@ -82,7 +106,7 @@ class TestEmulatorPlus(TestCase):
 
         expected_status_bar = 'TEST BAR'
 
-        with mock.patch('terminal_3270.emulator.Emulator.string_get', return_value=expected_status_bar) as mock_string_get:
+        with mock.patch('terminal_3270.emulator.EmulatorPlus.string_get', return_value=expected_status_bar) as mock_string_get:
             passing_strings = []  # empty list is the default value.
             (status_bool, status_bar) = self.emulator.status_bar(passing_strings=passing_strings, status_row=13)
 
@@ -94,7 +118,7 @@ class TestEmulatorPlus(TestCase):
 
         expected_status_bar = 'TEST BAR'
 
-        with mock.patch('terminal_3270.emulator.Emulator.string_get', return_value=expected_status_bar) as mock_string_get:
+        with mock.patch('terminal_3270.emulator.EmulatorPlus.string_get', return_value=expected_status_bar) as mock_string_get:
             passing_strings = ['Test', 'OTHER', 'bar']
             (status_bool, status_bar) = self.emulator.status_bar(passing_strings=passing_strings)
 
@@ -106,7 +130,7 @@ class TestEmulatorPlus(TestCase):
 
         expected_status_bar = 'TEST BAR'
 
-        with mock.patch('terminal_3270.emulator.Emulator.string_get', return_value=expected_status_bar) as mock_string_get:
+        with mock.patch('terminal_3270.emulator.EmulatorPlus.string_get', return_value=expected_status_bar) as mock_string_get:
             passing_strings = ['Detest', 'ANOTHER', 'rebar']
             (status_bool, status_bar) = self.emulator.status_bar(passing_strings=passing_strings)
 
@@ -121,7 +145,7 @@ class TestEmulatorPlus(TestCase):
 
         expected_status_bar = 'END TEST BAR'
 
-        with mock.patch('terminal_3270.emulator.Emulator.string_get', return_value=expected_status_bar) as mock_string_get:
+        with mock.patch('terminal_3270.emulator.EmulatorPlus.string_get', return_value=expected_status_bar) as mock_string_get:
             terminator_strings = ['end']
             (status_bool, status_bar) = self.emulator.status_bar(terminator_strings=terminator_strings)
 
@@ -134,7 +158,7 @@ class TestEmulatorPlus(TestCase):
 
         expected_status_bar = 'CONTINUE TEST BAR'
 
-        with mock.patch('terminal_3270.emulator.Emulator.string_get', return_value=expected_status_bar) as mock_string_get:
+        with mock.patch('terminal_3270.emulator.EmulatorPlus.string_get', return_value=expected_status_bar) as mock_string_get:
             terminator_strings = ['end']
             (status_bool, status_bar) = self.emulator.status_bar(terminator_strings=terminator_strings)
 
@@ -147,8 +171,8 @@ class TestEmulatorPlus(TestCase):
     def test_wait_for_screen_found(self):
 
         mock_wait_until = mock.MagicMock()
-        mock_expired_property = mock.PropertyMock(return_value=False)
-        type(mock_wait_until).expired = mock_expired_property
+        mock_found_property = mock.PropertyMock(return_value=True)
+        type(mock_wait_until).found = mock_found_property
 
         with mock.patch('terminal_3270.emulator.WaitUntil', return_value=mock_wait_until) as mock_wait_until_class:
 
@@ -159,16 +183,16 @@ class TestEmulatorPlus(TestCase):
             self.emulator.wait_for_screen(expected_str, expected_row, expected_col)
 
             mock_wait_until_class.assert_called_with(0.750,
-                                                     self.emulator.string_found,
+                                                     self.emulator._string_found_fresh,
                                                      *(expected_row, expected_col, expected_str))
             self.assertTrue(mock_wait_until.poll.called)
-            self.assertTrue(mock_expired_property.called)
+            self.assertTrue(mock_found_property.called)
 
     def test_wait_for_screen_exception(self):
 
         mock_wait_until = mock.MagicMock()
-        mock_expired_property = mock.PropertyMock(return_value=True)
-        type(mock_wait_until).expired = mock_expired_property
+        mock_found_property = mock.PropertyMock(return_value=False)
+        type(mock_wait_until).found = mock_found_property
 
         with self.assertRaises(ScreenWaitError):
             with mock.patch('terminal_3270.emulator.WaitUntil', return_value=mock_wait_until) as mock_wait_until_class:
@@ -180,10 +204,127 @@ class TestEmulatorPlus(TestCase):
                 self.emulator.wait_for_screen(expected_str, expected_row, expected_col)
 
                 mock_wait_until_class.assert_called_with(0.750,
-                                                         self.emulator.string_found,
+                                                         self.emulator._string_found_fresh,
                                                          *(expected_row, expected_col, expected_str))
                 self.assertTrue(mock_wait_until.poll.called)
-                self.assertTrue(mock_expired_property.called)
+                self.assertTrue(mock_found_property.called)
+
+    def test_snapshot_cached_until_screen_changes(self):
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', return_value=ScreenMock(SCREEN_LINES)) as mock_exec_command:
+            screen = self.emulator.snapshot()
+            self.assertEqual(screen.lines, tuple(SCREEN_LINES))
+
+            # Screen reads come from memory.
+            self.assertTrue(self.emulator.string_found(3, 1, 'STATUS OK'))
+            self.assertEqual(self.emulator.status_bar(status_row=3), (True, 'STATUS OK '))
+            self.assertEqual(mock_exec_command.mock_calls, [mock.call('Ascii()'.encode('ascii'))])
+
+            # Moving the cursor keeps the snapshot; an AID key drops it.
+            self.emulator.move_to(2, 1)
+            self.assertIs(self.emulator.snapshot(), screen)
+            self.emulator.send_enter()
+            self.assertIsNot(self.emulator.snapshot(), screen)
+            self.assertEqual(mock_exec_command.call_count, 4)
+
+    def test_snapshot_refresh(self):
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', return_value=ScreenMock(SCREEN_LINES)) as mock_exec_command:
+            self.emulator.snapshot()
+            self.emulator.snapshot(refresh=True)
+            self.assertEqual(mock_exec_command.call_count, 2)
+
+    def test_wait_for_change(self):
+
+        before = ScreenMock(SCREEN_LINES)
+        after = ScreenMock(SCREEN_LINES[:2] + ['STATUS NEW'])
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', side_effect=[before, before, after]):
+            screen = self.emulator.snapshot()
+            self.assertTrue(self.emulator.wait_for_change(screen, time_limit=0.5))
+
+    def test_wait_for_change_row_expired(self):
+
+        before = ScreenMock(SCREEN_LINES)
+        after = ScreenMock(SCREEN_LINES[:2] + ['STATUS NEW'])
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', side_effect=[after] + [before] * 100):
+            screen = self.emulator.snapshot()
+            self.assertTrue(self.emulator.wait_for_change(screen, time_limit=0.5, row=3))
+            self.assertFalse(self.emulator.wait_for_change(self.emulator.snapshot(), time_limit=0.02, row=1))
+
+    def test_wait_until_stable(self):
+
+        loading = ScreenMock(SCREEN_LINES[:2] + ['LOADING   '])
+        loaded = ScreenMock(SCREEN_LINES)
+
+        # Three unchanged reads in a row after the first "loaded" read.
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', side_effect=[loading, loaded, loaded, loaded, loaded]) as mock_exec:
+            screen = self.emulator.wait_until_stable(stable_reads=3, time_limit=0.5)
+
+            self.assertEqual(screen.row(3), 'STATUS OK ')
+            self.assertEqual(mock_exec.call_count, 5)
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', side_effect=[loaded, loaded]) as mock_exec:
+            self.emulator.wait_until_stable(stable_reads=1, time_limit=0.5)
+            self.assertEqual(mock_exec.call_count, 2)
+
+    def test_wait_until_stable_after_change(self):
+
+        before = ScreenMock(SCREEN_LINES)
+        loaded = ScreenMock(SCREEN_LINES[:2] + ['LOADED    '])
+
+        # The screen before the AID key is not settled, however long it stays.
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', side_effect=[before] * 4 + [loaded] * 3) as mock_exec:
+            screen = self.emulator.wait_until_stable(Screen(SCREEN_LINES), time_limit=0.5)
+
+            self.assertEqual(screen.row(3), 'LOADED    ')
+            self.assertEqual(mock_exec.call_count, 7)
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', return_value=before):
+            with self.assertRaises(ScreenWaitError):
+                self.emulator.wait_until_stable(Screen(SCREEN_LINES), time_limit=0.02)
+
+    def test_wait_until_stable_quiet_time(self):
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', return_value=ScreenMock(SCREEN_LINES)):
+            screen = self.emulator.wait_until_stable(stable_reads=1000, quiet_time=0.01, time_limit=0.5)
+            self.assertEqual(screen.row(1), 'HEADER    ')
+
+    def test_wait_until_stable_expired(self):
+
+        screens = [ScreenMock(SCREEN_LINES[:2] + ['COUNT {:<4}'.format(n)]) for n in range(1000)]
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', side_effect=screens):
+            with self.assertRaises(ScreenWaitError):
+                self.emulator.wait_until_stable(time_limit=0.02)
+
+    def test_wait_for_any(self):
+
+        before = ScreenMock(SCREEN_LINES)
+        rejected = ScreenMock(['REJECTED  '] + SCREEN_LINES[1:])
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', side_effect=[before, rejected]) as mock_exec:
+            (name, elapsed) = self.emulator.wait_for_any([
+                ('rejected', ('REJECTED', 1, 1)),
+                ('changed', lambda screen: screen.row(1) != 'HEADER    '),
+            ], time_limit=0.5)
+
+            # The first matching condition wins, and each probe reads the screen once.
+            self.assertEqual(name, 'rejected')
+            self.assertLess(elapsed, 0.5)
+            self.assertEqual(mock_exec.call_count, 2)
+
+    def test_wait_for_any_expired(self):
+
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command', return_value=ScreenMock(SCREEN_LINES)):
+            with self.assertRaises(ScreenWaitError):
+                self.emulator.wait_for_any([('rejected', ('REJECTED', 1, 1))], time_limit=0.02)
+
+    def test_reads_only(self):
+        self.assertTrue(reads_only(b'Ascii()'))
+        self.assertTrue(reads_only(b'MoveCursor(2, 3) Ascii(2,3,10)'))
+        self.assertFalse(reads_only(b'MoveCursor(2, 3) EraseEOF() Key(U+0041)'))
+        self.assertFalse(reads_only(b'Enter'))
 
     def test_get_special_char_str(self):
         xpos = 2
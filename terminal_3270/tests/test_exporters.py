@@ -0,0 +1,101 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from unittest import TestCase
+
+from terminal_3270.exporters import CSVExporter, NDJSONExporter
+
+Row = namedtuple('Row', ['loc', 'cwl'])
+
+
+class TestExporters(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_ndjson_rows(self):
+        output = io.StringIO()
+        with NDJSONExporter(output) as exporter:
+            count = exporter.write_all([Row('LOC1', 1), {'loc': 'LOC2', 'cwl': None}, ['LOC3', '3']])
+
+        self.assertEqual(count, 3)
+        self.assertEqual([json.loads(line) for line in output.getvalue().splitlines()], [
+            {'loc': 'LOC1', 'cwl': 1},
+            {'loc': 'LOC2', 'cwl': None},
+            ['LOC3', '3'],
+        ])
+
+    def test_csv_header_from_first_row(self):
+        output = io.StringIO()
+        with CSVExporter(output) as exporter:
+            exporter.write_all([Row('LOC1', 1), Row('LOC, 2', 2)])
+
+        self.assertEqual(output.getvalue().splitlines(), ['loc,cwl', 'LOC1,1', '"LOC, 2",2'])
+
+    def test_csv_columns_order_dict_rows(self):
+        output = io.StringIO()
+        with CSVExporter(output, columns=['cwl', 'loc']) as exporter:
+            exporter.write({'loc': 'LOC1', 'cwl': 1})
+            exporter.write(['7', 'LOC7'])
+
+        self.assertEqual(output.getvalue().splitlines(), ['cwl,loc', '1,LOC1', '7,LOC7'])
+
+    def test_buffered_until_buffer_rows(self):
+        output = io.StringIO()
+        exporter = NDJSONExporter(output, buffer_rows=2, flush_interval=60)
+
+        exporter.write(['a'])
+        self.assertEqual(output.getvalue(), '')
+        exporter.write(['b'])
+        self.assertEqual(output.getvalue().splitlines(), ['["a"]', '["b"]'])
+
+        exporter.write(['c'])
+        exporter.close()
+        self.assertEqual(exporter.rows_written, 3)
+        self.assertEqual(len(output.getvalue().splitlines()), 3)
+
+    def test_flush_interval(self):
+        output = io.StringIO()
+        exporter = NDJSONExporter(output, buffer_rows=100, flush_interval=0.0)
+
+        exporter.write(['a'])
+        self.assertEqual(output.getvalue(), '["a"]\n')
+
+    def test_gzip_path_readable_while_running(self):
+        path = os.path.join(self.tmpdir, 'rows.ndjson.gz')
+        exporter = NDJSONExporter(path)
+        exporter.write_all(Row('LOC{}'.format(n), n) for n in range(1000))
+
+        # Each flush ends a complete deflate block, so the rows so far can be read back.
+        with open(path, 'rb') as f:
+            partial = gzip.GzipFile(fileobj=io.BytesIO(f.read()))
+            lines = []
+            try:
+                for line in partial:
+                    lines.append(line)
+            except EOFError:
+                pass
+        self.assertEqual(len(lines), 1000)
+
+        exporter.close()
+        with gzip.open(path, 'rt') as f:
+            self.assertEqual(json.loads(f.readline()), {'loc': 'LOC0', 'cwl': 0})
+
+    def test_plain_path(self):
+        path = os.path.join(self.tmpdir, 'rows.csv')
+        with CSVExporter(path, columns=['loc', 'cwl']) as exporter:
+            exporter.write(Row('LOC1', 1))
+
+        with open(path) as f:
+            self.assertEqual(f.read().splitlines(), ['loc,cwl', 'LOC1,1'])
+
+    def test_bad_buffer_rows(self):
+        with self.assertRaises(ValueError):
+            NDJSONExporter(io.StringIO(), buffer_rows=0)
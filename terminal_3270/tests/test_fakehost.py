@@ -0,0 +1,282 @@
+import io
+import re
+from unittest import TestCase, mock
+
+from terminal_3270.emulator import EmulatorPlus
+from terminal_3270.fakehost import (
+    FakeHost,
+    FakeHostApp,
+    FakeHostConfig,
+    FakeHostError,
+    FakeScreen,
+    InProcessApp,
+    main,
+    parse_actions,
+    parse_latency
+)
+from terminal_3270.metrics import CommandMetrics
+from terminal_3270.sessions import (
+    ACF2SignOnSession,
+    LoginError,
+    RACFLoginSession,
+    RACFSignOnSession,
+    Session3270
+)
+from terminal_3270.tables import ScreenTable
+
+# Fake host default credentials
+test_user = 'USER0001'
+test_passwd = 'PASSWORD'
+test_app_id = 'TST01'
+test_signon_user = 'SIGNUSER'
+test_signon_passwd = 'SIGNPASS'
+test_host = 'fake.host.org'
+
+
+class TestParsing(TestCase):
+
+    def test_parse_actions(self):
+        actions = parse_actions('Key(U+0041) String("a, \\"b\\" ") Enter MoveCursor(0, 9) Ascii()')
+        self.assertEqual(actions, [
+            ('Key', ['U+0041']),
+            ('String', ['a, "b" ']),
+            ('Enter', []),
+            ('MoveCursor', ['0', '9']),
+            ('Ascii', []),
+        ])
+
+    def test_parse_actions_syntax_error(self):
+        with self.assertRaises(FakeHostError):
+            parse_actions('Key(U+0041')
+
+    def test_parse_latency(self):
+        self.assertEqual(parse_latency('0.5'), {'enter': 0.5, 'pf': 0.5, 'pa': 0.5, 'clear': 0.5})
+        self.assertEqual(parse_latency('enter=0.03,PF=0.05'), {'enter': 0.03, 'pf': 0.05})
+        with self.assertRaises(ValueError):
+            parse_latency('home=1')
+
+    def test_config_from_args(self):
+        config = FakeHostConfig.from_args(['-xrm', 's3270.unlockDelay: False', '--mode', 'racf', '--latency', 'enter=0.1'])
+        self.assertEqual(config.mode, 'racf')
+        self.assertEqual(config.latency['enter'], 0.1)
+        self.assertEqual(config.latency['pf'], 0.0)
+
+
+class TestFakeHost(TestCase):
+
+    def setUp(self):
+        self.host = FakeHost()
+
+    def tearDown(self):
+        pass
+
+    def test_status_line_and_ok(self):
+        response = self.host.execute('Connect(fake.host.org)')
+        self.assertEqual(response, ['U F U C(fake.host.org) I 2 24 80 0 2 0x0 -', 'ok'])
+
+    def test_unknown_action_error(self):
+        response = self.host.execute('Frobnicate()')
+        self.assertEqual(response[0], 'data: Unknown action: Frobnicate')
+        self.assertEqual(response[-1], 'error')
+
+    def test_aid_latency(self):
+        mock_sleep = mock.MagicMock()
+        host = FakeHost(FakeHostConfig(latency={'enter': 0.25}), sleep=mock_sleep)
+        host.execute('Connect(fake.host.org)')
+        host.execute('Enter')
+        mock_sleep.assert_called_once_with(0.25)
+
+    def test_main_protocol_loop(self):
+        stdin = io.StringIO('Connect(fake.host.org)\nAscii(2,1,19)\nQuit\nAscii()\n')
+        stdout = io.StringIO()
+        main([], stdin=stdin, stdout=stdout)
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[2], 'data: ACF2 - ENTER REGION')
+        self.assertEqual(len([line for line in lines if line == 'ok']), 3)  # stops at Quit
+
+
+class TestFakeHostSessions(TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def new_app(self, **config):
+        self.host = FakeHost(FakeHostConfig(**config))
+        return InProcessApp(self.host)
+
+    def test_acf2_signon_session_with_queued_screens(self):
+        session = ACF2SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host,
+                                    app=self.new_app(mode='acf2', queued_screens=3))
+        session.connect()
+
+        self.assertEqual(self.host.queued, 0)
+        self.assertTrue(self.host.signed_on)
+
+        session.disconnect()
+        self.assertFalse(self.host.signed_on)
+
+    def test_remove_queued_screens_by_indicator(self):
+        metrics = CommandMetrics()
+        session = ACF2SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host,
+                                    app=self.new_app(mode='acf2', queued_screens=3), metrics=metrics)
+        Session3270.connect(session)  # login only, without SIGNON
+
+        self.assertEqual(session.remove_queued_screens(), 3)
+        self.assertEqual(self.host.queued, 0)
+        self.assertEqual(self.host.screen.name, 'clear')
+
+        # One PA2 per queued screen after the first, and one CLEAR.
+        actions = metrics.snapshot()['phases']['other']
+        self.assertEqual((actions['PA']['count'], actions['Clear']['count']), (2, 1))
+
+        session.term_emulator.terminate()
+
+    def test_remove_queued_screens_without_indicator(self):
+        session = ACF2SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host,
+                                    app=self.new_app(mode='acf2', queued_screens=3))
+        session.queued_screen_pattern = re.compile(r'NO INDICATOR')
+        Session3270.connect(session)
+
+        # CLEAR once, then PA2 until a blank screen; the first screen is not known to be queued.
+        self.assertEqual(session.remove_queued_screens(), 2)
+        self.assertEqual(self.host.queued, 0)
+
+        # Nothing more to remove at the SIGNON header.
+        session.term_emulator.format_screen(session.signon_screen_name)
+        self.assertEqual(session.remove_queued_screens(), 0)
+        self.assertEqual(self.host.screen.name, 'signon')
+
+        session.term_emulator.terminate()
+
+    def test_remove_queued_screens_without_queue(self):
+        metrics = CommandMetrics()
+        session = ACF2SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host,
+                                    app=self.new_app(mode='acf2'), metrics=metrics)
+        Session3270.connect(session)
+        self.assertEqual(self.host.screen.name, 'ready')
+
+        # The ready screen is cleared, and one PA2 shows nothing was queued.
+        self.assertEqual(session.remove_queued_screens(), 0)
+        actions = metrics.snapshot()['phases']['other']
+        self.assertEqual((actions['PA']['count'], actions['Clear']['count']), (1, 1))
+
+        session.term_emulator.terminate()
+
+    def test_remove_queued_screens_stops_on_unchanged_screen(self):
+        metrics = CommandMetrics()
+        session = ACF2SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host,
+                                    app=self.new_app(mode='acf2'), metrics=metrics)
+        Session3270.connect(session)
+
+        # An application error screen that CLEAR and PA2 do not remove.
+        self.host.show(FakeScreen('error').text(1, 2, 'APPLICATION ERROR'))
+        self.host.on_clear = self.host.on_pa = lambda *args: None
+        session.term_emulator.snapshot(refresh=True)
+
+        self.assertEqual(session.remove_queued_screens(), 0)
+        self.assertEqual(metrics.snapshot()['phases']['other']['PA']['count'], 1)
+
+        session.term_emulator.terminate()
+
+    def test_racf_session_results_table(self):
+        session = RACFSignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host,
+                                    app=self.new_app(mode='racf', results=20, require_signon=True))
+
+        with session:
+            session.term_emulator.format_screen('OSSCWL')
+            session.term_emulator.screen_command('FIND ORD1')
+            rows = [r for r in ScreenTable(session.term_emulator, 11, 23).fetch_results()]
+
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(rows[0][:2], ['LOC00000001', '1'])
+        self.assertEqual(rows[-1][:2], ['LOC00000020', '20'])
+
+    def test_persistent_signon_session(self):
+        session = RACFSignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host,
+                                    app=self.new_app(mode='racf', require_signon=True), persistent_signon=True)
+
+        for job in range(2):
+            with session:
+                session.term_emulator.format_screen('OSSCWL')
+                session.term_emulator.screen_command('FIND ORD1')
+            self.assertTrue(self.host.signed_on)
+
+        # The host drops the SIGNON while the session is idle, after its last screen read;
+        # the next block sees it and signs on again.
+        session.term_emulator.status_bar()
+        self.host.signed_on = False
+        self.host.status(' DFS3649I  SIGNON REQUIRED')
+        with session:
+            self.assertTrue(self.host.signed_on)
+
+        session.disconnect()
+        self.assertFalse(self.host.signed_on)
+
+    def test_persistent_signon_session_reconnects(self):
+        session = RACFSignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host,
+                                    app=self.new_app(mode='racf', require_signon=True), persistent_signon=True)
+
+        with session:
+            emulator = session.term_emulator
+
+        # The host drops the connection between blocks; the next block connects again.
+        self.host.execute('Disconnect()')
+        with session:
+            self.assertIsNot(session.term_emulator, emulator)
+            self.assertTrue(session.is_alive())
+            self.assertEqual(session.signed_on_user, test_signon_user)
+        self.assertTrue(emulator.is_terminated)
+
+        # So does a session the heartbeat marked stale.
+        emulator = session.term_emulator
+        session.stale = True
+        with session:
+            self.assertIsNot(session.term_emulator, emulator)
+            self.assertFalse(session.stale)
+
+        session.disconnect()
+
+    def test_disconnect_dead_signon_session(self):
+        session = RACFSignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host,
+                                    app=self.new_app(mode='racf'))
+        session.connect()
+        emulator = session.term_emulator
+
+        # The connection is gone: no SIGNOFF, but s3270 is still terminated.
+        with mock.patch.object(emulator, 'exec_command', side_effect=BrokenPipeError), \
+                mock.patch.object(emulator, 'terminate') as terminate:
+            session.disconnect()
+
+        terminate.assert_called_once_with()
+        self.assertIsNone(session.term_emulator)
+        self.assertIsNone(session.signed_on_user)
+        self.assertTrue(self.host.signed_on)
+
+    def test_login_rejected(self):
+        with self.assertRaises(LoginError):
+            RACFLoginSession(test_user, 'BADPASS', test_app_id, test_host, app=self.new_app(mode='racf')).connect()
+
+    def test_signon_required(self):
+        emulator = EmulatorPlus(app=self.new_app(require_signon=True))
+        self.host.execute('Connect(fake.host.org)')
+        self.host.signed_on = False
+        self.host.show(self.host.inquiry_screen('OSSCWL'))
+
+        emulator.screen_command('FIND ORD1')
+        (status_bool, status_bar) = emulator.status_bar(passing_strings=['FIND SUCCESSFUL'])
+        self.assertFalse(status_bool)
+        self.assertIn('SIGNON REQUIRED', status_bar)
+        emulator.terminate()
+
+    def test_subprocess_app(self):
+        emulator = EmulatorPlus(app_class=FakeHostApp, args=['--mode', 'racf'])
+        try:
+            emulator.connect(test_host)
+            self.assertTrue(emulator.is_connected())
+            self.assertTrue(emulator.string_found(1, 2, 'RACF - SELECT APPLICATION'))
+        finally:
+            emulator.terminate()
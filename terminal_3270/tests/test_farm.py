@@ -0,0 +1,84 @@
+import functools
+import os
+from unittest import TestCase
+
+from terminal_3270.farm import JobResult, WorkerFarm
+from terminal_3270.fakehost import FakeHost, FakeHostConfig, InProcessApp
+from terminal_3270.sessions import RACFLoginSession
+
+# Session3270: dummy parameters
+test_user = 'USER0001'
+test_passwd = 'PASSWORD'
+test_app_id = 'TST01'
+test_host = 'fake.host.org'
+
+
+def new_session():
+    app = InProcessApp(FakeHost(FakeHostConfig(mode='racf')))
+    return RACFLoginSession(test_user, test_passwd, test_app_id, test_host, app=app)
+
+
+def rejected_session():
+    app = InProcessApp(FakeHost(FakeHostConfig(mode='racf')))
+    return RACFLoginSession(test_user, 'BADPASS', test_app_id, test_host, app=app)
+
+
+def read_row(session, row):
+    return (os.getpid(), id(session), session.term_emulator.snapshot().row(row).strip())
+
+
+def broken_job(session):
+    raise RuntimeError('job failed')
+
+
+class TestWorkerFarm(TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_map_in_job_order(self):
+
+        with WorkerFarm(new_session, processes=2) as farm:
+            results = farm.map(functools.partial(read_row, row=1) for i in range(6))
+
+        self.assertEqual([r.index for r in results], list(range(6)))
+        self.assertTrue(all(r.error is None for r in results))
+
+        # Each worker reuses its own warm session.
+        workers = set((pid, session_id) for (pid, session_id, text) in [r.value for r in results])
+        self.assertLessEqual(len(workers), 2)
+        self.assertNotIn(os.getpid(), [pid for (pid, session_id) in workers])
+
+    def test_imap_streams_errors(self):
+
+        with WorkerFarm(new_session, processes=1) as farm:
+            results = sorted(farm.imap([broken_job, functools.partial(read_row, row=1)]))
+
+        self.assertEqual(results[0].index, 0)
+        self.assertIsNone(results[0].value)
+        self.assertIn('RuntimeError: job failed', results[0].error)
+        self.assertIsInstance(results[1], JobResult)
+        self.assertIsNone(results[1].error)
+
+    def test_failed_worker_start(self):
+
+        # The workers cannot log in, so every job reports the error instead of hanging.
+        with WorkerFarm(rejected_session, processes=1) as farm:
+            results = farm.map([functools.partial(read_row, row=1)] * 2)
+
+        self.assertEqual([r.index for r in results], [0, 1])
+        self.assertTrue(all('LoginError' in r.error for r in results))
+
+        with WorkerFarm(new_session, processes=1, pool_options={'max_lifetime': 60, 'no_such_option': 1}) as farm:
+            results = farm.map([functools.partial(read_row, row=1)])
+
+        self.assertIn('TypeError', results[0].error)
+
+    def test_bad_parameters(self):
+        with self.assertRaises(TypeError):
+            WorkerFarm(None)
+        with self.assertRaises(ValueError):
+            WorkerFarm(new_session, sessions_per_worker=0)
@@ -0,0 +1,128 @@
+from unittest import TestCase, mock
+
+from terminal_3270.emulator import EmulatorError, EmulatorPlus
+from terminal_3270.fakehost import FakeHost, FakeHostConfig, FakeScreen, InProcessApp
+from terminal_3270.fields import FieldMap, FieldMapError
+
+
+def hex_chars(text):
+    return ['{:02x}'.format(ord(ch)) for ch in text]
+
+
+# A 2x10 screen: "NAME:" protected, a 2 character input field, protected numeric text, then a hidden field that wraps.
+READ_BUFFER_LINES = [
+    ' '.join(['SF(c0=60)'] + hex_chars('NAME:') + ['SF(c0=c0)'] + hex_chars('AB') + ['SF(c0=f0)']),
+    ' '.join(['SA(41=f2)31', 'GE(ad)'] + hex_chars('  PIN') + ['SF(c0=4c)'] + hex_chars('12')),
+]
+
+
+class TestFieldMap(TestCase):
+
+    def setUp(self):
+        self.field_map = FieldMap.parse(READ_BUFFER_LINES)
+
+    def tearDown(self):
+        pass
+
+    def test_parse_fields(self):
+        (name_label, name, protected, pin) = self.field_map.fields
+
+        self.assertEqual((self.field_map.rows, self.field_map.cols), (2, 10))
+        self.assertEqual((name.row, name.col, name.length, name.value), (1, 8, 2, 'AB'))
+        self.assertEqual(name.label, 'NAME')
+        self.assertFalse(name.protected)
+
+        # Character attributes and graphic escapes are positions too.
+        self.assertEqual((protected.row, protected.col, protected.length), (2, 1, 7))
+        self.assertEqual(protected.value, '1   PIN')
+        self.assertTrue(protected.protected)
+        self.assertTrue(protected.numeric)
+
+        # The last field wraps around to the first attribute.
+        self.assertEqual((pin.row, pin.col, pin.length, pin.value), (2, 9, 2, '12'))
+        self.assertEqual(pin.label, 'PIN')
+        self.assertTrue(pin.hidden)
+        self.assertFalse(pin.numeric)
+
+    def test_find(self):
+        self.assertEqual(self.field_map.find('NAME:').position, (1, 8))
+        self.assertEqual(self.field_map.find((1, 9)).position, (1, 8))
+        self.assertIs(self.field_map.find(self.field_map.fields[0]), self.field_map.fields[0])
+        self.assertEqual(len(self.field_map.unprotected()), 2)
+
+        with self.assertRaises(FieldMapError):
+            self.field_map.find('MISSING')
+
+    def test_unformatted_screen(self):
+        field_map = FieldMap.parse([' '.join(hex_chars('HELLO'))])
+        self.assertEqual(len(field_map), 0)
+        self.assertEqual(field_map.text, 'HELLO')
+
+    def test_code_page(self):
+        # ReadBuffer hex is in the emulator's code page, not UTF-8.
+        self.assertEqual(FieldMap.parse(['43 41 46 e9']).text, 'CAF\u00e9')
+        self.assertEqual(FieldMap.parse(['f1'], encoding='cp037').text, '1')
+
+    def test_bad_read_buffer(self):
+        with self.assertRaises(FieldMapError):
+            FieldMap.parse(['41 42', '41'])
+        with self.assertRaises(FieldMapError):
+            FieldMap.parse(['41 zz'])
+
+
+class TestEmulatorFields(TestCase):
+
+    def setUp(self):
+        self.host = FakeHost(FakeHostConfig(mode='racf'))
+        self.emulator = EmulatorPlus(app=InProcessApp(self.host))
+        self.emulator.connect('fake.host.org')
+        self.host.show(FakeScreen('order')
+                       .text(1, 2, 'ORDER ENTRY')
+                       .text(3, 2, 'CUSTOMER:')
+                       .field('customer', 3, 15, 10)
+                       .text(4, 2, 'QUANTITY:')
+                       .field('quantity', 4, 15, 4, numeric=True)
+                       .text(5, 2, 'PIN:')
+                       .field('pin', 5, 15, 4, hidden=True))
+
+    def tearDown(self):
+        self.emulator.terminate()
+
+    def test_read_fields_cached(self):
+        with mock.patch.object(self.emulator, 'exec_command', wraps=self.emulator.exec_command) as exec_command:
+            field_map = self.emulator.read_fields()
+            self.assertIs(self.emulator.read_fields(), field_map)
+            self.assertEqual(exec_command.call_count, 1)
+
+        self.assertEqual([f.label for f in field_map.unprotected()], ['CUSTOMER', 'QUANTITY', 'PIN'])
+        self.assertTrue(field_map.find('QUANTITY').numeric)
+        self.assertTrue(field_map.find('PIN').hidden)
+
+    def test_fill_fields_one_round_trip(self):
+        self.host.screen.buffer[self.host.screen.offset(3, 15):self.host.screen.offset(3, 25)] = list('OLD VALUE ')
+        field_map = self.emulator.read_fields()
+
+        with mock.patch.object(self.emulator, 'exec_command', wraps=self.emulator.exec_command) as exec_command:
+            self.emulator.fill_fields({'CUSTOMER': 'ACME', (4, 15): '12', 'PIN': '9999'}, field_map=field_map)
+            self.assertEqual(exec_command.call_count, 1)
+
+        self.assertEqual(self.host.screen.value('customer'), 'ACME')
+        self.assertEqual(self.host.screen.value('quantity'), '12')
+        self.assertEqual(self.host.screen.value('pin'), '9999')
+
+        # The screen changed, so the field map is read again.
+        self.assertIsNot(self.emulator.read_fields(), field_map)
+
+    def test_fill_fields_errors(self):
+        with self.assertRaisesRegex(EmulatorError, 'protected'):
+            self.emulator.fill_fields({(1, 2): 'X'})
+        with self.assertRaisesRegex(EmulatorError, 'does not fit'):
+            self.emulator.fill_fields({'QUANTITY': '12345'})
+        with self.assertRaisesRegex(EmulatorError, 'no field'):
+            self.emulator.fill_fields({'MISSING': 'X'})
+        with self.assertRaisesRegex(EmulatorError, 'not numeric'):
+            self.emulator.fill_fields({'QUANTITY': '1X'})
+
+        # An empty field map is still the map to use.
+        with self.assertRaisesRegex(EmulatorError, 'no field'):
+            self.emulator.fill_fields({'CUSTOMER': 'ACME'}, field_map=FieldMap([], 24, 80, ''))
@@ -0,0 +1,107 @@
+import threading
+import time
+from unittest import TestCase, mock
+
+from terminal_3270.heartbeat import Heartbeat, beat, session_heartbeat
+from terminal_3270.sessions import Session3270
+
+test_host = 'fake.host.org'
+
+
+class TestHeartbeat(TestCase):
+
+    def setUp(self):
+        self.session = Session3270('login_userid', 'login_password', 'TST01', test_host)
+        self.session.term_emulator = mock.MagicMock()
+        self.session.term_emulator.lock = threading.RLock()
+        self.session.term_emulator.is_connected.return_value = True
+
+    def tearDown(self):
+        pass
+
+    def test_beat_alive(self):
+        self.assertTrue(beat(self.session, action=b'PA(1)'))
+        self.session.term_emulator.exec_command.assert_called_once_with(b'PA(1)')
+        self.assertFalse(self.session.stale)
+
+    def test_beat_callable_action(self):
+        action = mock.MagicMock()
+        self.assertTrue(beat(self.session, action=action))
+        action.assert_called_once_with(self.session)
+
+    def test_beat_dead_marks_stale(self):
+        self.session.term_emulator.is_connected.return_value = False
+
+        self.assertFalse(beat(self.session))
+        self.assertTrue(self.session.stale)
+        self.assertFalse(self.session.is_alive())
+
+        # A stale session is not probed again.
+        self.assertFalse(beat(self.session))
+        self.assertEqual(self.session.term_emulator.is_connected.call_count, 1)
+
+    def test_beat_action_error_marks_stale(self):
+        self.session.term_emulator.exec_command.side_effect = BrokenPipeError('s3270 exited')
+
+        self.assertFalse(beat(self.session, action=b'PA(1)'))
+        self.assertTrue(self.session.stale)
+
+    def test_beat_skips_busy_emulator(self):
+        locked = threading.Event()
+        release = threading.Event()
+
+        def real_work():
+            with self.session.term_emulator.lock:
+                locked.set()
+                release.wait(1.0)
+
+        worker = threading.Thread(target=real_work)
+        worker.start()
+        locked.wait(1.0)
+        try:
+            self.assertTrue(beat(self.session, action=b'PA(1)'))
+            self.assertFalse(self.session.term_emulator.exec_command.called)
+        finally:
+            release.set()
+            worker.join()
+
+    def test_heartbeat_thread(self):
+        called = threading.Event()
+        heartbeat = Heartbeat(called.set, interval=0.01)
+
+        with heartbeat:
+            self.assertTrue(heartbeat.running)
+            self.assertTrue(called.wait(1.0))
+
+        self.assertFalse(heartbeat.running)
+        self.assertGreaterEqual(heartbeat.beats, 1)
+
+    def test_heartbeat_bad_interval(self):
+        with self.assertRaises(ValueError):
+            Heartbeat(mock.MagicMock(), interval=0)
+
+    def test_session_heartbeat_only_when_idle(self):
+        emulator = self.session.term_emulator
+
+        emulator.idle_time.return_value = 0.0
+        heartbeat = session_heartbeat(self.session, interval=0.02, action=b'PA(1)')
+        heartbeat.callback()
+        self.assertFalse(emulator.exec_command.called)
+
+        emulator.idle_time.return_value = 0.05
+        heartbeat.callback()
+        emulator.exec_command.assert_called_once_with(b'PA(1)')
+
+    def test_session_start_heartbeat_until_disconnect(self):
+        emulator = self.session.term_emulator
+        emulator.idle_time.return_value = 60.0
+
+        heartbeat = self.session.start_heartbeat(interval=0.02)
+        deadline = time.time() + 1.0
+        while not emulator.is_connected.called and time.time() < deadline:
+            time.sleep(0.005)
+        self.assertTrue(emulator.is_connected.called)
+
+        self.session.disconnect()
+        self.assertFalse(heartbeat.running)
+        self.assertIsNone(self.session.heartbeat)
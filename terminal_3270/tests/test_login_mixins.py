@@ -1,9 +1,14 @@
 from unittest import TestCase, mock
 
+from terminal_3270.emulator import TAB, ScreenWaitError
 from terminal_3270.login_mixins import (
     ACF2LoginMixin,
-    RACFLoginMixin
+    RACFLoginMixin,
+    TIMEOUT_LOGIN_SCREEN,
+    TIMEOUT_LOGIN_STATUS
 )
+from terminal_3270.registry import ScreenRegistry
+from terminal_3270.screen import Screen
 from terminal_3270.sessions import Session3270
 
 # Session3270: dummy parameters
@@ -13,6 +18,15 @@ test_app_id = 'TST01'
 test_host = 'fake.host.org'
 
 
+def screen_with(row, col, text):
+    lines = [' ' * 80] * 24
+    lines[row - 1] = (' ' * (col - 1) + text).ljust(80)
+    return Screen(lines)
+
+
+BLANK_SCREEN = Screen([' ' * 80] * 24)
+
+
 class StubACF2Session(ACF2LoginMixin, Session3270):
     pass
 
@@ -29,6 +43,15 @@ class TestLoginMixins(TestCase):
     def tearDown(self):
         pass
 
+    def assertLoginScreens(self, condition, row, col):
+        " The login outcomes are one ScreenRegistry, with REJECTED at (row, col) "
+
+        (name, screens) = condition
+        self.assertEqual(name, 'login')
+        self.assertIsInstance(screens, ScreenRegistry)
+        self.assertEqual(screens.classify(screen_with(row, col, 'REJECTED')).name, 'rejected')
+        self.assertIsNone(screens.classify(BLANK_SCREEN))
+
     def test_conduct_acf2_login(self):
 
         with mock.patch('terminal_3270.sessions.Emulator') as mock_emulator_class:
@@ -36,7 +59,8 @@ class TestLoginMixins(TestCase):
 
             # REJECTED is False and login succeeds.
             session.term_emulator = mock_emulator_class()
-            session.term_emulator.string_found.return_value = False
+            session.term_emulator.wait_for_any.return_value = ('changed', 0.010)
+            session.term_emulator.wait_until_stable.return_value = BLANK_SCREEN
 
             login_bool = session.login()
 
@@ -46,20 +70,19 @@ class TestLoginMixins(TestCase):
             session.term_emulator.wait_for_field.assert_called_with()
             session.term_emulator.fill_field.assert_called_with(1, 3, session.region, len(session.region))
             session.term_emulator.send_enter.assert_called_with()
+            session.term_emulator.wait_for_change.assert_called_with(
+                session.term_emulator.snapshot.return_value, time_limit=TIMEOUT_LOGIN_SCREEN)
 
             # 2) Type in the USERID and PASSWORD fields.
 
-            # USERID @(*, *)
+            # USERID @(*, *), then PASSWORD @(*, *)
             session.term_emulator.wait_for_field.assert_called_with()
-            session.term_emulator.key_entry.mock_calls[0].assert_called_with(session.username)
-            session.term_emulator.send_tab.assert_called_with()
-
-            # PASSWORD @(*, *)
-            session.term_emulator.key_entry.mock_calls[1].assert_called_with(session.password)
+            session.term_emulator.key_sequence.assert_called_once_with(session.username, TAB, session.password)
             session.term_emulator.send_enter.assert_called_with()
 
             # Login Status: Look for a status message
-            session.term_emulator.string_found.assert_called_with(2, 2, 'REJECTED')
+            conditions = session.term_emulator.wait_for_any.call_args[0][0]
+            self.assertLoginScreens(conditions[0], 2, 2)
             self.assertTrue(login_bool)
 
     def test_conduct_acf2_login_failure(self):
@@ -69,12 +92,13 @@ class TestLoginMixins(TestCase):
 
             # REJECTED is True and login fails.
             session.term_emulator = mock_emulator_class()
-            session.term_emulator.string_found.return_value = True
+            session.term_emulator.wait_for_any.return_value = ('rejected', 0.010)
 
             login_bool = session.login()
 
             # Login Status: Look for a status message
-            session.term_emulator.string_found.assert_called_with(2, 2, 'REJECTED')
+            conditions = session.term_emulator.wait_for_any.call_args[0][0]
+            self.assertLoginScreens(conditions[0], 2, 2)
             self.assertFalse(login_bool)
 
     def test_conduct_racf_login(self):
@@ -84,7 +108,8 @@ class TestLoginMixins(TestCase):
 
             # REJECTED is False and login succeeds.
             session.term_emulator = mock_emulator_class()
-            session.term_emulator.string_found.return_value = False
+            session.term_emulator.wait_for_any.return_value = ('changed', 0.010)
+            session.term_emulator.wait_until_stable.return_value = BLANK_SCREEN
 
             login_bool = session.login()
 
@@ -93,22 +118,21 @@ class TestLoginMixins(TestCase):
             # 1) Type in the APPLICATION field.
             session.term_emulator.wait_for_field.assert_called_with()
             session.term_emulator.move_to.assert_called_with(session.racf_app_row, session.racf_app_column)
-            session.term_emulator.key_entry.mock_calls[0].assert_called_with(session.app_id)
+            session.term_emulator.key_entry.assert_called_once_with(session.app_id, batch=True)
             session.term_emulator.send_enter.assert_called_with()
+            session.term_emulator.wait_for_change.assert_called_with(
+                session.term_emulator.snapshot.return_value, time_limit=TIMEOUT_LOGIN_SCREEN)
 
             # 2) Type in the USERID and PASSWORD fields.
 
-            # USERID @(*, *)
+            # USERID @(*, *), then PASSWORD @(*, *)
             session.term_emulator.wait_for_field.assert_called_with()
-            session.term_emulator.key_entry.mock_calls[1].assert_called_with(session.username)
-            session.term_emulator.send_tab.assert_called_with()
-
-            # PASSWORD @(*, *)
-            session.term_emulator.key_entry.mock_calls[2].assert_called_with(session.password)
+            session.term_emulator.key_sequence.assert_called_once_with(session.username, TAB, session.password)
             session.term_emulator.send_enter.assert_called_with()
 
             # Login Status: Look for a status message
-            session.term_emulator.string_found.assert_called_with(17, 2, 'REJECTED')
+            conditions = session.term_emulator.wait_for_any.call_args[0][0]
+            self.assertLoginScreens(conditions[0], 17, 2)
             self.assertTrue(login_bool)
 
     def test_conduct_racf_login_failure(self):
@@ -118,10 +142,55 @@ class TestLoginMixins(TestCase):
 
             # REJECTED is True and login fails.
             session.term_emulator = mock_emulator_class()
-            session.term_emulator.string_found.return_value = True
+            session.term_emulator.wait_for_any.return_value = ('rejected', 0.010)
 
             login_bool = session.login()
 
             # Login Status: Look for a status message
-            session.term_emulator.string_found.assert_called_with(17, 2, 'REJECTED')
+            conditions = session.term_emulator.wait_for_any.call_args[0][0]
+            self.assertLoginScreens(conditions[0], 17, 2)
             self.assertFalse(login_bool)
+
+    def test_login_status_timeout(self):
+
+        with mock.patch('terminal_3270.sessions.Emulator') as mock_emulator_class:
+            session = StubACF2Session(test_user, test_passwd, test_app_id, test_host)
+
+            # The host does not answer in time; check the screen as it is.
+            session.term_emulator = mock_emulator_class()
+            session.term_emulator.wait_for_any.side_effect = ScreenWaitError('too slow')
+            session.term_emulator.classify.side_effect = lambda screens: screens.classify(screen_with(2, 2, 'REJECTED'))
+
+            self.assertFalse(session.login())
+            self.assertEqual(session.term_emulator.wait_for_any.call_args[1], {'time_limit': TIMEOUT_LOGIN_STATUS})
+            self.assertTrue(session.term_emulator.classify.called)
+
+    def test_login_rejected_after_repaint(self):
+
+        with mock.patch('terminal_3270.sessions.Emulator') as mock_emulator_class:
+            session = StubACF2Session(test_user, test_passwd, test_app_id, test_host)
+
+            # The screen changed first, then REJECTED was drawn on the settled screen.
+            session.term_emulator = mock_emulator_class()
+            session.term_emulator.wait_for_any.return_value = ('changed', 0.010)
+            session.term_emulator.wait_until_stable.return_value = screen_with(2, 2, 'REJECTED')
+
+            self.assertFalse(session.login())
+            session.term_emulator.wait_until_stable.assert_called_with(time_limit=TIMEOUT_LOGIN_STATUS)
+
+    def test_login_next_screen_anchor(self):
+
+        with mock.patch('terminal_3270.sessions.Emulator') as mock_emulator_class:
+            session = StubRACFSession(test_user, test_passwd, test_app_id, test_host)
+            session.login_next_screen = ('READY', 1, 2)
+
+            # Only the next screen's anchor accepts the login.
+            session.term_emulator = mock_emulator_class()
+            session.term_emulator.wait_for_any.return_value = ('accepted', 0.010)
+
+            self.assertTrue(session.login())
+            conditions = session.term_emulator.wait_for_any.call_args[0][0]
+            self.assertEqual(len(conditions), 1)
+            self.assertLoginScreens(conditions[0], 17, 2)
+            self.assertEqual(conditions[0][1].classify(screen_with(1, 2, 'READY')).name, 'accepted')
+            self.assertFalse(session.term_emulator.wait_until_stable.called)
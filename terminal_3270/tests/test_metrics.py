@@ -0,0 +1,81 @@
+from unittest import TestCase, mock
+
+from terminal_3270.fakehost import FakeHost, FakeHostConfig, InProcessApp
+from terminal_3270.metrics import (
+    CommandMetrics,
+    LatencyHistogram,
+    action_type,
+    emulator_phase
+)
+from terminal_3270.sessions import RACFSignOnSession
+from terminal_3270.tables import ScreenTable
+
+
+class TestCommandMetrics(TestCase):
+
+    def setUp(self):
+        self.metrics = CommandMetrics()
+
+    def tearDown(self):
+        pass
+
+    def test_action_type(self):
+        self.assertEqual(action_type(b'Key(U+0041) Key(U+0042)'), 'Key')
+        self.assertEqual(action_type(b'Enter'), 'Enter')
+        self.assertEqual(action_type(b'Wait(10, InputField)'), 'Wait')
+        self.assertEqual(action_type(b'Tab() Enter'), 'Tab')
+
+    def test_histogram_buckets(self):
+        histogram = LatencyHistogram(buckets=(0.01, 0.1))
+        for seconds in (0.005, 0.05, 0.06, 3.0):
+            histogram.record(seconds)
+
+        stats = histogram.as_dict()
+        self.assertEqual(stats['count'], 4)
+        self.assertEqual(stats['buckets'], {'0.01': 1, '0.1': 2, 'inf': 1})
+        self.assertEqual((stats['min'], stats['max']), (0.005, 3.0))
+
+    def test_snapshot_by_action_and_phase(self):
+        self.metrics.record('Enter', 0.010, 'login')
+        self.metrics.record('Enter', 0.030, 'signon')
+        self.metrics.record('Ascii', 0.001)
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['round_trips'], 3)
+        self.assertEqual(snapshot['actions']['Enter']['count'], 2)
+        self.assertAlmostEqual(snapshot['actions']['Enter']['mean'], 0.020)
+        self.assertEqual(snapshot['phases']['login']['Enter']['count'], 1)
+        self.assertEqual(snapshot['phases']['other']['Ascii']['count'], 1)
+
+    def test_export_and_reset(self):
+        exporter = mock.MagicMock()
+        metrics = CommandMetrics(exporter=exporter)
+        metrics.record('PF', 0.02, 'page_fetch')
+
+        snapshot = metrics.export()
+        exporter.assert_called_once_with(snapshot)
+
+        metrics.reset()
+        self.assertEqual(metrics.round_trips, 0)
+
+    def test_emulator_phase_without_support(self):
+        with emulator_phase(object(), 'page_fetch'):
+            pass
+
+    def test_session_phases(self):
+        app = InProcessApp(FakeHost(FakeHostConfig(mode='racf', results=5)))
+        session = RACFSignOnSession('USER0001', 'PASSWORD', 'TST01', 'SIGNUSER', 'SIGNPASS', 'fake.host.org',
+                                    app=app, metrics=self.metrics)
+
+        with session:
+            session.term_emulator.format_screen('OSSCWL')
+            session.term_emulator.screen_command('FIND ORD1')
+            rows = [r for r in ScreenTable(session.term_emulator, 11, 23).fetch_results()]
+
+        self.assertEqual(len(rows), 5)
+
+        phases = self.metrics.snapshot()['phases']
+        self.assertEqual(set(phases), {'connect', 'login', 'signon', 'page_fetch', 'signoff', 'other'})
+        self.assertEqual(phases['connect']['Connect']['count'], 1)
+        self.assertEqual(phases['page_fetch'], {'Ascii': mock.ANY})  # one screen read per page
+        self.assertEqual(phases['page_fetch']['Ascii']['count'], 1)
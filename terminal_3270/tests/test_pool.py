@@ -0,0 +1,246 @@
+import threading
+from unittest import TestCase, mock
+
+from terminal_3270.pool import (
+    PoolClosedError,
+    PoolError,
+    PoolTimeoutError,
+    SessionPool
+)
+
+
+class FakeSession(object):
+    """ Fake Session3270
+
+    Count connect() and disconnect() calls without a terminal.
+    """
+
+    def __init__(self):
+        self.connected = False
+        self.alive = True
+        self.connects = 0
+        self.disconnects = 0
+
+    def connect(self):
+        self.connected = True
+        self.connects += 1
+
+    def disconnect(self):
+        self.connected = False
+        self.disconnects += 1
+
+    def is_alive(self):
+        return self.connected and self.alive
+
+
+class TestSessionPool(TestCase):
+
+    def setUp(self):
+        self.sessions = []
+
+    def tearDown(self):
+        pass
+
+    def new_session(self):
+        session = FakeSession()
+        self.sessions.append(session)
+        return session
+
+    def test_checkout_connects_and_reuses_session(self):
+
+        pool = SessionPool(self.new_session, max_size=2)
+
+        with pool.session() as session:
+            self.assertTrue(session.connected)
+
+        with pool.session() as second_session:
+            self.assertIs(second_session, session)
+
+        self.assertEqual(len(self.sessions), 1)
+        self.assertEqual(session.connects, 1)
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(pool.idle_count, 1)
+
+    def test_fill_min_size(self):
+
+        with SessionPool(self.new_session, min_size=2, max_size=3) as pool:
+            self.assertEqual(pool.size, 2)
+            self.assertEqual(pool.idle_count, 2)
+
+        # close() disconnects idle sessions.
+        self.assertTrue(all(s.disconnects == 1 for s in self.sessions))
+
+    def test_checkout_replaces_invalid_session(self):
+
+        pool = SessionPool(self.new_session, max_size=1)
+        session = pool.checkout()
+        pool.checkin(session)
+
+        session.alive = False
+        replacement = pool.checkout()
+
+        self.assertIsNot(replacement, session)
+        self.assertEqual(session.disconnects, 1)
+        self.assertEqual(pool.size, 1)
+
+    def test_checkout_timeout(self):
+
+        pool = SessionPool(self.new_session, max_size=1)
+        pool.checkout()
+
+        with self.assertRaises(PoolTimeoutError):
+            pool.checkout(timeout=0.01)
+
+    def test_checkout_waits_for_checkin(self):
+
+        pool = SessionPool(self.new_session, max_size=1)
+        session = pool.checkout()
+
+        timer = threading.Timer(0.02, pool.checkin, args=(session,))
+        timer.start()
+        self.assertIs(pool.checkout(timeout=2.0), session)
+        timer.join()
+
+    def test_session_error_discards_session(self):
+
+        pool = SessionPool(self.new_session, max_size=1)
+
+        with self.assertRaises(RuntimeError):
+            with pool.session() as session:
+                raise RuntimeError('job failed')
+
+        self.assertEqual(session.disconnects, 1)
+        self.assertEqual(pool.size, 0)
+
+    def test_max_idle_eviction(self):
+
+        pool = SessionPool(self.new_session, max_size=2, max_idle=60)
+        session = pool.checkout()
+        pool.checkin(session)
+
+        with mock.patch('terminal_3270.pool.timer', return_value=10 ** 9):
+            self.assertEqual(pool.evict_expired(), 1)
+
+        self.assertEqual(session.disconnects, 1)
+        self.assertEqual(pool.size, 0)
+
+    def test_max_idle_keeps_min_size(self):
+
+        pool = SessionPool(self.new_session, min_size=1, max_size=2, max_idle=60)
+        pool.fill()
+
+        with mock.patch('terminal_3270.pool.timer', return_value=10 ** 9):
+            self.assertEqual(pool.evict_expired(), 0)
+
+    def test_max_lifetime_eviction_at_checkin(self):
+
+        pool = SessionPool(self.new_session, max_size=2, max_lifetime=60)
+        session = pool.checkout()
+
+        with mock.patch('terminal_3270.pool.timer', return_value=10 ** 9):
+            pool.checkin(session)
+
+        self.assertEqual(session.disconnects, 1)
+        self.assertEqual(pool.size, 0)
+
+    def test_eviction_refills_min_size(self):
+
+        pool = SessionPool(self.new_session, min_size=2, max_size=3, max_lifetime=60)
+        pool.fill()
+        session = pool.checkout()
+
+        # Every session expires; the pool connects new ones back up to min_size.
+        with mock.patch('terminal_3270.pool.timer', return_value=10 ** 9):
+            pool.checkin(session)
+            self.assertEqual(pool.evict_expired(), 1)
+
+        self.assertTrue(all(s.disconnects == 1 for s in self.sessions[:2]))
+        self.assertEqual(len(self.sessions), 4)
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.idle_count, 2)
+        pool.close()
+
+    def test_refill_failure_is_logged(self):
+
+        pool = SessionPool(self.new_session, min_size=1, max_size=1)
+        pool.fill()
+        session = pool.checkout()
+
+        pool.session_factory = mock.MagicMock(side_effect=IOError('no host'))
+        with self.assertLogs('terminal_3270.pool', level='WARNING'):
+            pool.checkin(session, discard=True)
+
+        self.assertEqual(pool.size, 0)
+
+    def test_connect_failure_releases_slot(self):
+
+        def broken_session():
+            session = FakeSession()
+            session.connect = mock.MagicMock(side_effect=IOError('no host'))
+            return session
+
+        pool = SessionPool(broken_session, max_size=1)
+        with self.assertRaises(IOError):
+            pool.checkout()
+        self.assertEqual(pool.size, 0)
+
+    def test_heartbeat_evicts_dead_idle_session(self):
+
+        heartbeat = mock.MagicMock(side_effect=lambda session: session.alive)
+        pool = SessionPool(self.new_session, min_size=2, max_size=2, heartbeat_interval=60, heartbeat=heartbeat)
+        pool.fill()
+
+        # Nothing is quiet long enough to beat yet.
+        self.assertEqual(pool.beat_idle(), 0)
+        self.assertFalse(heartbeat.called)
+
+        pool.heartbeat_interval = 0.0
+        self.sessions[0].alive = False
+        self.assertEqual(pool.beat_idle(), 1)
+
+        self.assertEqual(heartbeat.call_count, 2)
+        self.assertEqual(self.sessions[0].disconnects, 1)
+        self.assertEqual(self.sessions[1].disconnects, 0)
+
+        # A new session replaces the dead one, back to min_size.
+        self.assertEqual(len(self.sessions), 3)
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.idle_count, 2)
+        pool.close()
+
+    def test_heartbeat_thread_beats_idle_sessions(self):
+
+        beaten = threading.Event()
+
+        def heartbeat(session):
+            beaten.set()
+            return True
+
+        pool = SessionPool(self.new_session, min_size=1, heartbeat_interval=0.02, heartbeat=heartbeat)
+        pool.fill()
+        self.assertTrue(beaten.wait(1.0))
+
+        pool.close()
+        self.assertFalse(pool._heartbeat_thread.running)
+        self.assertEqual(self.sessions[0].disconnects, 1)
+
+    def test_checkin_unknown_session(self):
+
+        pool = SessionPool(self.new_session)
+        with self.assertRaises(PoolError):
+            pool.checkin(FakeSession())
+
+    def test_closed_pool(self):
+
+        pool = SessionPool(self.new_session)
+        pool.close()
+        with self.assertRaises(PoolClosedError):
+            pool.checkout()
+
+    def test_bad_parameters(self):
+
+        with self.assertRaisesRegex(TypeError, r'^"session_factory"'):
+            SessionPool('not_a_callable')
+
+        with self.assertRaisesRegex(ValueError, r'^"min_size"'):
+            SessionPool(self.new_session, min_size=3, max_size=2)
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+from terminal_3270.emulator import EmulatorPlus, aid_count
+from terminal_3270.ratelimit import FileTokenBucket, RateLimitError, TokenBucket, aid_limiter
+
+
+class TestTokenBucket(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=100.0, burst=3)
+
+        for n in range(3):
+            self.assertEqual(bucket.acquire(), 0.0)
+
+        # The 4th token comes 10 ms later.
+        self.assertGreater(bucket.acquire(), 0.005)
+
+    def test_timeout(self):
+        bucket = TokenBucket(rate=1.0, burst=1)
+        bucket.acquire()
+
+        with self.assertRaises(RateLimitError):
+            bucket.acquire(timeout=0.01)
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0.0)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1.0, burst=0)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1.0, burst=1).acquire(tokens=2)
+
+    def test_file_bucket_shared(self):
+        path = os.path.join(self.directory, 'host.aid-bucket')
+
+        # Two buckets on one file, e.g. in two processes, share the tokens.
+        first = FileTokenBucket(path, rate=1.0, burst=2)
+        second = FileTokenBucket(path, rate=1.0, burst=2)
+
+        first.acquire()
+        second.acquire()
+        with self.assertRaises(RateLimitError):
+            first.acquire(timeout=0.01)
+
+    def test_aid_limiter_per_host_and_region(self):
+        limiter = aid_limiter('fake.host.org', 'TST01', rate=10.0)
+
+        self.assertIs(aid_limiter('fake.host.org', 'TST01', rate=10.0), limiter)
+        self.assertIsNot(aid_limiter('fake.host.org', 'TST02', rate=10.0), limiter)
+
+        shared = aid_limiter('fake.host.org', 'TST01', rate=10.0, directory=self.directory)
+        self.assertIsInstance(shared, FileTokenBucket)
+        self.assertEqual(os.path.dirname(shared.path), self.directory)
+
+
+class TestEmulatorAIDLimiter(TestCase):
+
+    def setUp(self):
+        self.limiter = mock.MagicMock()
+        self.emulator = EmulatorPlus(app=mock.MagicMock(), aid_limiter=self.limiter)
+
+    def tearDown(self):
+        self.emulator.is_terminated = True
+
+    def test_aid_count(self):
+        self.assertEqual(aid_count(b'Enter'), 1)
+        self.assertEqual(aid_count(b'MoveCursor(1, 2) Key(U+0041) PF(3)'), 1)
+        self.assertEqual(aid_count(b'Clear() PA(2)'), 2)
+        self.assertEqual(aid_count(b'Ascii()'), 0)
+
+        # AID keys pressed with Key() count; text inside quoted arguments does not.
+        self.assertEqual(aid_count(b'Key(Enter) Key(PF12) Key(U+0041)'), 2)
+        self.assertEqual(aid_count(b'String("a)Enter") String("PF(3) \\"Clear\\"")'), 0)
+        self.assertEqual(aid_count(b'String("a)b") Enter'), 1)
+
+    def test_aid_keys_take_tokens(self):
+        with mock.patch('terminal_3270.emulator.Emulator.exec_command') as exec_command:
+            exec_command.return_value.data = [b' ' * 80] * 24
+            self.emulator.send_pf_key(2)
+            self.emulator.send_clear()
+            self.emulator.string_get(1, 1, 10)
+            self.emulator.key_entry('ABC')
+
+        self.assertEqual(self.limiter.acquire.call_count, 2)
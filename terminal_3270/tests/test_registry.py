@@ -0,0 +1,77 @@
+from unittest import TestCase
+
+from terminal_3270.emulator import EmulatorPlus, ScreenWaitError
+from terminal_3270.fakehost import FakeHost, FakeHostConfig, InProcessApp
+from terminal_3270.registry import ScreenMatch, ScreenRegistry
+from terminal_3270.screen import Screen
+
+SIGNON_LINES = [' ' * 80] * 24
+SIGNON_LINES[1] = ' ' * 22 + 'WFAC SECURITY SIGNON'.ljust(58)
+SIGNON_LINES[23] = ' DFS3650I  ALREADY SIGNED ON'.ljust(80)
+
+
+class TestScreenRegistry(TestCase):
+
+    def setUp(self):
+        self.registry = ScreenRegistry()
+        self.registry.register('rejected_acf2', [(2, 2, 'REJECTED')])
+        self.registry.register('rejected_racf', [(17, 2, 'REJECTED')])
+        self.registry.register('already_signed_on', [(2, 23, 'WFAC SECURITY SIGNON'), (24, 12, 'ALREADY SIGNED ON')])
+        self.registry.register('signon', [(2, 23, 'WFAC SECURITY SIGNON')], fields={'status': (24, 1, 80)})
+
+    def tearDown(self):
+        pass
+
+    def test_classify_first_registered_match_wins(self):
+        match = self.registry.classify(Screen(SIGNON_LINES))
+        self.assertEqual(match, ScreenMatch('already_signed_on', {}))
+
+    def test_classify_extracts_fields(self):
+        lines = list(SIGNON_LINES)
+        lines[23] = ' DFS3650I  SIGNON SUCCESSFUL'.ljust(80)
+
+        match = self.registry.classify(Screen(lines))
+        self.assertEqual(match.name, 'signon')
+        self.assertEqual(match.fields, {'status': 'DFS3650I  SIGNON SUCCESSFUL'})
+
+    def test_classify_no_match(self):
+        self.assertIsNone(self.registry.classify(Screen([' ' * 80] * 24)))
+
+    def test_compiled_index_is_cached(self):
+        index = self.registry.compile(80)
+        self.assertIs(self.registry.compile(80), index)
+
+        # Two anchor slices are shared by four screens.
+        self.assertEqual(len(index.slots), 3)
+
+        self.registry.register('other', [(1, 1, 'X')])
+        self.assertIsNot(self.registry.compile(80), index)
+        self.assertEqual(self.registry.names[-1], 'other')
+
+    def test_anchor_required(self):
+        with self.assertRaises(ValueError):
+            self.registry.register('empty', [])
+
+    def test_emulator_classify(self):
+        host = FakeHost(FakeHostConfig(mode='racf'))
+        emulator = EmulatorPlus(app=InProcessApp(host))
+        emulator.connect('fake.host.org')
+        host.show(host.signon_screen())
+
+        self.assertEqual(emulator.classify(self.registry).name, 'signon')
+        emulator.terminate()
+
+    def test_wait_for_any_registry(self):
+        host = FakeHost(FakeHostConfig(mode='racf'))
+        emulator = EmulatorPlus(app=InProcessApp(host))
+        emulator.connect('fake.host.org')
+        host.show(host.signon_screen())
+        host.status(' DFS3650I  ALREADY SIGNED ON')
+
+        # One read is classified against every registered screen; the matched name is the outcome.
+        (outcome, elapsed) = emulator.wait_for_any([('signon', self.registry)], time_limit=0.1)
+        self.assertEqual(outcome, 'already_signed_on')
+
+        with self.assertRaises(ScreenWaitError):
+            emulator.wait_for_any([('login', ScreenRegistry().register('ready', [(1, 2, 'READY')]))], time_limit=0.02)
+        emulator.terminate()
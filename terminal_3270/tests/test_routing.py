@@ -0,0 +1,197 @@
+from unittest import TestCase, mock
+
+from terminal_3270.emulator import EmulatorError, EmulatorPlus, ScreenWaitError
+from terminal_3270.fakehost import FakeHost, FakeHostConfig, InProcessApp
+from terminal_3270.ratelimit import TokenBucket
+from terminal_3270.routing import HostEndpoint, HostRouter, RoutingError
+from terminal_3270.sessions import LoginError, RACFSignOnSession, SignOnError
+
+
+class TestHostRouter(TestCase):
+
+    def setUp(self):
+        self.router = HostRouter([('mvs1', 2.0), 'mvs2'], eject_time=60.0)
+
+    def tearDown(self):
+        pass
+
+    def test_least_loaded_by_weight(self):
+        hosts = [self.router.acquire() for n in range(6)]
+
+        # mvs1 takes 2 sessions for each one on mvs2.
+        self.assertEqual(hosts.count('mvs1'), 4)
+        self.assertEqual(hosts.count('mvs2'), 2)
+
+        self.router.release('mvs1')
+        self.assertEqual(self.router.stats()['mvs1']['sessions'], 3)
+
+    def test_lowest_latency(self):
+        router = HostRouter(['mvs1', 'mvs2', 'mvs3'], strategy='latency', latency_decay=0.5)
+        router.record_latency('mvs1', 0.400)
+        router.record_latency('mvs2', 0.100)
+        router.record_latency('mvs2', 0.300)
+
+        # An unmeasured host is tried first, then the fastest.
+        self.assertEqual(router.acquire(), 'mvs3')
+        router.record_latency('mvs3', 0.500)
+        router.release('mvs3')
+        self.assertEqual(router.acquire(), 'mvs2')
+        self.assertAlmostEqual(router.stats()['mvs2']['latency'], 0.200)
+
+    def test_eject_failed_host(self):
+        self.assertEqual(self.router.acquire(), 'mvs1')
+        self.router.release('mvs1', failed=True)
+
+        self.assertTrue(self.router.stats()['mvs1']['ejected'])
+        self.assertEqual([self.router.acquire() for n in range(3)], ['mvs2'] * 3)
+
+        with self.assertRaises(RoutingError):
+            self.router.acquire(exclude=['mvs2'])
+
+        # A screen wait does not bring the host back, a successful connect does.
+        self.router.record_latency('mvs1', 0.100)
+        self.assertTrue(self.router.stats()['mvs1']['ejected'])
+        self.router.record_connect('mvs1')
+        self.assertEqual(self.router.acquire(), 'mvs1')
+
+    def test_aid_limiter_per_host(self):
+        router = HostRouter(['aid1.host.org', 'aid2.host.org'], aid_rate=5.0, aid_burst=2)
+
+        limiter = router.aid_limiter('aid1.host.org', 'TST01')
+        self.assertIs(router.aid_limiter('aid1.host.org', 'TST01'), limiter)
+        self.assertIsNot(router.aid_limiter('aid2.host.org', 'TST01'), limiter)
+        self.assertEqual((limiter.rate, limiter.burst), (5.0, 2))
+
+        self.assertIsNone(self.router.aid_limiter('mvs1', 'TST01'))
+
+    def test_eject_after_failures_in_a_row(self):
+        router = HostRouter(['mvs1'], eject_after=2)
+        router.acquire()
+        router.release('mvs1', failed=True)
+        self.assertEqual(router.acquire(), 'mvs1')
+        router.release('mvs1', failed=True)
+
+        with self.assertRaises(RoutingError):
+            router.acquire()
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            HostRouter([])
+        with self.assertRaises(ValueError):
+            HostRouter(['mvs1'], strategy='random')
+        with self.assertRaises(ValueError):
+            HostEndpoint('mvs1', weight=0.0)
+
+
+class TestRoutedSession(TestCase):
+
+    def setUp(self):
+        self.router = HostRouter(['down.host.org', 'fake.host.org'])
+
+    def tearDown(self):
+        pass
+
+    def new_session(self, router=None, emulator_options=None, **config):
+        app = InProcessApp(FakeHost(FakeHostConfig(mode='racf', **config)))
+        return RACFSignOnSession('USER0001', 'PASSWORD', 'TST01', 'SIGNUSER', 'SIGNPASS', None,
+                                 app=app, router=router or self.router, **(emulator_options or {}))
+
+    def test_failed_host_is_ejected(self):
+        connect = EmulatorPlus.connect
+
+        def connect_or_fail(emulator, host):
+            if host == 'down.host.org':
+                raise EmulatorError('host is down')
+            return connect(emulator, host)
+
+        with mock.patch.object(EmulatorPlus, 'connect', connect_or_fail):
+            with self.new_session() as session:
+                self.assertEqual(session.host_3270, 'fake.host.org')
+                self.assertEqual(self.router.stats()['fake.host.org']['sessions'], 1)
+
+        stats = self.router.stats()
+        self.assertTrue(stats['down.host.org']['ejected'])
+        self.assertEqual(stats['fake.host.org']['sessions'], 0)
+        self.assertIsNotNone(stats['fake.host.org']['latency'])
+
+    def test_login_failure_releases_host(self):
+        session = self.new_session(password='OTHERPWD')
+
+        with self.assertRaises(LoginError):
+            session.connect()
+
+        stats = self.router.stats()
+        self.assertEqual(stats['down.host.org']['sessions'], 0)
+        self.assertFalse(stats['down.host.org']['ejected'])
+        self.assertIsNone(session.term_emulator)
+
+    def test_signon_failure_releases_host(self):
+        session = self.new_session(signon_password='OTHERPWD')
+
+        with self.assertRaises(SignOnError):
+            session.connect()
+
+        self.assertEqual(self.router.stats()['down.host.org']['sessions'], 0)
+        self.assertIsNone(session.term_emulator)
+        self.assertIsNone(session.routed_host)
+
+    def test_every_host_failed(self):
+        def connect_fail(emulator, host):
+            raise EmulatorError('bad emulator option')
+
+        session = self.new_session()
+        with mock.patch.object(EmulatorPlus, 'connect', connect_fail):
+            with self.assertRaisesRegex(RoutingError, 'bad emulator option') as raised:
+                session.connect()
+
+        self.assertIsInstance(raised.exception.__cause__, EmulatorError)
+        self.assertIsNone(session.term_emulator)
+
+    def test_disconnect_releases_host(self):
+        session = self.new_session()
+        session.connect()
+        self.assertEqual(self.router.stats()['down.host.org']['sessions'], 1)
+
+        with mock.patch.object(session.term_emulator, 'terminate', side_effect=EmulatorError('terminate failed')):
+            with self.assertRaises(EmulatorError):
+                session.disconnect()
+
+        self.assertEqual(self.router.stats()['down.host.org']['sessions'], 0)
+        self.assertIsNone(session.term_emulator)
+
+    def test_session_takes_host_aid_limiter(self):
+        router = HostRouter(['fake.host.org'], aid_rate=100.0, aid_burst=5)
+        shared = TokenBucket(100.0, 5)
+
+        with self.new_session(router=router, emulator_options={'aid_limiter': shared}) as session:
+            self.assertIs(session.term_emulator.aid_limiter, router.aid_limiter('fake.host.org', 'TST01'))
+
+        with self.new_session() as session:
+            self.assertIsNone(session.term_emulator.aid_limiter)
+
+    def test_latency_from_screen_waits(self):
+        session = self.new_session()
+
+        with mock.patch.object(self.router, 'record_latency', wraps=self.router.record_latency) as record:
+            session.connect()
+            self.assertTrue(record.called)
+            self.assertEqual(set(c[0][0] for c in record.call_args_list), {'down.host.org'})
+
+            # Each found screen reports its own wait time, not the connect and login time.
+            record.reset_mock()
+            screen = session.term_emulator.snapshot()
+            row_loc = next(r for r in range(1, 25) if screen.row(r).strip())
+            text = screen.row(row_loc)
+            col_loc = len(text) - len(text.lstrip()) + 1
+            session.term_emulator.wait_for_screen(text.strip()[:4], row_loc, col_loc, time_limit=0.5)
+            (host, seconds) = record.call_args[0]
+            self.assertEqual(host, 'down.host.org')
+            self.assertLess(seconds, 0.5)
+
+            # A wait that finds nothing is not a latency.
+            record.reset_mock()
+            with self.assertRaises(ScreenWaitError):
+                session.term_emulator.wait_for_screen('NOT THERE', 1, 1, time_limit=0.05)
+            self.assertFalse(record.called)
+
+        session.disconnect()
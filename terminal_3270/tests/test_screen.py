@@ -0,0 +1,118 @@
+import pickle
+from unittest import TestCase
+
+from terminal_3270.screen import Screen, ScreenChange
+
+SCREEN_LINES = [
+    'WFAC SECURITY SIGNON',
+    '  USER:    SIGNUSER ',
+    'SIGNON SUCCESSFUL   ',
+]
+
+
+class TestScreen(TestCase):
+
+    def setUp(self):
+        self.screen = Screen(SCREEN_LINES)
+
+    def tearDown(self):
+        pass
+
+    def test_dimensions(self):
+        self.assertEqual(self.screen.rows, 3)
+        self.assertEqual(self.screen.cols, 20)
+
+    def test_row(self):
+        self.assertEqual(self.screen.row(3), 'SIGNON SUCCESSFUL   ')
+
+    def test_region(self):
+        self.assertEqual(self.screen.region(2, 12, 8), 'SIGNUSER')
+
+    def test_region_wraps_rows(self):
+        self.assertEqual(self.screen.region(1, 15, 8), 'SIGNON  ')
+
+    def test_found(self):
+        self.assertTrue(self.screen.found(1, 6, 'SECURITY'))
+        self.assertFalse(self.screen.found(1, 5, 'SECURITY'))
+
+    def test_find(self):
+        self.assertEqual(self.screen.find('SUCCESSFUL'), (3, 8))
+        self.assertIsNone(self.screen.find('REJECTED'))
+        self.assertIn('SIGNUSER', self.screen)
+
+    def test_equality(self):
+        self.assertEqual(self.screen, Screen(list(SCREEN_LINES)))
+        self.assertNotEqual(self.screen, Screen(SCREEN_LINES[:2]))
+        self.assertEqual(hash(self.screen), hash(Screen(list(SCREEN_LINES))))
+
+    def test_from_buffer_views(self):
+        buffer = ''.join(SCREEN_LINES).encode('latin-1')
+        attributes = bytes(range(len(buffer)))
+        screen = Screen.from_buffer(buffer, 20, attributes=attributes)
+
+        self.assertEqual(screen, self.screen)
+        self.assertEqual(screen.rows, 3)
+
+        view = screen.row_view(2)
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(view.tobytes(), b'  USER:    SIGNUSER ')
+        self.assertEqual(screen.region_view(2, 12, 8), b'SIGNUSER')
+        self.assertEqual(screen.attribute(2, 1), 20)
+        self.assertIsNone(self.screen.attribute(2, 1))
+
+        with self.assertRaises(ValueError):
+            Screen.from_buffer(buffer[:-1], 20)
+        with self.assertRaises(ValueError):
+            Screen.from_buffer(buffer, 20, attributes=b'\x00')
+
+    def test_bytes_lines_decode_lazily(self):
+        screen = Screen([line.encode('latin-1') for line in SCREEN_LINES])
+
+        self.assertEqual(screen.buffer, ''.join(SCREEN_LINES).encode('latin-1'))
+        self.assertEqual(screen.lines, tuple(SCREEN_LINES))
+        self.assertEqual(screen.text, ''.join(SCREEN_LINES))
+        self.assertEqual(str(screen), '\n'.join(SCREEN_LINES))
+
+    def test_compact_and_picklable(self):
+        self.assertFalse(hasattr(self.screen, '__dict__'))
+
+        copy = pickle.loads(pickle.dumps(self.screen))
+        self.assertEqual(copy, self.screen)
+        self.assertEqual(copy.row(1), SCREEN_LINES[0])
+
+    def test_off_screen(self):
+        for read in (lambda: self.screen.row(0), lambda: self.screen.row(4),
+                     lambda: self.screen.region(4, 1, 5), lambda: self.screen.region(1, 21, 5),
+                     lambda: self.screen.found(0, 1, 'W'), lambda: self.screen.row_view(4)):
+            with self.assertRaises(IndexError):
+                read()
+
+        # The cached lines answer the same way.
+        self.assertEqual(len(self.screen.lines), 3)
+        with self.assertRaises(IndexError):
+            self.screen.row(0)
+
+        # A region stops at the end of the screen.
+        self.assertEqual(self.screen.region(3, 18, 5), '   ')
+
+    def test_text_outside_latin_1(self):
+        self.assertFalse(self.screen.found(1, 1, '€'))
+        self.assertIsNone(self.screen.find('€'))
+
+    def test_diff(self):
+        after = Screen([
+            'WFAC SECURITY SIGNON',
+            '  USER:    OTHERUSR ',
+            'SIGNON REJECTED     ',
+        ])
+
+        self.assertEqual(after.changed_rows(self.screen), [2, 3])
+        self.assertEqual(after.diff(self.screen), [
+            ScreenChange(2, 12, 7),
+            ScreenChange(3, 8, 10),
+        ])
+        self.assertEqual(self.screen.diff(Screen(SCREEN_LINES)), [])
+
+    def test_diff_other_size(self):
+        with self.assertRaises(ValueError):
+            self.screen.diff(Screen(SCREEN_LINES[:2]))
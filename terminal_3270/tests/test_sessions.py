@@ -1,10 +1,12 @@
 from unittest import TestCase, mock
 
+from terminal_3270.screen import Screen
 from terminal_3270.sessions import (
     LoginError,
     SignOnError,
     Session3270,
-    SignOnSession
+    SignOnSession,
+    TIMEOUT_SIGNON_SCREEN
 )
 
 # Session: dummy parameters
@@ -72,6 +74,19 @@ class TestSession3270(TestCase):
                     self.assertTrue(mock_sess3270_connect.called)
                     self.assertIsInstance(session, Session3270)
 
+    def test_is_alive(self):
+
+        with mock.patch('terminal_3270.sessions.Emulator') as mock_emulator:
+            session = Session3270(test_user, test_passwd, test_app_id, test_host)
+            self.assertFalse(session.is_alive())
+
+            session.term_emulator = mock_emulator()
+            session.term_emulator.is_connected.return_value = True
+            self.assertTrue(session.is_alive())
+
+            session.term_emulator.is_connected.side_effect = IOError('broken pipe')
+            self.assertFalse(session.is_alive())
+
 # =============================================================================
 
 
@@ -130,6 +145,7 @@ class TestSignOnSession(TestCase):
                 session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host)
 
                 session.term_emulator = mock_emulator()
+                session.term_emulator.wait_for_any.return_value = ('passed', 0.010)
                 session.term_emulator.status_bar = mock.MagicMock(return_value=(True, 'GOT SIGNON SUCCESSFUL'))
 
                 session.login()
@@ -138,14 +154,16 @@ class TestSignOnSession(TestCase):
                 # SIGNON Call
                 session.term_emulator.format_screen.assert_called_with(SignOnSession.signon_screen_name)
 
-                # SIGNON USER @(*, *)
+                # SIGNON USER @(*, *), then SIGNON PASSWORD @(*, *)
                 session.term_emulator.wait_for_field.assert_called_with()
-                session.term_emulator.key_entry.mock_calls[0].assert_called_with(session.signon_username)
-
-                # SIGNON PASSWORD @(*, *)
-                session.term_emulator.key_entry.mock_calls[0].assert_called_with(session.signon_password)
+                session.term_emulator.key_sequence.assert_called_once_with(session.signon_username, session.signon_password)
                 session.term_emulator.send_enter.assert_called_with()
 
+                # Wait for the status bar, no longer than TIMEOUT_SIGNON_SCREEN.
+                (conditions, ) = session.term_emulator.wait_for_any.call_args[0]
+                self.assertEqual([name for (name, condition) in conditions], ['passed', 'changed'])
+                self.assertEqual(session.term_emulator.wait_for_any.call_args[1], {'time_limit': TIMEOUT_SIGNON_SCREEN})
+
     # mock login() assumes success
     @mock.patch('terminal_3270.sessions.Session3270.login', mock.MagicMock(return_value=True))
     def test_signon_already_in_effect(self):
@@ -156,6 +174,7 @@ class TestSignOnSession(TestCase):
                 session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host)
 
                 session.term_emulator = mock_emulator()
+                session.term_emulator.wait_for_any.return_value = ('passed', 0.010)
                 session.term_emulator.status_bar = mock.MagicMock(return_value=(True, 'GOT ALREADY SIGNED ON'))
 
                 session.login()
@@ -173,10 +192,41 @@ class TestSignOnSession(TestCase):
                         session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host)
 
                         session.term_emulator = mock_emulator()
+                        session.term_emulator.wait_for_any.return_value = ('changed', 0.010)
                         session.term_emulator.status_bar = mock.MagicMock(return_value=(False, 'INVALID SIGNON OR NEARLY ANYTHING ELSE'))
 
                         session.connect()  # Calls SignOnSession.signon() and tests outcome.
 
+    def test_wait_for_status_conditions(self):
+        " A blank status is not a new status, and passing strings ignore case "
+
+        with mock.patch('terminal_3270.sessions.Emulator') as mock_emulator:
+            session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host)
+            session.term_emulator = mock_emulator()
+            session.term_emulator.wait_for_any.return_value = ('changed', 0.010)
+
+            def screen(status_text, header=SignOnSession.signon_screen_str):
+                lines = [' ' * 80] * 24
+                lines[1] = (' ' * 22 + header).ljust(80)
+                lines[23] = status_text.ljust(80)
+                return Screen(lines)
+
+            before = screen(' DFS3650I  SIGNOFF SUCCESSFUL')
+            self.assertEqual(session.wait_for_status(before, ['signon successful']), 'changed')
+            session.term_emulator.wait_until_stable.assert_called_with(time_limit=TIMEOUT_SIGNON_SCREEN)
+
+            (conditions, ) = session.term_emulator.wait_for_any.call_args[0]
+            (passed, changed) = [condition for (name, condition) in conditions]
+
+            self.assertTrue(passed(screen(' DFS3650I  SIGNON SUCCESSFUL')))
+            self.assertFalse(changed(screen(' ' * 80)))
+            self.assertFalse(changed(before))
+            self.assertTrue(changed(screen(' DFS3650I  INVALID SIGNON')))
+
+            # Off the SIGNON screen, the status row is the status.
+            self.assertTrue(passed(screen(' DFS3650I  SIGNON SUCCESSFUL', header='OTHER SCREEN')))
+            self.assertEqual(session.signon_screens.classify(before).fields['status'], 'DFS3650I  SIGNOFF SUCCESSFUL')
+
     # =========================================================================
     # SIGN-OFF Tests
     # =========================================================================
@@ -191,6 +241,7 @@ class TestSignOnSession(TestCase):
                 session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host)
 
                 session.term_emulator = mock_emulator()
+                session.term_emulator.wait_for_any.return_value = ('passed', 0.010)
                 session.term_emulator.status_bar = mock.MagicMock(return_value=(True, 'GOT SIGNOFF SUCCESSFUL'))
 
                 session.signoff()
@@ -214,6 +265,96 @@ class TestSignOnSession(TestCase):
                 session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd, test_host)
 
                 session.term_emulator = mock_emulator()
+                session.term_emulator.wait_for_any.return_value = ('passed', 0.010)
                 session.term_emulator.status_bar = mock.MagicMock(return_value=(False, 'GOT BAD SIGNOFF STATUS'))
 
                 session.signoff()
+
+    # =========================================================================
+    # Persistent SIGN-ON Tests
+    # =========================================================================
+
+    # mock login() assumes success
+    @mock.patch('terminal_3270.sessions.Session3270.login', mock.MagicMock(return_value=True))
+    def test_persistent_signon_reused(self):
+        " Back-to-back blocks keep the SIGNON until disconnect() "
+
+        with mock.patch('terminal_3270.sessions.SignOnSession.signon', return_value=(True, 'FAKE STATUS BAR')) as signon:
+            with mock.patch('terminal_3270.sessions.SignOnSession.signoff', return_value=(True, 'FAKE STATUS BAR')) as signoff:
+                with mock.patch('terminal_3270.sessions.Emulator') as mock_emulator:
+                    session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd,
+                                            test_host, persistent_signon=True)
+                    mock_emulator.return_value.snapshot.return_value.row.return_value = ' SSC725I  FIND SUCCESSFUL'
+
+                    for job in range(3):
+                        with session:
+                            self.assertEqual(session.signed_on_user, test_signon_user)
+
+                    self.assertEqual(signon.call_count, 1)
+                    self.assertEqual(mock_emulator.call_count, 1)
+                    self.assertFalse(signoff.called)
+
+                    session.disconnect()
+                    self.assertEqual(signoff.call_count, 1)
+                    self.assertIsNone(session.signed_on_user)
+
+    # mock login() assumes success
+    @mock.patch('terminal_3270.sessions.Session3270.login', mock.MagicMock(return_value=True))
+    def test_persistent_signon_lapsed(self):
+        " A lapsed SIGNON is entered again, without a SIGNOFF "
+
+        with mock.patch('terminal_3270.sessions.SignOnSession.signon', return_value=(True, 'FAKE STATUS BAR')) as signon:
+            with mock.patch('terminal_3270.sessions.SignOnSession.signoff', return_value=(True, 'FAKE STATUS BAR')) as signoff:
+                with mock.patch('terminal_3270.sessions.Emulator') as mock_emulator:
+                    session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd,
+                                            test_host, persistent_signon=True)
+                    session.connect()
+
+                    status_row = mock_emulator.return_value.snapshot.return_value.row
+                    status_row.return_value = ' DFS3649I  SIGNON REQUIRED'
+                    self.assertTrue(session.signon_lapsed())
+                    status_row.assert_called_with(SignOnSession.signon_status_row)
+
+                    with session:
+                        pass
+
+                    self.assertEqual(signon.call_count, 2)
+                    self.assertFalse(signoff.called)
+
+    # mock login() assumes success
+    @mock.patch('terminal_3270.sessions.Session3270.login', mock.MagicMock(return_value=True))
+    def test_switch_signon_user(self):
+        " A new SIGNON user signs off the old one first "
+
+        with mock.patch('terminal_3270.sessions.SignOnSession.signon', return_value=(True, 'FAKE STATUS BAR')) as signon:
+            with mock.patch('terminal_3270.sessions.SignOnSession.signoff', return_value=(True, 'FAKE STATUS BAR')) as signoff:
+                with mock.patch('terminal_3270.sessions.Emulator') as mock_emulator:
+                    session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd,
+                                            test_host, persistent_signon=True)
+                    mock_emulator.return_value.snapshot.return_value.row.return_value = ' DFS3650I  SIGNON SUCCESSFUL'
+                    session.connect()
+
+                    session.switch_signon_user(test_signon_user, test_signon_passwd)
+                    self.assertEqual(signon.call_count, 1)
+
+                    session.switch_signon_user('other_user', 'other_password')
+                    self.assertEqual(signoff.call_count, 1)
+                    self.assertEqual(signon.call_count, 2)
+                    self.assertEqual(session.signed_on_user, 'other_user')
+
+    # mock login() assumes success
+    @mock.patch('terminal_3270.sessions.Session3270.login', mock.MagicMock(return_value=True))
+    def test_disconnect_without_signon(self):
+        " No SIGNOFF when the SIGNON never succeeded "
+
+        with mock.patch('terminal_3270.sessions.SignOnSession.signon', return_value=(False, 'INVALID SIGNON')):
+            with mock.patch('terminal_3270.sessions.SignOnSession.signoff') as signoff:
+                with mock.patch('terminal_3270.sessions.Emulator'):
+                    session = SignOnSession(test_user, test_passwd, test_app_id, test_signon_user, test_signon_passwd,
+                                            test_host)
+                    with self.assertRaises(SignOnError):
+                        session.connect()
+
+                    session.disconnect()
+                    self.assertFalse(signoff.called)
+                    self.assertIsNone(session.term_emulator)
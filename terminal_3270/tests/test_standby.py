@@ -0,0 +1,126 @@
+import time
+from unittest import TestCase, mock
+
+from terminal_3270.emulator import EmulatorPlus
+from terminal_3270.fakehost import FakeHost, FakeHostConfig, InProcessApp
+from terminal_3270.metrics import CommandMetrics
+from terminal_3270.sessions import RACFLoginSession
+from terminal_3270.standby import EmulatorStandby
+
+# Session3270: dummy parameters
+test_user = 'USER0001'
+test_passwd = 'PASSWORD'
+test_app_id = 'TST01'
+test_host = 'fake.host.org'
+
+
+class TestEmulatorStandby(TestCase):
+
+    def setUp(self):
+        self.emulators = []
+
+    def tearDown(self):
+        pass
+
+    def new_emulator(self):
+        emulator = EmulatorPlus(app=InProcessApp(FakeHost(FakeHostConfig(mode='racf'))))
+        self.emulators.append(emulator)
+        return emulator
+
+    def wait_ready(self, standby, count):
+        deadline = time.time() + 1.0
+        while standby.ready_count < count and time.time() < deadline:
+            time.sleep(0.005)
+        return standby.ready_count
+
+    def test_fill_and_take_connected(self):
+        standby = EmulatorStandby(size=2, host_3270=test_host, emulator_factory=self.new_emulator)
+        standby.fill()
+        self.assertEqual(standby.ready_count, 2)
+
+        emulator = standby.take(test_host)
+        self.assertIs(emulator, self.emulators[0])
+        self.assertTrue(emulator.string_found(1, 2, 'RACF - SELECT APPLICATION'))
+        self.assertEqual(standby.hits, 1)
+
+        # Connected emulators only serve their own host.
+        self.assertIsNone(standby.take('other.host.org'))
+
+        standby.close()
+        self.assertEqual(standby.ready_count, 0)
+        self.assertTrue(self.emulators[1].is_terminated)
+        self.assertFalse(emulator.is_terminated)
+
+    def test_take_empty(self):
+        standby = EmulatorStandby(size=1, emulator_factory=self.new_emulator)
+        self.assertIsNone(standby.take(test_host))
+        self.assertEqual(standby.misses, 1)
+
+    def test_background_refill(self):
+        with EmulatorStandby(size=2, host_3270=test_host, emulator_factory=self.new_emulator) as standby:
+            self.assertEqual(self.wait_ready(standby, 2), 2)
+
+            standby.take(test_host)
+            self.assertEqual(self.wait_ready(standby, 2), 2)
+            self.assertEqual(len(self.emulators), 3)
+
+    def test_max_age(self):
+        standby = EmulatorStandby(size=1, host_3270=test_host, max_age=0.0, emulator_factory=self.new_emulator)
+        standby.fill()
+
+        self.assertIsNone(standby.take(test_host))
+        self.assertTrue(self.emulators[0].is_terminated)
+
+    def test_take_drops_disconnected_emulator(self):
+        standby = EmulatorStandby(size=1, host_3270=test_host, emulator_factory=self.new_emulator)
+        standby.fill()
+        self.emulators[0].exec_command(b'Disconnect')
+
+        self.assertIsNone(standby.take(test_host))
+        self.assertTrue(self.emulators[0].is_terminated)
+
+    def test_session_uses_connected_standby(self):
+        standby = EmulatorStandby(size=1, host_3270=test_host, emulator_factory=self.new_emulator)
+        standby.fill()
+
+        session = RACFLoginSession(test_user, test_passwd, test_app_id, test_host, standby=standby)
+        with mock.patch.object(EmulatorPlus, 'connect') as connect:
+            session.connect()
+
+        self.assertIs(session.term_emulator, self.emulators[0])
+        self.assertFalse(connect.called)
+        session.disconnect()
+        standby.close()
+
+    def test_session_with_other_options_connects_fresh(self):
+        metrics = CommandMetrics()
+        standby = EmulatorStandby(size=1, host_3270=test_host, emulator_factory=self.new_emulator)
+        standby.fill()
+
+        # The standby emulator has no metrics, so the session connects its own emulator.
+        app = InProcessApp(FakeHost(FakeHostConfig(mode='racf')))
+        session = RACFLoginSession(test_user, test_passwd, test_app_id, test_host, standby=standby,
+                                   app=app, metrics=metrics)
+        with self.assertLogs('terminal_3270.standby', level='WARNING'):
+            session.connect()
+
+        self.assertIsNot(session.term_emulator, self.emulators[0])
+        self.assertIs(session.term_emulator.metrics, metrics)
+        self.assertEqual((standby.ready_count, standby.misses), (1, 1))
+        session.disconnect()
+
+        # A standby made with the same options serves the session.
+        standby.close()
+        standby = EmulatorStandby(size=1, host_3270=test_host, emulator_factory=self.new_emulator,
+                                  app=app, metrics=metrics)
+        standby.fill()
+        session = RACFLoginSession(test_user, test_passwd, test_app_id, test_host, standby=standby,
+                                   app=app, metrics=metrics)
+        session.connect()
+        self.assertIs(session.term_emulator, self.emulators[1])
+        session.disconnect()
+        standby.close()
+
+    def test_bad_size(self):
+        with self.assertRaises(ValueError):
+            EmulatorStandby(size=0)
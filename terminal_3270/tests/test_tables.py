@@ -1,6 +1,7 @@
 from unittest import TestCase  # , mock
 
-from terminal_3270.tables import ScreenTable
+from terminal_3270.screen import Screen
+from terminal_3270.tables import Column, RowSchema, ScreenTable
 
 
 LAST_SCREEN = """ COMMAND                WFAC: ORDER - CWL INFORMATION (OSSCWL)     /FOR
@@ -95,3 +96,123 @@ class TestScreenTable(TestCase):
         self.assertEqual(len(results), 4)
         for idx, line in enumerate(self.emulator.lines[10:(10 + 4)]):
             self.assertEqual(results[idx], line.strip().split())
+
+    def test_fetch_results_last_page_row_schema(self):
+        " Fetch results from the last screen with a compiled RowSchema "
+
+        schema = RowSchema([
+            Column('loc', 8, 11),
+            Column('cwl', 20, 4),
+            Column('end', 25, 4),
+            Column('s', 78, 1),
+            Column('t', 80, 1),
+        ], row_type='dict')
+
+        screen_table = ScreenTable(self.emulator, self.top_row, self.bottom_row, status_row=24, status_end='LAST PAGE', row_processor=schema)
+        results = [r for r in screen_table.fetch_results()]
+
+        # Blank columns keep their place.
+        self.assertEqual(results, [
+            {'loc': 'HUGOOKEE0AW', 'cwl': '1', 'end': 'A', 's': 'F', 't': 'N'},
+            {'loc': 'HUGOOKMA', 'cwl': '', 'end': '', 's': 'F', 't': 'N'},
+            {'loc': 'HUGOOKMA', 'cwl': 'AEQP', 'end': '', 's': 'F', 't': 'N'},
+            {'loc': 'HUGOOKMA', 'cwl': 'AFRM', 'end': '', 's': 'F', 't': 'N'},
+        ])
+
+    def test_fetch_results_incremental(self):
+        " Only changed rows are parsed again on the next page "
+
+        emulator = PagedMockEmulator([
+            ['GROUP A', 'ROW 1', 'ROW 2'],
+            ['GROUP A', 'ROW 3', 'ROW 2'],
+        ])
+        screen_table = ScreenTable(emulator, 1, 3, row_processor=row_parser, incremental=True)
+        results = list(screen_table.fetch_results())
+
+        self.assertEqual(results, [
+            'PARSED:GROUP A', 'PARSED:ROW 1', 'PARSED:ROW 2',
+            'PARSED:GROUP A', 'PARSED:ROW 3', 'PARSED:ROW 2',
+        ])
+        self.assertEqual(screen_table.parsed_rows, 4)
+
+    def test_fetch_results_snapshot_width(self):
+        " Any emulator with snapshots reads one screen; rows are `width` columns wide "
+
+        emulator = SnapshotMockEmulator(['ROW {}'.format(n).ljust(130) + 'XY' for n in range(1, 4)] + [' ' * 132] * 24)
+
+        results = list(ScreenTable(emulator, 1, 10, row_processor=row_parser).fetch_results())
+        self.assertEqual(results, ['PARSED:' + 'ROW {}'.format(n).ljust(80) for n in range(1, 4)])
+
+        results = list(ScreenTable(emulator, 1, 10, width=132).fetch_results())
+        self.assertEqual(results[0], ['ROW', '1', 'XY'])
+        self.assertEqual(emulator.snapshots, 2)
+
+# =============================================================================
+
+
+class SnapshotMockEmulator(MockEmulator):
+    """ Mock Emulator with Screen Snapshots """
+
+    def __init__(self, lines):
+        self.screen = Screen(lines)
+        self.snapshots = 0
+
+    def snapshot(self):
+        self.snapshots += 1
+        return self.screen
+
+    def string_get(self, row, col, length):
+        raise AssertionError('rows are read from the snapshot')
+
+
+class PagedMockEmulator(object):
+    """ Mock Emulator with PF2 Pages """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page = 0
+
+    def status_bar(self, passing_strings=[], terminator_strings=[], status_row=24):
+        if passing_strings:
+            return (True, 'FIND SUCCESSFUL')
+        more_pages = (self.page + 1) < len(self.pages)
+        return (more_pages, 'MORE PAGES' if more_pages else 'LAST PAGE')
+
+    def send_pf_key(self, number):
+        self.page += 1
+
+    def string_get(self, row, col, length):
+        lines = self.pages[self.page]
+        return lines[row - 1] if row <= len(lines) else ''
+
+
+class TestRowSchema(TestCase):
+
+    def setUp(self):
+        self.lines = LAST_SCREEN.split('\n')[10:]
+        self.columns = [('loc', 8, 11), ('end', 20, 4)]
+
+    def tearDown(self):
+        pass
+
+    def test_tuple_rows(self):
+        schema = RowSchema(self.columns)
+        self.assertEqual(schema(self.lines[2]), ('HUGOOKMA', 'AEQP'))
+
+    def test_namedtuple_rows(self):
+        schema = RowSchema(self.columns, row_type='namedtuple')
+        row = schema(self.lines[3])
+        self.assertEqual((row.loc, row.end), ('HUGOOKMA', 'AFRM'))
+
+    def test_typed_columns(self):
+        schema = RowSchema([('loc', 8, 11), ('cwl', 20, 4, int)])
+        self.assertEqual(schema(self.lines[0]), ('HUGOOKEE0AW', 1))
+        self.assertEqual(schema(self.lines[1]), ('HUGOOKMA', None))  # blank int column
+
+    def test_parse_page_stops_at_blank_line(self):
+        schema = RowSchema(self.columns)
+        self.assertEqual(len(schema.parse_page(self.lines)), 4)
+
+    def test_bad_row_type(self):
+        with self.assertRaisesRegex(ValueError, r'^"row_type"'):
+            RowSchema(self.columns, row_type='set')
@@ -0,0 +1,107 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+from terminal_3270.emulator import EmulatorPlus
+from terminal_3270.fakehost import FakeHost, FakeHostConfig, InProcessApp
+from terminal_3270.sessions import RACFSignOnSession
+from terminal_3270.tables import ScreenTable
+from terminal_3270.transcript import (
+    ReplayApp,
+    TranscriptError,
+    TranscriptMismatchError,
+    command_counts,
+    diff_command_counts,
+    read_transcript
+)
+
+
+def run_session(**emulator_options):
+    """ Run a RACF signon session and fetch a results table. """
+
+    session = RACFSignOnSession('USER0001', 'PASSWORD', 'TST01', 'SIGNUSER', 'SIGNPASS', 'fake.host.org',
+                                **emulator_options)
+    with session:
+        session.term_emulator.format_screen('OSSCWL')
+        session.term_emulator.screen_command('FIND ORD1')
+        return [r for r in ScreenTable(session.term_emulator, 11, 23).fetch_results()]
+
+
+class TestTranscript(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'session.transcript')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def record(self, path=None, results=20):
+        app = InProcessApp(FakeHost(FakeHostConfig(mode='racf', results=results)))
+        return run_session(app=app, record_to=(path or self.path))
+
+    def test_record_and_replay(self):
+        recorded_rows = self.record()
+        replay_app = ReplayApp(self.path)
+
+        self.assertEqual(run_session(app=replay_app), recorded_rows)
+        self.assertEqual(replay_app.remaining, 0)
+
+    def test_transcript_records(self):
+        self.record()
+        records = read_transcript(self.path)
+
+        self.assertEqual(records[0]['cmd'], 'Connect(fake.host.org)')
+        self.assertEqual(records[-1]['cmd'], 'Quit')
+        self.assertTrue(all(record['dt'] >= 0.0 for record in records))
+        self.assertEqual(records[0]['lines'][-1].strip(), 'ok')
+
+    def test_transcript_is_append_only(self):
+        self.record()
+        first_count = len(read_transcript(self.path))
+        self.record()
+        self.assertEqual(len(read_transcript(self.path)), 2 * first_count)
+
+    def test_replay_mismatch(self):
+        self.record()
+        emulator = EmulatorPlus(app=ReplayApp(self.path))
+
+        with self.assertRaisesRegex(TranscriptMismatchError, r'^command 1 is "Enter"'):
+            emulator.send_enter()
+
+        emulator.is_terminated = True
+
+    def test_replay_past_end(self):
+        emulator = EmulatorPlus(app=ReplayApp([]))
+
+        with self.assertRaises(TranscriptError):
+            emulator.send_enter()
+
+        emulator.is_terminated = True
+
+    def test_replay_timing(self):
+        mock_sleep = mock.MagicMock()
+        records = [{'cmd': 'Enter', 'dt': 0.25, 'lines': ['U F U C(h) I 2 24 80 0 0 0x0 -\n', 'ok\n']}]
+        emulator = EmulatorPlus(app=ReplayApp(records, timing=True, sleep=mock_sleep))
+
+        emulator.send_enter()
+        mock_sleep.assert_called_once_with(0.25)
+
+        emulator.is_terminated = True
+
+    def test_diff_command_counts(self):
+        self.record(results=13)
+        more_pages = os.path.join(self.tmp_dir, 'more_pages.transcript')
+        self.record(path=more_pages, results=30)
+
+        self.assertEqual(command_counts(self.path)['Connect'], 1)
+        self.assertEqual(diff_command_counts(self.path, more_pages), {
+            'PF': (0, 2),
+            'Ascii': (command_counts(self.path)['Ascii'], command_counts(self.path)['Ascii'] + 2),
+        })
+
+    def test_read_open_file(self):
+        transcript = io.StringIO('{"transcript":1}\n{"cmd":"Enter","lines":[],"dt":0.1}\n')
+        self.assertEqual(len(read_transcript(transcript)), 1)
@@ -60,3 +60,58 @@ class TestWaitUntil(TestCase):
 
         with self.assertRaisesRegex(ValueError, r'^"time_limit"'):
             WaitUntil(-120.1, int, *('38'))
+
+    def test_wait_until_counts_probes(self):
+
+        mock_event = mock.MagicMock()
+        mock_event.found_routine.side_effect = [False, False, True]
+
+        wu_runner = WaitUntil(0.725, mock_event.found_routine)
+        wu_runner.poll(interval=0.001)
+
+        self.assertEqual(wu_runner.probes, 3)
+        self.assertTrue(wu_runner.found)
+
+    def test_wait_until_sleeps_with_backoff(self):
+
+        mock_event = mock.MagicMock()
+        mock_event.found_routine.side_effect = [False, False, False, False, True]
+
+        with mock.patch('terminal_3270.wait_until.sleep') as mock_sleep:
+            wu_runner = WaitUntil(10.0, mock_event.found_routine)
+            wu_runner.poll(interval=0.01, backoff=2.0, max_interval=0.03, jitter=0.0)
+
+        self.assertEqual(mock_sleep.mock_calls, [
+            mock.call(0.01),
+            mock.call(0.02),
+            mock.call(0.03),  # capped at max_interval
+            mock.call(0.03),
+        ])
+        self.assertEqual(wu_runner.probes, 5)
+
+    def test_wait_until_sleep_never_passes_time_limit(self):
+
+        mock_event = mock.MagicMock()
+        mock_event.found_routine.side_effect = generate_false()
+
+        time_limit = 0.030
+
+        wu_runner = WaitUntil(time_limit, mock_event.found_routine)
+        wu_runner.poll(interval=1.0, jitter=0.0)
+
+        self.assertFalse(wu_runner.found)
+        self.assertTrue(wu_runner.expired)
+        self.assertTrue(wu_runner.elapsed < 0.5)
+        self.assertEqual(wu_runner.probes, 2)
+
+    def test_wait_until_without_interval_busy_polls(self):
+
+        mock_event = mock.MagicMock()
+        mock_event.found_routine.side_effect = [False, True]
+
+        with mock.patch('terminal_3270.wait_until.sleep') as mock_sleep:
+            wu_runner = WaitUntil(0.5, mock_event.found_routine)
+            wu_runner.poll(interval=0.0)
+
+        self.assertFalse(mock_sleep.called)
+        self.assertEqual(wu_runner.probes, 2)
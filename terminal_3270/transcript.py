@@ -0,0 +1,220 @@
+""" Emulator Session Transcripts
+
+Record every s3270 command, response and timing to an append-only transcript file.
+Replay the transcript later to run the same session code without a mainframe.
+
+    with MySignOnSession(..., record_to='signon.transcript') as session:
+        results = session.get_results()
+
+    with MySignOnSession(..., app=ReplayApp('signon.transcript')) as session:
+        replayed = session.get_results()
+
+A transcript is JSON lines: one header per recording, then one record per command.
+`diff_command_counts()` compares the round trips in two transcripts.
+"""
+
+import json
+import time
+from collections import Counter
+from timeit import default_timer as timer
+
+from terminal_3270.metrics import action_type
+
+TRANSCRIPT_VERSION = 1
+
+
+class TranscriptError(Exception):
+    pass
+
+
+class TranscriptMismatchError(TranscriptError):
+    """ The replayed session sent a different command than the recorded one. """
+    pass
+
+
+class RecordingApp(object):
+    """ Recording py3270 App
+
+    Wrap a py3270 app and append each command and its response lines to a transcript file.
+    """
+
+    def __init__(self, app, transcript):
+        """ New Recording App
+
+        :param app: the py3270 app to record, e.g. an S3270App
+        :param transcript: the transcript file path, or an open text file
+        """
+
+        self.app = app
+        if hasattr(transcript, 'write'):
+            self.file = transcript
+            self._owns_file = False
+        else:
+            self.file = open(transcript, 'a')
+            self._owns_file = True
+
+        self.start_t = timer()
+        self._record = None
+        self._status_seen = False
+
+        self._write({'transcript': TRANSCRIPT_VERSION, 'started': time.time()})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.file.flush()
+
+    def connect(self, host):
+        return self.app.connect(host)
+
+    def write(self, data):
+        now = timer()
+        self._record = {
+            't': round(now - self.start_t, 6),
+            'cmd': data.rstrip(b'\n').decode('latin-1'),
+            'lines': [],
+            '_start_t': now,
+        }
+        self._status_seen = False
+        self.app.write(data)
+
+    def readline(self):
+        line = self.app.readline()
+
+        record = self._record
+        if record is not None:
+            record['lines'].append(line.decode('latin-1'))
+
+            if line.startswith(b'data:'):
+                pass
+            elif not self._status_seen:
+                self._status_seen = True
+            else:
+                # The result line ends the command.
+                record['dt'] = round(timer() - record.pop('_start_t'), 6)
+                self._write(record)
+                self._record = None
+
+        return line
+
+    def close(self):
+        try:
+            return self.app.close()
+        finally:
+            if self._owns_file:
+                self.file.close()
+
+
+def read_transcript(transcript):
+    """ Read Transcript
+
+    :param transcript: the transcript file path, or an open text file
+    :returns: the command records, in order; recording headers are skipped
+    :rtype: list
+    """
+
+    if hasattr(transcript, 'read'):
+        lines = transcript.read().splitlines()
+    else:
+        with open(transcript) as f:
+            lines = f.read().splitlines()
+
+    records = []
+    for line in lines:
+        if line.strip():
+            record = json.loads(line)
+            if 'cmd' in record:
+                records.append(record)
+    return records
+
+
+class ReplayApp(object):
+    """ Replay py3270 App
+
+    Serve the recorded responses of a transcript back to an emulator, in order.
+    """
+
+    def __init__(self, transcript, timing=False, strict=True, sleep=time.sleep):
+        """ New Replay App
+
+        :param transcript: the transcript file path, an open text file, or a list of records
+        :param bool timing: when True, wait each command's recorded round-trip time
+        :param bool strict: when True, each command must match the recorded command
+        :param callable sleep: sleep(seconds) for the recorded timing
+        """
+
+        if isinstance(transcript, list):
+            self.records = list(transcript)
+        else:
+            self.records = read_transcript(transcript)
+
+        self.timing = timing
+        self.strict = strict
+        self.sleep = sleep
+
+        self.position = 0
+        self._pending = []
+
+    @property
+    def remaining(self):
+        return len(self.records) - self.position
+
+    def connect(self, host):
+        return False
+
+    def write(self, data):
+        cmd = data.rstrip(b'\n').decode('latin-1')
+
+        if self.position >= len(self.records):
+            raise TranscriptError('transcript ended before command "{}"'.format(cmd))
+
+        record = self.records[self.position]
+        if self.strict and cmd != record['cmd']:
+            raise TranscriptMismatchError(
+                'command {} is "{}", but the transcript has "{}"'.format(self.position + 1, cmd, record['cmd']))
+
+        self.position += 1
+        if self.timing and record.get('dt'):
+            self.sleep(record['dt'])
+
+        self._pending = [line.encode('latin-1') for line in record['lines']]
+
+    def readline(self):
+        if not self._pending:
+            return b''
+        return self._pending.pop(0)
+
+    def close(self):
+        return 0
+
+
+def command_counts(transcript):
+    """ Command Counts
+
+    Count the round trips in a transcript by action type, see `metrics.action_type()`.
+
+    :param transcript: the transcript file path, an open text file, or a list of records
+    :rtype: collections.Counter
+    """
+
+    records = transcript if isinstance(transcript, list) else read_transcript(transcript)
+    return Counter(action_type(record['cmd'].encode('latin-1')) for record in records)
+
+
+def diff_command_counts(before, after):
+    """ Diff Command Counts
+
+    Compare the round trips in two transcripts, e.g. to catch an added round trip.
+
+    :param before: the baseline transcript
+    :param after: the new transcript
+    :returns: {action: (before count, after count)} for the actions whose counts differ
+    :rtype: dict
+    """
+
+    before_counts = command_counts(before)
+    after_counts = command_counts(after)
+
+    return dict(
+        (action, (before_counts[action], after_counts[action]))
+        for action in set(before_counts) | set(after_counts)
+        if before_counts[action] != after_counts[action])
@@ -1,3 +1,5 @@
+import random
+from time import sleep
 from timeit import default_timer as timer
 
 
@@ -8,8 +10,18 @@ class WaitUntil(object):
     Eventually, the `time_limit` will be reached to indicate failure.
 
         found_callable(*args, **kwargs) returns True when it meets the condition.
+
+    The poller sleeps between probes, starting at `interval` seconds.
+    Each sleep grows by the `backoff` factor up to `max_interval`, with +/- `jitter` (a fraction).
+    Set these on the class, the instance, or pass them to poll().
+    An `interval` of 0.0 polls without sleeping.
     """
 
+    interval = 0.005  # 5 ms
+    backoff = 2.0
+    max_interval = 0.100  # 100 ms
+    jitter = 0.1  # +/- 10%
+
     def __init__(self, time_limit, found_callable, *args, **kwargs):
         """ Create WaitUntil poller.
 
@@ -33,20 +45,46 @@ class WaitUntil(object):
 
         self.start_t = 0.0
         self.end_t = 0.0
+        self.probes = 0
+        self.found = False
 
-    def poll(self):
+    def poll(self, interval=None, backoff=None, max_interval=None, jitter=None):
         """ Poll Until Found.
 
         Poll this WaitUntil object until the found state or time limit.
+        The number of found_callable calls is kept in `probes`.
+
+        :param float interval: first sleep between probes in seconds
+        :param float backoff: multiply the sleep by this after each probe
+        :param float max_interval: the longest sleep between probes in seconds
+        :param float jitter: randomize each sleep by this fraction, e.g. 0.1 is +/- 10%
         """
 
+        interval = self.interval if interval is None else interval
+        backoff = self.backoff if backoff is None else backoff
+        max_interval = self.max_interval if max_interval is None else max_interval
+        jitter = self.jitter if jitter is None else jitter
+
+        self.probes = 0
+        self.found = False
+        delay = interval
+
         self.start_t = timer()
 
-        while not self.found_callable(*self.call_args, **self.call_kwargs):
-            curr_t = timer()
-            if (curr_t - self.start_t) >= self.time_limit:
+        while True:
+            self.probes += 1
+            if self.found_callable(*self.call_args, **self.call_kwargs):
+                self.found = True
+                break
+
+            remaining = self.time_limit - (timer() - self.start_t)
+            if remaining <= 0.0:
                 break
 
+            if delay > 0.0:
+                sleep(min(delay * random.uniform(1.0 - jitter, 1.0 + jitter), remaining))
+                delay = min(delay * backoff, max_interval)
+
         self.end_t = timer()
 
     @property